@@ -0,0 +1,253 @@
+# api/ingestion.py - BULK JOB INGESTION FOR N8N WEBHOOKS
+import json
+import logging
+import time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from dashboard.counters import pipeline_counters
+from dashboard.fragments import dashboard_fragments
+from dashboard.stats import dashboard_stats
+from jobs.dedup import dedup_fields, legacy_fingerprints
+from jobs.models import JobApplication
+
+logger = logging.getLogger(__name__)
+
+BULK_CREATE_BATCH_SIZE = 500
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_percentage(value):
+    try:
+        return max(0, min(100, int(float(value)))) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _clip(value, max_length):
+    return str(value or '').strip()[:max_length]
+
+
+def normalise_job_payload(job_data):
+    """
+    Clean one job from an n8n payload into JobApplication field values.
+    Returns None when the job has no title or company.
+    """
+    if not isinstance(job_data, dict):
+        return None
+
+    job_title = _clip(job_data.get('job_title'), 255)
+    company_name = _clip(job_data.get('company_name'), 255)
+    if not job_title or not company_name:
+        return None
+
+    return {
+        'job_title': job_title,
+        'company_name': company_name,
+        'job_url': _clip(job_data.get('job_url'), 2000),
+        'job_description': str(job_data.get('job_description') or ''),
+        'salary_range': _clip(job_data.get('salary_range'), 100),
+        'location': _clip(job_data.get('location'), 255),
+        'remote_option': _clip(job_data.get('remote_option'), 50),
+        'urgency_level': job_data.get('urgency_level') or 'medium',
+        'company_rating': _to_float(job_data.get('company_rating')),
+        'glassdoor_rating': _to_float(job_data.get('glassdoor_rating')),
+        'match_percentage': _to_percentage(job_data.get('match_percentage')),
+        'skills_match_analysis': str(job_data.get('skills_match_analysis') or ''),
+    }
+
+
+def _key_filter(keys):
+    """Q narrowing to rows whose (job_title, company_name) unique key may be in keys"""
+    return Q(job_title__in={title for title, _ in keys}, company_name__in={company for _, company in keys})
+
+
+def _count_inserted(user, config, applications):
+    """
+    Rows of applications that bulk_create(ignore_conflicts=True) really inserted. Their keys
+    were absent at lookup time, so a key now present under this config is one of ours;
+    a key taken by a concurrent insert for another config is not.
+    """
+    keys = {(application.job_title, application.company_name) for application in applications}
+    inserted = JobApplication.objects.filter(user=user, search_config=config).filter(
+        _key_filter(keys)
+    ).values_list('job_title', 'company_name')
+    return sum(1 for key in inserted if key in keys)
+
+
+def bulk_ingest_jobs(user, config, jobs_data, update_config=True):
+    """
+    Insert new jobs for a search config in a handful of queries:
+    normalise, fetch existing fingerprints once, bulk_create the rest,
+    then stamp config.last_search_date once.
+    """
+    started = time.perf_counter()
+
+    # 1. Normalise, fingerprint and drop duplicates inside the payload itself
+    normalised = {}
+    url_hashes = set()
+    invalid_count = 0
+    for job_data in jobs_data:
+        job = normalise_job_payload(job_data)
+        if job is None:
+            invalid_count += 1
+            continue
+        job.update(dedup_fields(job['job_title'], job['company_name'], job['job_url']))
+        if job['dedup_fingerprint'] in normalised or job['dedup_url_hash'] in url_hashes:
+            continue
+        normalised[job['dedup_fingerprint']] = job
+        if job['dedup_url_hash']:
+            url_hashes.add(job['dedup_url_hash'])
+    normalised_at = time.perf_counter()
+
+    # 2. One indexed query for fingerprints / canonical URLs / exact unique keys this user already has
+    existing_fingerprints = set()
+    existing_urls = set()
+    existing_keys = set()
+    if normalised:
+        for fingerprint, url_hash, job_title, company_name in JobApplication.objects.filter(user=user).filter(
+            Q(dedup_fingerprint__in=list(normalised)) | Q(dedup_url_hash__in=list(url_hashes)) |
+            _key_filter([(job['job_title'], job['company_name']) for job in normalised.values()])
+        ).values_list('dedup_fingerprint', 'dedup_url_hash', 'job_title', 'company_name'):
+            existing_fingerprints.add(fingerprint)
+            existing_keys.add((job_title, company_name))
+            if url_hash:
+                existing_urls.add(url_hash)
+        # Rows saved before fingerprinting only match on normalised title + company
+        existing_fingerprints.update(legacy_fingerprints(
+            JobApplication.objects.filter(user=user), {job['company_name'] for job in normalised.values()}
+        ))
+    looked_up_at = time.perf_counter()
+
+    # 3. bulk_create everything new with the follow-up flag already set
+    follow_up_active = bool(config.auto_follow_up_enabled)
+    new_applications = [
+        JobApplication(
+            user=user,
+            search_config=config,
+            follow_up_sequence_active=follow_up_active,
+            **job
+        )
+        for fingerprint, job in normalised.items()
+        if fingerprint not in existing_fingerprints
+        and job['dedup_url_hash'] not in existing_urls
+        and (job['job_title'], job['company_name']) not in existing_keys
+    ]
+    created_count = 0
+    if new_applications:
+        JobApplication.objects.bulk_create(
+            new_applications,
+            batch_size=BULK_CREATE_BATCH_SIZE,
+            ignore_conflicts=True  # A concurrent webhook may have inserted the same key
+        )
+        # ignore_conflicts drops colliding rows without saying so, so count what actually landed
+        created_count = _count_inserted(user, config, new_applications)
+    if created_count:
+        # bulk_create skips post_save, so move the counters and drop the stats cache here
+        pipeline_counters.apply_application_delta(
+            user.id,
+            statuses={'discovered': created_count},
+            approvals={'pending': created_count},
+            total=created_count
+        )
+        dashboard_stats.invalidate(user.id)
+        dashboard_fragments.bump(user.id)
+    inserted_at = time.perf_counter()
+
+    # 4. Stamp the config once
+    if update_config:
+        config.last_search_date = timezone.now()
+        config.save(update_fields=['last_search_date'])
+    finished = time.perf_counter()
+
+    total_seconds = finished - started
+    return {
+        'created_count': created_count,
+        'duplicate_count': len(jobs_data) - invalid_count - created_count,
+        'invalid_count': invalid_count,
+        'total_processed': len(jobs_data),
+        'timing': {
+            'normalise_ms': round((normalised_at - started) * 1000, 2),
+            'lookup_ms': round((looked_up_at - normalised_at) * 1000, 2),
+            'insert_ms': round((inserted_at - looked_up_at) * 1000, 2),
+            'config_update_ms': round((finished - inserted_at) * 1000, 2),
+            'total_ms': round(total_seconds * 1000, 2),
+            'jobs_per_second': round(len(jobs_data) / total_seconds, 1) if total_seconds else None,
+        }
+    }
+
+
+def iter_ndjson_records(stream):
+    """
+    Yield one parsed record per non-empty line of a newline-delimited JSON stream.
+    Lines that are not valid JSON objects are yielded as None so callers can count them.
+    """
+    for raw_line in stream:
+        line = raw_line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except (ValueError, UnicodeDecodeError):
+            record = None
+        yield record if isinstance(record, dict) else None
+
+
+def ingest_ndjson_stream(user, config, stream, chunk_size=500):
+    """
+    Ingest an NDJSON stream of jobs in fixed-size chunks so memory stays flat.
+    Returns per-chunk acceptance counts plus totals.
+    """
+    started = time.perf_counter()
+    chunks = []
+    totals = {'received': 0, 'accepted': 0, 'duplicates': 0, 'invalid': 0}
+
+    def flush(batch, malformed):
+        result = bulk_ingest_jobs(user, config, batch, update_config=False)
+        chunk = {
+            'chunk': len(chunks) + 1,
+            'received': len(batch) + malformed,
+            'accepted': result['created_count'],
+            'duplicates': result['duplicate_count'],
+            'invalid': result['invalid_count'] + malformed,
+            'insert_ms': result['timing']['total_ms'],
+        }
+        chunks.append(chunk)
+        for key in totals:
+            totals[key] += chunk[key]
+
+    batch = []
+    malformed = 0
+    for record in iter_ndjson_records(stream):
+        if record is None:
+            malformed += 1
+        else:
+            batch.append(record)
+        if len(batch) + malformed >= chunk_size:
+            flush(batch, malformed)
+            batch, malformed = [], 0
+
+    if batch or malformed:
+        flush(batch, malformed)
+
+    if totals['received']:
+        config.last_search_date = timezone.now()
+        config.save(update_fields=['last_search_date'])
+
+    total_seconds = time.perf_counter() - started
+    return {
+        'chunks': chunks,
+        'chunk_size': chunk_size,
+        **totals,
+        'timing': {
+            'total_ms': round(total_seconds * 1000, 2),
+            'jobs_per_second': round(totals['received'] / total_seconds, 1) if total_seconds else None,
+        }
+    }
@@ -1,3 +1,51 @@
+import uuid
+
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class ScoringBatch(models.Model):
+    """Compact status record for an AI scoring batch running on Celery workers"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scoring_batches')
+    job_ids = models.JSONField(default=list)
+    total_jobs = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Scoring batch {self.id} ({self.scored_count + self.failed_count}/{self.total_jobs})"
+
+    @property
+    def pending_count(self):
+        return max(self.total_jobs - self.scored_count - self.failed_count, 0)
+
+    def to_progress_dict(self):
+        """Progress payload returned by the batch progress endpoints"""
+        done = self.scored_count + self.failed_count
+        return {
+            'batch_id': str(self.id),
+            'status': self.status,
+            'total': self.total_jobs,
+            'scored': self.scored_count,
+            'failed': self.failed_count,
+            'pending': self.pending_count,
+            'progress_percent': round(done / self.total_jobs * 100, 1) if self.total_jobs else 100.0,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
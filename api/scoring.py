@@ -0,0 +1,446 @@
+# api/scoring.py - AI JOB SCORING ENGINE
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from documents.ai_cache import ai_response_cache
+from job_automation.http_client import http_client
+from jobs.models import JobApplication
+
+logger = logging.getLogger(__name__)
+
+# Fields written back after a job has been scored (used by bulk_update)
+SCORE_FIELDS = [
+    'overall_match_score',
+    'skill_match_score',
+    'experience_match_score',
+    'location_match_score',
+    'salary_match_score',
+    'culture_match_score',
+    'matched_skills',
+    'missing_skills',
+    'green_flags',
+    'red_flags',
+    'ai_reasoning',
+    'confidence_score',
+    'recommendation_level',
+    'updated_at',
+]
+
+
+def build_user_context(user):
+    """Build the profile context that is sent to the AI with every job"""
+    try:
+        profile = user.userprofile
+
+        # Handle different skill field names and formats
+        user_skills = []
+        for skill_field in ['primary_skills', 'skills', 'technical_skills']:
+            skills = getattr(profile, skill_field, '') or getattr(profile, skill_field, [])
+            if skills:
+                if isinstance(skills, str):
+                    user_skills.extend([s.strip() for s in skills.split(',') if s.strip()])
+                elif isinstance(skills, list):
+                    user_skills.extend(skills)
+                break
+
+        return {
+            'skills': user_skills[:10],  # Limit to top 10 skills
+            'experience_years': getattr(profile, 'experience_years', 0) or 0,
+            'current_position': (
+                    getattr(profile, 'current_job_title', '') or
+                    getattr(profile, 'current_position', '') or ''
+            ),
+            'target_salary_min': getattr(profile, 'target_salary_min', 0) or 0,
+            'target_salary_max': getattr(profile, 'target_salary_max', 0) or 0,
+            'preferred_locations': getattr(profile, 'preferred_locations', []) or [],
+            'education_level': getattr(profile, 'education_level', '') or '',
+        }
+    except Exception:
+        # Fallback if no profile exists
+        return {
+            'skills': [],
+            'experience_years': 0,
+            'current_position': '',
+            'target_salary_min': 0,
+            'target_salary_max': 0,
+            'preferred_locations': [],
+            'education_level': '',
+        }
+
+
+def create_job_scoring_prompt(job, user_context):
+    """Create comprehensive AI prompt for job scoring"""
+
+    # Format user skills
+    skills_text = ', '.join(user_context['skills']) if user_context['skills'] else 'Not specified'
+
+    # Format salary expectations
+    salary_expectation = ''
+    if user_context['target_salary_min'] or user_context['target_salary_max']:
+        salary_expectation = f"${user_context['target_salary_min']:,} - ${user_context['target_salary_max']:,}"
+
+    # Create the prompt
+    prompt = f"""
+Analyze this job posting and score it for the user profile. Return a JSON response only.
+
+JOB POSTING:
+Title: {job.job_title}
+Company: {job.company_name}
+Location: {getattr(job, 'location', 'Not specified')}
+Salary: {getattr(job, 'salary_range', 'Not specified')}
+Employment Type: {getattr(job, 'employment_type', 'Not specified')}
+Experience Level: {getattr(job, 'experience_level', 'Not specified')}
+Remote Options: {getattr(job, 'remote_type', 'Not specified')}
+Description: {job.job_description[:1000]}...
+
+USER PROFILE:
+Current Position: {user_context['current_position']}
+Experience: {user_context['experience_years']} years
+Skills: {skills_text}
+Salary Expectation: {salary_expectation}
+Education: {user_context['education_level']}
+Preferred Locations: {', '.join(user_context['preferred_locations']) if user_context['preferred_locations'] else 'Flexible'}
+
+SCORING INSTRUCTIONS:
+Score each dimension from 0-100:
+1. skill_match: How well user's skills align with job requirements
+2. experience_match: How user's experience level fits the role
+3. location_match: How job location matches user preferences
+4. salary_match: How job salary aligns with user expectations
+5. culture_match: How company culture fits user background
+6. overall_score: Weighted average of all dimensions
+
+Also provide:
+- matched_skills: Array of user skills that align with job
+- missing_skills: Array of job requirements user lacks
+- strengths: Array of positive aspects about this match
+- concerns: Array of potential issues or challenges
+- reasoning: Brief explanation of the scoring
+- confidence: Your confidence in this analysis (0-1)
+
+Return valid JSON only:
+{{
+    "overall_score": 78,
+    "skill_match": 85,
+    "experience_match": 75,
+    "location_match": 90,
+    "salary_match": 70,
+    "culture_match": 80,
+    "matched_skills": ["Python", "Django", "React"],
+    "missing_skills": ["AWS", "Kubernetes"],
+    "strengths": ["Strong technical match", "Remote friendly", "Growth opportunity"],
+    "concerns": ["Salary below expectation", "Requires 2+ years more experience"],
+    "reasoning": "Strong technical alignment with some experience gaps",
+    "confidence": 0.85
+}}
+"""
+
+    return prompt
+
+
+SCORING_PROVIDER = 'groq'
+SCORING_MODEL = 'llama3-8b-8192'
+SCORING_TEMPERATURE = 0.1
+SCORING_SYSTEM_PROMPT = (
+    'You are an expert job analysis AI. Always respond with valid JSON only. '
+    'Be thorough but concise in your analysis.'
+)
+
+
+def scoring_cache_key(prompt):
+    """Response cache key for a scoring prompt"""
+    return ai_response_cache.make_key(
+        SCORING_PROVIDER, SCORING_MODEL, SCORING_SYSTEM_PROMPT, prompt, SCORING_TEMPERATURE
+    )
+
+
+def get_cached_scores(prompt, user_id=None, use_cache=True):
+    """Return cached scores for an identical prompt, or None"""
+    entry = ai_response_cache.get(scoring_cache_key(prompt), bypass=not use_cache)
+    if entry is None:
+        return None
+    try:
+        ai_response = json.loads(entry.response)
+    except json.JSONDecodeError:
+        return None
+    ai_response_cache.record_hit(user_id, entry, 'job_scoring')
+    return ai_response
+
+
+def cache_scores(prompt, ai_response, tokens_used=0, use_cache=True):
+    ai_response_cache.set(
+        scoring_cache_key(prompt),
+        provider=SCORING_PROVIDER,
+        model=SCORING_MODEL,
+        response=json.dumps(ai_response),
+        tokens_used=tokens_used,
+        bypass=not use_cache
+    )
+
+
+def request_groq_scores(prompt):
+    """
+    Call Groq API for AI analysis (uncached).
+    Returns (parsed_response, tokens_used) - parsed_response is None on failure.
+    """
+    try:
+        api_key = os.getenv('GROQ_API_KEY')
+        if not api_key:
+            logger.error("GROQ_API_KEY not found in environment variables")
+            return None, 0
+
+        response = http_client.post(
+            'https://api.groq.com/openai/v1/chat/completions',
+            headers={
+                'Authorization': f'Bearer {api_key}',
+                'Content-Type': 'application/json'
+            },
+            json={
+                'model': SCORING_MODEL,
+                'messages': [
+                    {
+                        'role': 'system',
+                        'content': SCORING_SYSTEM_PROMPT
+                    },
+                    {
+                        'role': 'user',
+                        'content': prompt
+                    }
+                ],
+                'temperature': SCORING_TEMPERATURE,
+                'max_tokens': 800,
+                'top_p': 1,
+                'frequency_penalty': 0,
+                'presence_penalty': 0
+            },
+            timeout=30
+        )
+
+        if response.status_code == 200:
+            result = response.json()
+            content = result['choices'][0]['message']['content']
+            tokens_used = result.get('usage', {}).get('total_tokens', 0)
+
+            # Clean and parse JSON response
+            try:
+                # Remove any markdown formatting
+                if content.startswith('```json'):
+                    content = content.replace('```json', '').replace('```', '')
+                elif content.startswith('```'):
+                    content = content.replace('```', '')
+
+                content = content.strip()
+                return json.loads(content), tokens_used
+
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse Groq JSON response: {content[:200]}...")
+                return None, tokens_used
+        else:
+            logger.error(f"Groq API error: {response.status_code} - {response.text[:200]}")
+            return None, 0
+
+    except requests.exceptions.Timeout:
+        logger.error("Groq API timeout")
+        return None, 0
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Groq API request error: {str(e)}")
+        return None, 0
+    except Exception as e:
+        logger.error(f"Unexpected error calling Groq API: {str(e)}")
+        return None, 0
+
+
+def call_groq_api(prompt, use_cache=True, user_id=None):
+    """Call Groq API for AI analysis - identical prompts are answered from the response cache"""
+    cached = get_cached_scores(prompt, user_id=user_id, use_cache=use_cache)
+    if cached is not None:
+        return cached
+
+    ai_response, tokens_used = request_groq_scores(prompt)
+    if ai_response and isinstance(ai_response, dict):
+        cache_scores(prompt, ai_response, tokens_used, use_cache=use_cache)
+    return ai_response
+
+
+def get_recommendation_level(score):
+    """Map an overall score to the JobApplication recommendation level"""
+    if score >= 85:
+        return 'highly_recommended'
+    elif score >= 70:
+        return 'recommended'
+    elif score >= 50:
+        return 'consider'
+    return 'not_recommended'
+
+
+def apply_ai_scores(job, ai_response):
+    """Copy an AI scoring response onto a job instance (does not save)"""
+    job.overall_match_score = ai_response.get('overall_score', 0)
+    job.skill_match_score = ai_response.get('skill_match', 0)
+    job.experience_match_score = ai_response.get('experience_match', 0)
+    job.location_match_score = ai_response.get('location_match', 0)
+    job.salary_match_score = ai_response.get('salary_match', 0)
+    job.culture_match_score = ai_response.get('culture_match', 0)
+
+    job.matched_skills = ai_response.get('matched_skills', [])
+    job.missing_skills = ai_response.get('missing_skills', [])
+    job.green_flags = ai_response.get('strengths', [])
+    job.red_flags = ai_response.get('concerns', [])
+
+    job.ai_reasoning = ai_response.get('reasoning', '')
+    job.confidence_score = ai_response.get('confidence', 0.8)
+    job.recommendation_level = get_recommendation_level(job.overall_match_score)
+    return job
+
+
+class ProviderRateLimiter:
+    """
+    Thread-safe per-provider rate limiter.
+    Hands out evenly spaced request slots so a burst of workers
+    never exceeds the provider's requests-per-minute limit.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block the calling worker until its slot comes up"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BulkScoringEngine:
+    """
+    Scores many jobs in parallel with bounded concurrency.
+    Prompts are built on the calling thread, only the AI calls run in the pool,
+    and all scored jobs are written back with a single bulk_update.
+    """
+
+    def __init__(self):
+        scoring_settings = getattr(settings, 'AI_SCORING_SETTINGS', {})
+        self.max_concurrency = scoring_settings.get('MAX_CONCURRENCY', 4)
+        self.provider = scoring_settings.get('PROVIDER', 'groq')
+        self.rate_limits = scoring_settings.get('RATE_LIMITS', {'groq': 30})
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    def get_limiter(self, provider: str) -> ProviderRateLimiter:
+        """Limiters are shared across requests so concurrent bulk calls respect one budget"""
+        with self._limiters_lock:
+            if provider not in self._limiters:
+                self._limiters[provider] = ProviderRateLimiter(self.rate_limits.get(provider, 0))
+            return self._limiters[provider]
+
+    def _score_one(self, prompt):
+        self.get_limiter(self.provider).acquire()
+        return request_groq_scores(prompt)
+
+    def _result(self, job, ai_response):
+        if ai_response and isinstance(ai_response, dict):
+            apply_ai_scores(job, ai_response)
+            return {
+                'job_id': job.id,
+                'title': job.job_title,
+                'score': round(job.overall_match_score, 1),
+                'recommendation': job.recommendation_level,
+                'success': True
+            }
+        return {
+            'job_id': job.id,
+            'title': job.job_title,
+            'success': False,
+            'error': 'AI scoring service is temporarily unavailable'
+        }
+
+    def iter_scores(self, jobs, user, max_concurrency=None, use_cache=True):
+        """
+        Yield one result dict per job as soon as its AI call finishes.
+        Cache lookups and writes stay on the calling thread; only uncached AI calls
+        run in the pool. Scored jobs are persisted with one bulk_update when the generator
+        finishes or is closed early (e.g. the streaming client disconnected).
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        user_context = build_user_context(user)
+        prompts = {job.id: create_job_scoring_prompt(job, user_context) for job in jobs}
+        jobs_by_id = {job.id: job for job in jobs}
+
+        scored_jobs = []
+        pending = {}
+        try:
+            for job_id, prompt in prompts.items():
+                cached = get_cached_scores(prompt, user_id=user.id, use_cache=use_cache)
+                if cached is not None:
+                    result = self._result(jobs_by_id[job_id], cached)
+                    if result['success']:
+                        scored_jobs.append(jobs_by_id[job_id])
+                    yield result
+                else:
+                    pending[job_id] = prompt
+
+            if pending:
+                workers = max(1, min(max_concurrency or self.max_concurrency, self.max_concurrency, len(pending)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-scoring') as executor:
+                    futures = {
+                        executor.submit(self._score_one, prompt): job_id
+                        for job_id, prompt in pending.items()
+                    }
+                    try:
+                        for future in as_completed(futures):
+                            job = jobs_by_id[futures[future]]
+                            try:
+                                ai_response, tokens_used = future.result()
+                            except Exception as e:
+                                logger.error(f"Scoring worker error for job {job.id}: {str(e)}")
+                                ai_response, tokens_used = None, 0
+
+                            result = self._result(job, ai_response)
+                            if result['success']:
+                                cache_scores(pending[job.id], ai_response, tokens_used, use_cache=use_cache)
+                                scored_jobs.append(job)
+                            yield result
+                    except GeneratorExit:
+                        # The client went away - don't start AI calls nobody will read
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+        finally:
+            # Runs on a client disconnect too, so scores already streamed are never lost
+            self.persist(scored_jobs)
+
+    def persist(self, scored_jobs):
+        """Write all scored jobs back in one query"""
+        if not scored_jobs:
+            return 0
+        now = timezone.now()
+        for job in scored_jobs:
+            job.updated_at = now
+        JobApplication.objects.bulk_update(scored_jobs, SCORE_FIELDS)
+        logger.info(f"Persisted AI scores for {len(scored_jobs)} jobs")
+        return len(scored_jobs)
+
+    def score_jobs(self, jobs, user, max_concurrency=None, use_cache=True):
+        """Score jobs and return the full list of per-job results"""
+        return list(self.iter_scores(jobs, user, max_concurrency=max_concurrency, use_cache=use_cache))
+
+
+# Singleton instance
+scoring_engine = BulkScoringEngine()
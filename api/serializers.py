@@ -9,6 +9,7 @@ from rest_framework.views import APIView
 
 from jobs.models import JobApplication, JobSearchConfig
 from followups.models import FollowUpHistory, FollowUpTemplate
+from followups.templating import template_engine
 from accounts.models import UserProfile
 
 
@@ -172,6 +173,20 @@ class FollowUpTemplateSerializer(serializers.ModelSerializer):
             'success_rate', 'times_used', 'responses_received'
         ]
 
+    def _validate_placeholders(self, value):
+        unknown = template_engine.unknown_placeholders(value)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown placeholders: {', '.join('{{%s}}' % name for name in unknown)}"
+            )
+        return value
+
+    def validate_subject_template(self, value):
+        return self._validate_placeholders(value)
+
+    def validate_body_template(self, value):
+        return self._validate_placeholders(value)
+
 
 class FollowUpHistorySerializer(serializers.ModelSerializer):
     application_title = serializers.CharField(source='application.job_title', read_only=True)
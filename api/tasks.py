@@ -0,0 +1,80 @@
+# api/tasks.py - CELERY AI SCORING PIPELINE
+import logging
+
+from celery import chord, shared_task
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import JobApplication
+from .models import ScoringBatch
+from .scoring import SCORE_FIELDS, apply_ai_scores, build_user_context, call_groq_api, create_job_scoring_prompt
+
+logger = logging.getLogger(__name__)
+
+SCORING_SETTINGS = getattr(settings, 'AI_SCORING_SETTINGS', {})
+
+
+@shared_task(rate_limit=SCORING_SETTINGS.get('TASK_RATE_LIMIT'))
+def score_job_task(batch_id, job_id, use_cache=True):
+    """Score a single job and record the outcome on its batch"""
+    success = False
+    try:
+        job = JobApplication.objects.select_related('user').get(id=job_id)
+        prompt = create_job_scoring_prompt(job, build_user_context(job.user))
+        ai_response = call_groq_api(prompt, use_cache=use_cache, user_id=job.user_id)
+
+        if ai_response and isinstance(ai_response, dict):
+            apply_ai_scores(job, ai_response)
+            job.save(update_fields=SCORE_FIELDS)
+            success = True
+        else:
+            logger.warning(f"AI scoring returned no result for job {job_id}")
+
+    except JobApplication.DoesNotExist:
+        logger.error(f"Scoring task: job {job_id} not found")
+    except Exception as e:
+        logger.error(f"Scoring task error for job {job_id}: {str(e)}")
+
+    counter = 'scored_count' if success else 'failed_count'
+    ScoringBatch.objects.filter(id=batch_id).update(
+        **{counter: F(counter) + 1},
+        status='running'
+    )
+    return {'job_id': job_id, 'success': success}
+
+
+@shared_task
+def finalize_scoring_batch(results, batch_id):
+    """Chord callback - mark the batch complete once every job has been scored"""
+    ScoringBatch.objects.filter(id=batch_id).update(
+        status='completed',
+        completed_at=timezone.now()
+    )
+    scored = sum(1 for r in results or [] if r and r.get('success'))
+    logger.info(f"Scoring batch {batch_id} complete: {scored}/{len(results or [])} scored")
+    return {'batch_id': str(batch_id), 'scored': scored, 'total': len(results or [])}
+
+
+def queue_scoring_batch(user, job_ids, use_cache=True):
+    """
+    Create a ScoringBatch and fan the jobs out to Celery workers.
+    Returns immediately - poll the batch for progress.
+    """
+    job_ids = list(
+        JobApplication.objects.filter(id__in=job_ids, user=user).values_list('id', flat=True)
+    )
+    batch = ScoringBatch.objects.create(user=user, job_ids=job_ids, total_jobs=len(job_ids))
+
+    if not job_ids:
+        batch.status = 'completed'
+        batch.completed_at = timezone.now()
+        batch.save(update_fields=['status', 'completed_at'])
+        return batch
+
+    queue = SCORING_SETTINGS.get('QUEUE', 'celery')
+    header = [score_job_task.s(str(batch.id), job_id, use_cache).set(queue=queue) for job_id in job_ids]
+    chord(header)(finalize_scoring_batch.s(str(batch.id)).set(queue=queue))
+
+    logger.info(f"Queued scoring batch {batch.id} with {len(job_ids)} jobs for {user.username}")
+    return batch
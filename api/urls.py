@@ -39,12 +39,18 @@ urlpatterns = [
     path('search-configs/<int:user_id>/', views.SearchConfigAPIView.as_view(), name='search_configs'),
     path('search-configs/', views.SearchConfigAPIView.as_view(), name='current_user_search_configs'),
 
+    # AI job scoring
+    path('jobs/<int:job_id>/score/', views.score_job_with_ai, name='score_job'),
+    path('jobs/score/bulk/', views.bulk_score_jobs, name='bulk_score_jobs'),
+    path('jobs/score/batches/<uuid:batch_id>/', views.scoring_batch_progress, name='scoring_batch_progress'),
+
     path('dashboard/stats/', views.DashboardStatsAPIView.as_view(), name='dashboard_stats'),
     path('dashboard/pipeline/', views.PipelineAPIView.as_view(), name='dashboard_pipeline'),
     path('dashboard/notifications/', views.NotificationAPIView.as_view(), name='dashboard_notifications'),
 
     # N8N Webhook Endpoints (No authentication required)
     path('n8n/webhook/job-search/', views.N8NJobSearchWebhook.as_view(), name='n8n_job_search'),
+    path('n8n/webhook/job-search/stream/', views.N8NJobSearchStreamWebhook.as_view(), name='n8n_job_search_stream'),
     path('n8n/webhook/followup/', views.N8NFollowUpWebhook.as_view(), name='n8n_followup'),
     path('n8n/webhook/document/', views.N8NDocumentWebhook.as_view(), name='n8n_document'),
 
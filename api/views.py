@@ -3,24 +3,34 @@
 
 # api/views.py - ADD these API endpoints to your existing file
 
+import gzip
 import json
 import logging
+from contextlib import closing
 from datetime import datetime
 
 import requests
 from django.contrib.auth.models import User
 from django.db import connection
-from django.db.models import Avg, Q
-from django.http import JsonResponse
+from django.db.models import Avg, Count, Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 
 from accounts.models import UserProfile
+from dashboard.counters import pipeline_counters
 from jobs.models import JobSearchConfig
+from .ingestion import bulk_ingest_jobs, ingest_ndjson_stream
+from .models import ScoringBatch
+from .scoring import call_groq_api, create_job_scoring_prompt, scoring_engine
+from .tasks import queue_scoring_batch
 from .exceptions import CustomAPIException, JobApplicationNotFound, FollowUpError, DocumentGenerationError
 from .serializers import (
     JobApplicationSerializer, FollowUpHistorySerializer,
@@ -35,109 +45,41 @@ from django.views.decorators.csrf import csrf_exempt
 import logging
 logger = logging.getLogger(__name__)
 
+
+def boolean_param(data, name, default):
+    """
+    A boolean request field: JSON true/false or form strings like "false", "0", "no", "off".
+    A bare "false" string is truthy in Python, so flags must never be used as sent.
+    """
+    value = data.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return BooleanField().to_internal_value(value)
+    except ValidationError:
+        raise CustomAPIException(f"{name} must be true or false")
+
+
 @api_view(['POST'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
 def score_job_with_ai(request, job_id):
-    """Score job using AI with comprehensive analysis"""
+    """Queue AI scoring for a single job - returns a batch id to poll"""
+    # use_cache=false forces a fresh AI call instead of the response cache
+    use_cache = boolean_param(request.data, 'use_cache', True)
     try:
         job = JobApplication.objects.get(id=job_id, user=request.user)
 
-        # Get user profile for scoring context
-        try:
-            profile = request.user.userprofile
-
-            # Handle different skill field names and formats
-            user_skills = []
-            for skill_field in ['primary_skills', 'skills', 'technical_skills']:
-                skills = getattr(profile, skill_field, '') or getattr(profile, skill_field, [])
-                if skills:
-                    if isinstance(skills, str):
-                        user_skills.extend([s.strip() for s in skills.split(',') if s.strip()])
-                    elif isinstance(skills, list):
-                        user_skills.extend(skills)
-                    break
-
-            user_context = {
-                'skills': user_skills[:10],  # Limit to top 10 skills
-                'experience_years': getattr(profile, 'experience_years', 0) or 0,
-                'current_position': (
-                        getattr(profile, 'current_job_title', '') or
-                        getattr(profile, 'current_position', '') or ''
-                ),
-                'target_salary_min': getattr(profile, 'target_salary_min', 0) or 0,
-                'target_salary_max': getattr(profile, 'target_salary_max', 0) or 0,
-                'preferred_locations': getattr(profile, 'preferred_locations', []) or [],
-                'education_level': getattr(profile, 'education_level', '') or '',
-            }
-        except:
-            # Fallback if no profile exists
-            user_context = {
-                'skills': [],
-                'experience_years': 0,
-                'current_position': '',
-                'target_salary_min': 0,
-                'target_salary_max': 0,
-                'preferred_locations': [],
-                'education_level': '',
-            }
-
-        # Create comprehensive AI scoring prompt
-        prompt = create_job_scoring_prompt(job, user_context)
-
-        # Call AI API
-        ai_response = call_groq_api(prompt)
-
-        if ai_response and isinstance(ai_response, dict):
-            # Update job with AI scores
-            job.overall_match_score = ai_response.get('overall_score', 0)
-            job.skill_match_score = ai_response.get('skill_match', 0)
-            job.experience_match_score = ai_response.get('experience_match', 0)
-            job.location_match_score = ai_response.get('location_match', 0)
-            job.salary_match_score = ai_response.get('salary_match', 0)
-            job.culture_match_score = ai_response.get('culture_match', 0)
-
-            job.matched_skills = ai_response.get('matched_skills', [])
-            job.missing_skills = ai_response.get('missing_skills', [])
-            job.green_flags = ai_response.get('strengths', [])
-            job.red_flags = ai_response.get('concerns', [])
-
-            job.ai_reasoning = ai_response.get('reasoning', '')
-            job.confidence_score = ai_response.get('confidence', 0.8)
+        batch = queue_scoring_batch(request.user, [job.id], use_cache=use_cache)
+        logger.info(f"Job {job_id} queued for scoring in batch {batch.id}")
 
-            # Calculate overall score and recommendation
-            job.calculate_overall_score()
-            job.save()
-
-            logger.info(f"Job {job_id} scored successfully: {job.overall_match_score}%")
-
-            return Response({
-                'success': True,
-                'job_id': job.id,
-                'scores': {
-                    'overall': round(job.overall_match_score, 1),
-                    'skill_match': round(job.skill_match_score, 1),
-                    'experience_match': round(job.experience_match_score, 1),
-                    'location_match': round(job.location_match_score, 1),
-                    'salary_match': round(job.salary_match_score, 1),
-                    'culture_match': round(job.culture_match_score, 1),
-                    'recommendation': job.recommendation_level
-                },
-                'analysis': {
-                    'matched_skills': job.matched_skills,
-                    'missing_skills': job.missing_skills,
-                    'strengths': job.green_flags,
-                    'concerns': job.red_flags,
-                    'reasoning': job.ai_reasoning,
-                    'confidence': job.confidence_score
-                },
-                'message': f'Job scored: {job.overall_match_score:.0f}% match'
-            })
-        else:
-            return Response({
-                'success': False,
-                'error': 'AI scoring service is temporarily unavailable. Please try again.'
-            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({
+            'success': True,
+            'job_id': job.id,
+            'batch_id': str(batch.id),
+            'progress_url': reverse('api:scoring_batch_progress', kwargs={'batch_id': batch.id}),
+            'message': f'Scoring queued: {job.job_title} at {job.company_name}'
+        }, status=status.HTTP_202_ACCEPTED)
 
     except JobApplication.DoesNotExist:
         return Response({
@@ -152,6 +94,25 @@ def score_job_with_ai(request, job_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def scoring_batch_progress(request, batch_id):
+    """Report scored/failed/pending counts for a scoring batch"""
+    try:
+        batch = ScoringBatch.objects.get(id=batch_id, user=request.user)
+    except ScoringBatch.DoesNotExist:
+        return Response({
+            'success': False,
+            'error': 'Scoring batch not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        **batch.to_progress_dict()
+    })
+
+
 @api_view(['POST'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
@@ -211,10 +172,8 @@ def bulk_approve_jobs(request):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         # Update jobs
-        updated_jobs = JobApplication.objects.filter(
-            id__in=job_ids,
-            user=request.user
-        ).update(
+        updated_jobs = pipeline_counters.bulk_update_applications(
+            JobApplication.objects.filter(id__in=job_ids, user=request.user),
             approval_status='approved',
             approved_at=timezone.now(),
             approved_by=request.user
@@ -241,7 +200,9 @@ def bulk_approve_jobs(request):
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
 def bulk_score_jobs(request):
-    """Score multiple jobs with AI"""
+    """Score multiple jobs with AI (queued on Celery, or streamed inline with stream=true)"""
+    use_cache = boolean_param(request.data, 'use_cache', True)
+    stream = boolean_param(request.data, 'stream', False)
     try:
         job_ids = request.data.get('job_ids', [])
 
@@ -258,53 +219,41 @@ def bulk_score_jobs(request):
             overall_match_score=0  # Only score unscored jobs
         )
 
-        scored_count = 0
-        failed_count = 0
-        results = []
-
-        for job in jobs_to_score:
-            try:
-                # Create a mock request for single job scoring
-                mock_request = type('MockRequest', (), {
-                    'user': request.user,
-                    'data': {}
-                })()
-
-                response = score_job_with_ai(mock_request, job.id)
-
-                if response.data.get('success'):
-                    scored_count += 1
-                    results.append({
-                        'job_id': job.id,
-                        'title': job.job_title,
-                        'score': response.data['scores']['overall'],
-                        'success': True
-                    })
-                else:
-                    failed_count += 1
-                    results.append({
-                        'job_id': job.id,
-                        'title': job.job_title,
-                        'success': False,
-                        'error': response.data.get('error', 'Unknown error')
-                    })
-
-            except Exception as e:
-                failed_count += 1
-                results.append({
-                    'job_id': job.id,
-                    'title': getattr(job, 'job_title', 'Unknown'),
-                    'success': False,
-                    'error': str(e)
-                })
+        if stream:
+            max_concurrency = request.data.get('max_concurrency')
+            max_concurrency = int(max_concurrency) if max_concurrency else None
+
+            # Stream one NDJSON line per job as soon as it is scored
+            def stream_results():
+                scored = failed = 0
+                # closing() so a disconnect closes iter_scores at once and its scores are persisted
+                with closing(scoring_engine.iter_scores(jobs_to_score, request.user, max_concurrency, use_cache)) as results:
+                    for result in results:
+                        if result['success']:
+                            scored += 1
+                        else:
+                            failed += 1
+                        yield json.dumps(result) + '\n'
+                yield json.dumps({
+                    'complete': True,
+                    'scored_count': scored,
+                    'failed_count': failed
+                }) + '\n'
+
+            return StreamingHttpResponse(stream_results(), content_type='application/x-ndjson')
+
+        # Hand the batch to the Celery scoring workers and return straight away
+        batch = queue_scoring_batch(
+            request.user, list(jobs_to_score.values_list('id', flat=True)), use_cache=use_cache
+        )
 
         return Response({
             'success': True,
-            'message': f'Scoring complete: {scored_count} successful, {failed_count} failed',
-            'scored_count': scored_count,
-            'failed_count': failed_count,
-            'results': results
-        })
+            'message': f'Scoring queued for {batch.total_jobs} jobs',
+            'batch_id': str(batch.id),
+            'progress_url': reverse('api:scoring_batch_progress', kwargs={'batch_id': batch.id}),
+            **batch.to_progress_dict()
+        }, status=status.HTTP_202_ACCEPTED)
 
     except Exception as e:
         logger.error(f"Bulk scoring error: {str(e)}")
@@ -322,48 +271,23 @@ def get_approval_stats(request):
     try:
         user = request.user
 
-        # Get base queryset
-        all_jobs = JobApplication.objects.filter(user=user)
-
-        try:
-            pending_jobs = all_jobs.filter(approval_status='pending')
-        except:
-            pending_jobs = all_jobs
-
-        try:
-            approved_today = all_jobs.filter(
-                approval_status='approved',
-                approved_at__date=datetime.now().date()
-            ).count()
-        except:
-            approved_today = 0
-
-        try:
-            avg_score = all_jobs.filter(
-                overall_match_score__gt=0
-            ).aggregate(Avg('overall_match_score'))['overall_match_score__avg'] or 0
-        except:
-            avg_score = 0
-
-        try:
-            high_scoring = pending_jobs.filter(overall_match_score__gte=85).count()
-        except:
-            high_scoring = 0
-
-        try:
-            needs_scoring = pending_jobs.filter(
-                Q(overall_match_score=0) | Q(overall_match_score__isnull=True)
-            ).count()
-        except:
-            needs_scoring = pending_jobs.count()
+        # Totals from the per-user counters row, score-based numbers in one aggregate
+        counters = pipeline_counters.get(user)
+        pending = Q(approval_status='pending')
+        scores = JobApplication.objects.filter(user=user).aggregate(
+            avg_score=Avg('overall_match_score', filter=Q(overall_match_score__gt=0)),
+            high_scoring=Count('id', filter=pending & Q(overall_match_score__gte=85)),
+            needs_scoring=Count('id', filter=pending & (Q(overall_match_score=0) | Q(overall_match_score__isnull=True))),
+            approved_today=Count('id', filter=Q(approval_status='approved', approved_at__date=timezone.localdate())),
+        )
 
         stats = {
-            'pending_review': pending_jobs.count(),
-            'high_scoring': high_scoring,
-            'needs_scoring': needs_scoring,
-            'approved_today': approved_today,
-            'total_jobs': all_jobs.count(),
-            'avg_score': round(avg_score, 1)
+            'pending_review': counters.approval_count('pending'),
+            'high_scoring': scores['high_scoring'],
+            'needs_scoring': scores['needs_scoring'],
+            'approved_today': scores['approved_today'],
+            'total_jobs': counters.total_applications,
+            'avg_score': round(scores['avg_score'] or 0, 1)
         }
 
         return Response({
@@ -460,142 +384,6 @@ def get_pending_jobs(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def create_job_scoring_prompt(job, user_context):
-    """Create comprehensive AI prompt for job scoring"""
-
-    # Format user skills
-    skills_text = ', '.join(user_context['skills']) if user_context['skills'] else 'Not specified'
-
-    # Format salary expectations
-    salary_expectation = ''
-    if user_context['target_salary_min'] or user_context['target_salary_max']:
-        salary_expectation = f"${user_context['target_salary_min']:,} - ${user_context['target_salary_max']:,}"
-
-    # Create the prompt
-    prompt = f"""
-Analyze this job posting and score it for the user profile. Return a JSON response only.
-
-JOB POSTING:
-Title: {job.job_title}
-Company: {job.company_name}
-Location: {getattr(job, 'location', 'Not specified')}
-Salary: {getattr(job, 'salary_range', 'Not specified')}
-Employment Type: {getattr(job, 'employment_type', 'Not specified')}
-Experience Level: {getattr(job, 'experience_level', 'Not specified')}
-Remote Options: {getattr(job, 'remote_type', 'Not specified')}
-Description: {job.job_description[:1000]}...
-
-USER PROFILE:
-Current Position: {user_context['current_position']}
-Experience: {user_context['experience_years']} years
-Skills: {skills_text}
-Salary Expectation: {salary_expectation}
-Education: {user_context['education_level']}
-Preferred Locations: {', '.join(user_context['preferred_locations']) if user_context['preferred_locations'] else 'Flexible'}
-
-SCORING INSTRUCTIONS:
-Score each dimension from 0-100:
-1. skill_match: How well user's skills align with job requirements
-2. experience_match: How user's experience level fits the role
-3. location_match: How job location matches user preferences  
-4. salary_match: How job salary aligns with user expectations
-5. culture_match: How company culture fits user background
-6. overall_score: Weighted average of all dimensions
-
-Also provide:
-- matched_skills: Array of user skills that align with job
-- missing_skills: Array of job requirements user lacks
-- strengths: Array of positive aspects about this match
-- concerns: Array of potential issues or challenges
-- reasoning: Brief explanation of the scoring
-- confidence: Your confidence in this analysis (0-1)
-
-Return valid JSON only:
-{{
-    "overall_score": 78,
-    "skill_match": 85,
-    "experience_match": 75,
-    "location_match": 90,
-    "salary_match": 70,
-    "culture_match": 80,
-    "matched_skills": ["Python", "Django", "React"],
-    "missing_skills": ["AWS", "Kubernetes"],
-    "strengths": ["Strong technical match", "Remote friendly", "Growth opportunity"],
-    "concerns": ["Salary below expectation", "Requires 2+ years more experience"],
-    "reasoning": "Strong technical alignment with some experience gaps",
-    "confidence": 0.85
-}}
-"""
-
-    return prompt
-
-
-def call_groq_api(prompt):
-    """Call Groq API for AI analysis"""
-    try:
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            logger.error("GROQ_API_KEY not found in environment variables")
-            return None
-
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'model': 'llama3-8b-8192',
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'You are an expert job analysis AI. Always respond with valid JSON only. Be thorough but concise in your analysis.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': 0.1,
-                'max_tokens': 800,
-                'top_p': 1,
-                'frequency_penalty': 0,
-                'presence_penalty': 0
-            },
-            timeout=30
-        )
-
-        if response.status_code == 200:
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-
-            # Clean and parse JSON response
-            try:
-                # Remove any markdown formatting
-                if content.startswith('```json'):
-                    content = content.replace('```json', '').replace('```', '')
-                elif content.startswith('```'):
-                    content = content.replace('```', '')
-
-                content = content.strip()
-                return json.loads(content)
-
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Groq JSON response: {content[:200]}...")
-                return None
-        else:
-            logger.error(f"Groq API error: {response.status_code} - {response.text[:200]}")
-            return None
-
-    except requests.exceptions.Timeout:
-        logger.error("Groq API timeout")
-        return None
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Groq API request error: {str(e)}")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error calling Groq API: {str(e)}")
-        return None
 @api_view(['POST'])
 @authentication_classes([])  # No authentication required
 @permission_classes([AllowAny])  # Allow any user
@@ -711,13 +499,15 @@ def extension_save_job(request):
                 'error': f'Missing required fields: {", ".join(missing_fields)}'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check for duplicate jobs (same title + company + user)
+        # Check for duplicate jobs (same fingerprint or canonical URL for this user)
         from jobs.models import JobApplication
-        existing_job = JobApplication.objects.filter(
-            user=request.user,
-            job_title=job_data.get('job_title', ''),
-            company_name=job_data.get('company_name', '')
-        ).first()
+        from jobs.dedup import find_duplicate_job
+        existing_job = find_duplicate_job(
+            request.user,
+            job_data.get('job_title', ''),
+            job_data.get('company_name', ''),
+            job_data.get('job_url', '')
+        )
 
         if existing_job:
             return Response({
@@ -777,51 +567,32 @@ def extension_save_job(request):
 def extension_job_stats(request):
     """Get Job Statistics for Chrome Extension"""
     try:
-        from jobs.models import JobApplication
-        from datetime import datetime, timedelta
-
-        user_jobs = JobApplication.objects.filter(user=request.user)
-
-        # Calculate comprehensive statistics
-        total_jobs = user_jobs.count()
-        extension_jobs = user_jobs.filter(saved_from_extension=True).count()
+        from dashboard.stats import dashboard_stats
 
-        this_week = user_jobs.filter(
-            created_at__gte=datetime.now() - timedelta(days=7)
-        ).count()
-
-        # Status breakdown
-        applied_jobs = user_jobs.exclude(application_status='discovered').count()
-        interview_jobs = user_jobs.filter(application_status='interview').count()
-        offer_jobs = user_jobs.filter(application_status='offer').count()
-        hired_jobs = user_jobs.filter(application_status='hired').count()
+        stats = dashboard_stats.get_stats(request.user)
+        pipeline = stats['pipeline']
+        total_jobs = stats['applications']['total']
 
         # Success metrics
-        successful_jobs = user_jobs.filter(
-            application_status__in=['interview', 'offer', 'hired']
-        ).count()
-
+        applied_jobs = total_jobs - pipeline['discovered']
+        successful_jobs = pipeline['interview'] + pipeline['offer'] + pipeline['hired']
         success_rate = round((successful_jobs / applied_jobs * 100) if applied_jobs > 0 else 0)
 
         return Response({
             'success': True,
             'stats': {
                 'total_jobs': total_jobs,
-                'extension_jobs': extension_jobs,
+                'extension_jobs': stats['applications']['extension'],
                 'saved': total_jobs,  # Legacy compatibility
-                'this_week': this_week,
+                'this_week': stats['applications']['this_week'],
                 'applied': applied_jobs,
-                'interviews': interview_jobs,
-                'offers': offer_jobs,
-                'hired': hired_jobs,
+                'interviews': pipeline['interview'],
+                'offers': pipeline['offer'],
+                'hired': pipeline['hired'],
                 'success_rate': success_rate,
                 'status_breakdown': {
-                    'discovered': user_jobs.filter(application_status='discovered').count(),
-                    'applied': user_jobs.filter(application_status='applied').count(),
-                    'interview': interview_jobs,
-                    'offer': offer_jobs,
-                    'hired': hired_jobs,
-                    'rejected': user_jobs.filter(application_status='rejected').count(),
+                    status_name: pipeline[status_name]
+                    for status_name in ['discovered', 'applied', 'interview', 'offer', 'hired', 'rejected']
                 }
             }
         })
@@ -1197,7 +968,6 @@ class N8NJobSearchWebhook(APIView):
     def post(self, request):
         try:
             data = json.loads(request.body)
-            logger.info(f"Received job search webhook: {data}")
 
             user_id = data.get('user_id')
             config_id = data.get('config_id')
@@ -1238,47 +1008,25 @@ class N8NJobSearchWebhook(APIView):
                     status_code=404
                 )
 
-            created_count = 0
-            for job_data in jobs_data:
-                try:
-                    application, created = JobApplication.objects.get_or_create(
-                        user=user,
-                        job_title=job_data.get('job_title'),
-                        company_name=job_data.get('company_name'),
-                        defaults={
-                            'search_config': config,
-                            'job_url': job_data.get('job_url', ''),
-                            'job_description': job_data.get('job_description', ''),
-                            'salary_range': job_data.get('salary_range', ''),
-                            'location': job_data.get('location', ''),
-                            'remote_option': job_data.get('remote_option', ''),
-                            'urgency_level': job_data.get('urgency_level', 'medium'),
-                            'company_rating': job_data.get('company_rating'),
-                            'glassdoor_rating': job_data.get('glassdoor_rating'),
-                            'match_percentage': job_data.get('match_percentage'),
-                            'skills_match_analysis': job_data.get('skills_match_analysis', ''),
-                        }
-                    )
-
-                    if created:
-                        created_count += 1
-                        if config.auto_follow_up_enabled:
-                            application.follow_up_sequence_active = True
-                            application.save()
+            if not isinstance(jobs_data, list):
+                raise CustomAPIException(
+                    detail="jobs must be an array",
+                    code="invalid_jobs_data"
+                )
 
-                except Exception as e:
-                    logger.warning(f"Error creating job application: {str(e)}")
-                    continue
+            # Normalise, dedupe against existing rows and insert in a few queries
+            result = bulk_ingest_jobs(user, config, jobs_data)
 
-            # Update config last search date
-            config.last_search_date = timezone.now()
-            config.save()
+            logger.info(
+                f"Job search webhook for user {user_id}, config {config_id}: "
+                f"{result['created_count']} created, {result['duplicate_count']} duplicates, "
+                f"{result['invalid_count']} invalid in {result['timing']['total_ms']}ms"
+            )
 
             return JsonResponse({
                 'success': True,
-                'message': f'Created {created_count} new job applications',
-                'created_count': created_count,
-                'total_processed': len(jobs_data)
+                'message': f"Created {result['created_count']} new job applications",
+                **result
             })
 
         except json.JSONDecodeError:
@@ -1297,6 +1045,88 @@ class N8NJobSearchWebhook(APIView):
             )
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class N8NJobSearchStreamWebhook(APIView):
+    """
+    Streaming webhook for very large n8n job search results.
+    The body is newline-delimited JSON (one job per line), optionally gzip encoded.
+    user_id and config_id are passed as query parameters.
+    """
+    authentication_classes = []
+    permission_classes = []
+    chunk_size = 500
+
+    def post(self, request):
+        user_id = request.query_params.get('user_id')
+        config_id = request.query_params.get('config_id')
+
+        if not user_id:
+            raise CustomAPIException(
+                detail="user_id is required",
+                code="missing_user_id"
+            )
+
+        if not config_id:
+            raise CustomAPIException(
+                detail="config_id is required",
+                code="missing_config_id"
+            )
+
+        try:
+            user = User.objects.get(id=user_id)
+            config = JobSearchConfig.objects.get(id=config_id, user=user)
+        except (User.DoesNotExist, ValueError):
+            raise CustomAPIException(
+                detail=f"User with ID {user_id} not found",
+                code="user_not_found",
+                status_code=404
+            )
+        except JobSearchConfig.DoesNotExist:
+            raise CustomAPIException(
+                detail=f"Search configuration with ID {config_id} not found",
+                code="config_not_found",
+                status_code=404
+            )
+
+        # Read the raw request stream line by line - never load the whole body
+        stream = request.stream
+        if stream is None:
+            raise CustomAPIException(
+                detail="Request body cannot be empty",
+                code="empty_jobs_data"
+            )
+        if request.META.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip':
+            stream = gzip.GzipFile(fileobj=stream, mode='rb')
+
+        try:
+            result = ingest_ndjson_stream(user, config, stream, chunk_size=self.chunk_size)
+        except (OSError, EOFError):
+            raise CustomAPIException(
+                detail="Invalid gzip payload",
+                code="invalid_gzip"
+            )
+        except Exception as e:
+            logger.error(f"Error processing streaming job search webhook: {str(e)}")
+            raise CustomAPIException(
+                detail="Failed to process job search webhook",
+                code="webhook_processing_failed",
+                status_code=500
+            )
+
+        logger.info(
+            f"Streaming job search webhook for user {user_id}, config {config_id}: "
+            f"{result['received']} received in {len(result['chunks'])} chunks, "
+            f"{result['accepted']} created, {result['duplicates']} duplicates, "
+            f"{result['invalid']} invalid in {result['timing']['total_ms']}ms"
+        )
+
+        return JsonResponse({
+            'success': True,
+            'message': f"Created {result['accepted']} new job applications",
+            **result
+        })
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class N8NFollowUpWebhook(APIView):
     """
@@ -1308,7 +1138,10 @@ class N8NFollowUpWebhook(APIView):
     def post(self, request):
         try:
             data = json.loads(request.body)
-            logger.info(f"Received follow-up webhook: {data}")
+            logger.info(
+                f"Received follow-up webhook: type={data.get('type', 'send_followup')}, "
+                f"{len(request.body)} bytes"
+            )
 
             webhook_type = data.get('type', 'send_followup')
 
@@ -1592,7 +1425,10 @@ class N8NDocumentWebhook(APIView):
     def post(self, request):
         try:
             data = json.loads(request.body)
-            logger.info(f"Received document webhook: {data}")
+            logger.info(
+                f"Received document webhook for application {data.get('application_id')}: "
+                f"{len(data.get('documents', []))} documents"
+            )
 
             application_id = data.get('application_id')
             documents = data.get('documents', [])
@@ -2506,6 +2342,7 @@ class DocumentStatusAPIView(APIView):
 
 # ADD THESE IMPORTS TO api/views.py
 from followups.models import FollowUpTemplate, FollowUpHistory
+from followups.templating import template_engine
 from datetime import date, timedelta
 
 
@@ -2567,24 +2404,11 @@ class FollowUpAPIView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-            # Prepare email data
-            email_data = {
-                'user_name': request.user.get_full_name() or request.user.username,
-                'company_name': application.company_name,
-                'job_title': application.job_title,
-                'hiring_manager': 'Hiring Manager',  # Could be enhanced
-                'days_since_application': (
-                        date.today() - application.applied_date).days if application.applied_date else 0,
-                'custom_message': custom_message
-            }
-
             # Process template
-            subject = template.subject_template
-            body = template.body_template
-
-            for key, value in email_data.items():
-                subject = subject.replace(f'{{{{{key}}}}}', str(value))
-                body = body.replace(f'{{{{{key}}}}}', str(value))
+            subject, body = template_engine.render(
+                template, application, UserProfile.objects.filter(user=request.user).first(),
+                user=request.user, custom_message=custom_message
+            )
 
             if send_immediately:
                 # Create follow-up history record
@@ -2683,25 +2507,11 @@ class BulkFollowUpAPIView(APIView):
             failed_count = 0
             results = []
 
+            profile = UserProfile.objects.filter(user=request.user).first()
             for application in applications:
                 try:
-                    # Prepare email data
-                    email_data = {
-                        'user_name': request.user.get_full_name() or request.user.username,
-                        'company_name': application.company_name,
-                        'job_title': application.job_title,
-                        'hiring_manager': 'Hiring Manager',
-                        'days_since_application': (
-                                date.today() - application.applied_date).days if application.applied_date else 0
-                    }
-
-                    # Process template
-                    subject = template.subject_template
-                    body = template.body_template
-
-                    for key, value in email_data.items():
-                        subject = subject.replace(f'{{{{{key}}}}}', str(value))
-                        body = body.replace(f'{{{{{key}}}}}', str(value))
+                    # Process template (compiled once per template, one pass per application)
+                    subject, body = template_engine.render(template, application, profile, user=request.user)
 
                     # Create follow-up history
                     followup_history = FollowUpHistory.objects.create(
@@ -2938,6 +2748,7 @@ class FollowUpHistoryAPIView(APIView):
 
 # ADD THESE IMPORTS TO api/views.py
 from dashboard.models import UserNotification, DashboardActivity
+from dashboard.stats import dashboard_stats
 
 
 # ADD THESE API VIEW CLASSES TO api/views.py
@@ -2951,101 +2762,8 @@ class DashboardStatsAPIView(APIView):
         try:
             user = request.user
 
-            # Basic application statistics
-            applications = JobApplication.objects.filter(user=user)
-            today = timezone.now().date()
-            week_ago = today - timedelta(days=7)
-            month_ago = today - timedelta(days=30)
-
-            stats = {
-                'applications': {
-                    'total': applications.count(),
-                    'this_week': applications.filter(created_at__gte=week_ago).count(),
-                    'this_month': applications.filter(created_at__gte=month_ago).count(),
-                    'today': applications.filter(created_at__date=today).count()
-                },
-                'pipeline': {
-                    'found': applications.filter(application_status='found').count(),
-                    'applied': applications.filter(application_status='applied').count(),
-                    'responded': applications.filter(application_status='responded').count(),
-                    'interview': applications.filter(application_status='interview').count(),
-                    'offer': applications.filter(application_status='offer').count(),
-                    'hired': applications.filter(application_status='hired').count(),
-                    'rejected': applications.filter(application_status='rejected').count()
-                }
-            }
-
-            # Response rate calculation
-            applied_count = stats['pipeline']['applied']
-            responded_count = stats['pipeline']['responded'] + stats['pipeline']['interview'] + stats['pipeline'][
-                'offer']
-            stats['response_rate'] = (responded_count / applied_count * 100) if applied_count > 0 else 0
-
-            # Follow-up statistics
-            due_followups = applications.filter(
-                next_follow_up_date__lte=today,
-                application_status__in=['applied', 'responded']
-            ).count()
-
-            overdue_followups = applications.filter(
-                next_follow_up_date__lt=today,
-                application_status__in=['applied', 'responded']
-            ).count()
-
-            stats['follow_ups'] = {
-                'due_today': due_followups,
-                'overdue': overdue_followups,
-                'total_sent': FollowUpHistory.objects.filter(application__user=user).count()
-            }
-
-            # Document statistics
-            total_documents = GeneratedDocument.objects.filter(application__user=user).count()
-            recent_documents = GeneratedDocument.objects.filter(
-                application__user=user,
-                generated_at__gte=week_ago
-            ).count()
-
-            stats['documents'] = {
-                'total': total_documents,
-                'recent': recent_documents,
-                'avg_per_application': total_documents / max(stats['applications']['total'], 1)
-            }
-
-            # Activity trends (last 7 days)
-            activity_data = []
-            for i in range(7):
-                day = today - timedelta(days=i)
-                day_applications = applications.filter(created_at__date=day).count()
-                day_followups = FollowUpHistory.objects.filter(
-                    application__user=user,
-                    sent_date__date=day
-                ).count()
-
-                activity_data.append({
-                    'date': day.isoformat(),
-                    'applications': day_applications,
-                    'followups': day_followups
-                })
-
-            stats['activity_trend'] = list(reversed(activity_data))
-
-            # Notifications
-            unread_notifications = UserNotification.objects.filter(
-                user=user,
-                is_read=False,
-                is_dismissed=False
-            ).count()
-
-            urgent_notifications = UserNotification.objects.filter(
-                user=user,
-                is_read=False,
-                priority='urgent'
-            ).count()
-
-            stats['notifications'] = {
-                'unread': unread_notifications,
-                'urgent': urgent_notifications
-            }
+            # Counters, trends, follow-ups, documents and notifications in a few aggregate queries
+            stats = dict(dashboard_stats.get_stats(user))
 
             # Profile completeness
             try:
@@ -3,7 +3,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import DashboardWidget, UserNotification, DashboardSettings, DashboardActivity
+from .models import DashboardWidget, UserNotification, DashboardSettings, DashboardActivity, UserPipelineCounters
 
 
 @admin.register(DashboardWidget)
@@ -263,6 +263,24 @@ class DashboardActivityAdmin(admin.ModelAdmin):
     delete_old_activities.short_description = "Delete activities older than 90 days"
 
 
+@admin.register(UserPipelineCounters)
+class UserPipelineCountersAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_applications', 'extension_jobs', 'follow_ups_sent',
+                    'documents_generated', 'emails_processed', 'reconciled_at', 'updated_at')
+    search_fields = ('user__username', 'user__email')
+    readonly_fields = ('updated_at', 'reconciled_at')
+    actions = ['rebuild_counters']
+
+    def rebuild_counters(self, request, queryset):
+        """Recount the selected users from the source tables"""
+        from .counters import pipeline_counters
+
+        drifted = pipeline_counters.reconcile(list(queryset.values_list('user_id', flat=True)))
+        self.message_user(request, f'Rebuilt counters; {len(drifted)} had drifted.')
+
+    rebuild_counters.short_description = "Rebuild selected counters"
+
+
 # Admin site customization
 admin.site.site_header = "Job Automation Dashboard Admin"
 admin.site.site_title = "Dashboard Admin"
@@ -0,0 +1,147 @@
+# dashboard/counters.py - INCREMENTAL PIPELINE COUNTERS
+import logging
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from documents.models import GeneratedDocument
+from followups.models import FollowUpHistory
+from jobs.models import EmailProcessingLog, JobApplication
+from .models import UserPipelineCounters
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = ('follow_ups_sent', 'documents_generated', 'emails_processed')
+
+
+class PipelineCounterService:
+    """Read, update and rebuild UserPipelineCounters rows"""
+
+    def get(self, user):
+        """One primary-key lookup; builds the row from scratch the first time"""
+        counters = UserPipelineCounters.objects.filter(pk=user.pk).first()
+        return counters or self.rebuild(user.pk)
+
+    def rebuild(self, user_id):
+        """Recount everything for one user from the source tables"""
+        applications = JobApplication.objects.filter(user_id=user_id)
+        status_counts = dict(
+            applications.values_list('application_status').annotate(count=Count('id')).order_by()
+        )
+        approval_counts = dict(
+            applications.values_list('approval_status').annotate(count=Count('id')).order_by()
+        )
+
+        counters, _ = UserPipelineCounters.objects.update_or_create(
+            user_id=user_id,
+            defaults={
+                'total_applications': sum(status_counts.values()),
+                'extension_jobs': applications.filter(saved_from_extension=True).count(),
+                'status_counts': status_counts,
+                'approval_counts': approval_counts,
+                'follow_ups_sent': FollowUpHistory.objects.filter(application__user_id=user_id).count(),
+                'documents_generated': GeneratedDocument.objects.filter(application__user_id=user_id).count(),
+                'emails_processed': EmailProcessingLog.objects.filter(user_id=user_id).count(),
+                'reconciled_at': timezone.now(),
+            }
+        )
+        return counters
+
+    def apply_application_delta(self, user_id, statuses=None, approvals=None, total=0, extension=0,
+                                rebuild_missing=True):
+        """
+        Apply application count changes under a row lock.
+        statuses / approvals map a status to its +/- change. Deletes pass rebuild_missing=False:
+        a missing row there may belong to a user being deleted, and reconcile fixes any drift.
+        """
+        with transaction.atomic():
+            counters = UserPipelineCounters.objects.select_for_update().filter(pk=user_id).first()
+            if counters is None:
+                # First write for this user - the recount already includes the change
+                if rebuild_missing:
+                    self.rebuild(user_id)
+                return
+
+            for field, deltas in (('status_counts', statuses), ('approval_counts', approvals)):
+                values = Counter(getattr(counters, field))
+                values.update(deltas or {})
+                setattr(counters, field, {key: count for key, count in values.items() if count > 0})
+
+            counters.total_applications = max(counters.total_applications + total, 0)
+            counters.extension_jobs = max(counters.extension_jobs + extension, 0)
+            counters.save(update_fields=[
+                'status_counts', 'approval_counts', 'total_applications', 'extension_jobs', 'updated_at'
+            ])
+
+    def bulk_update_applications(self, queryset, **fields):
+        """
+        queryset.update(**fields) on JobApplication rows that keeps the counters and the
+        dashboard caches in step, since update() skips post_save. Returns the rows updated.
+        """
+        from .fragments import dashboard_fragments
+        from .stats import dashboard_stats
+
+        counted = [field for field in ('application_status', 'approval_status') if field in fields]
+        with transaction.atomic():
+            ids = list(queryset.select_for_update().values_list('id', flat=True))
+            rows = JobApplication.objects.filter(id__in=ids)
+            groups = list(rows.values('user_id', *counted).annotate(count=Count('id')).order_by())
+            updated = rows.update(**fields)
+
+            deltas = {}
+            for group in groups:
+                user_deltas = deltas.setdefault(group['user_id'], {field: Counter() for field in counted})
+                for field in counted:
+                    if group[field] != fields[field]:
+                        user_deltas[field][group[field]] -= group['count']
+                        user_deltas[field][fields[field]] += group['count']
+
+            for user_id, user_deltas in deltas.items():
+                if any(user_deltas.values()):
+                    self.apply_application_delta(
+                        user_id,
+                        statuses=user_deltas.get('application_status'),
+                        approvals=user_deltas.get('approval_status')
+                    )
+
+        for user_id in deltas:
+            dashboard_stats.invalidate(user_id)
+            dashboard_fragments.bump(user_id)
+        return updated
+
+    def increment(self, user_id, field, amount=1, rebuild_missing=True):
+        """F()-based bump of one event counter (follow-ups, documents, emails)"""
+        if field not in EVENT_FIELDS:
+            raise ValueError(f"Unknown pipeline counter: {field}")
+        updated = UserPipelineCounters.objects.filter(pk=user_id).update(
+            **{field: F(field) + amount}, updated_at=timezone.now()
+        )
+        if not updated and rebuild_missing:
+            self.rebuild(user_id)
+
+    def reconcile(self, user_ids=None):
+        """
+        Rebuild counters and report users whose stored values had drifted.
+        Returns a list of user ids that were corrected.
+        """
+        from django.contrib.auth.models import User
+
+        users = User.objects.all()
+        if user_ids:
+            users = users.filter(id__in=user_ids)
+
+        drifted = []
+        compare = ('total_applications', 'extension_jobs', 'status_counts', 'approval_counts') + EVENT_FIELDS
+        for user_id in users.values_list('id', flat=True).iterator():
+            before = UserPipelineCounters.objects.filter(pk=user_id).values(*compare).first()
+            after = self.rebuild(user_id)
+            if before is not None and any(before[field] != getattr(after, field) for field in compare):
+                drifted.append(user_id)
+                logger.warning(f"Pipeline counters for user {user_id} had drifted and were rebuilt")
+        return drifted
+
+
+# Singleton instance
+pipeline_counters = PipelineCounterService()
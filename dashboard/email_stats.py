@@ -0,0 +1,144 @@
+# dashboard/email_stats.py - AGGREGATED EMAIL PROCESSING ANALYTICS
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from jobs.models import EmailProcessingDailyRollup, EmailProcessingLog
+from .fragments import dashboard_fragments
+
+SUCCESS = Q(processing_result='success')
+JOB_ALERTS = SUCCESS & Q(email_type='job_alert')
+INTERVIEWS = SUCCESS & Q(email_type='interview_invite')
+
+
+def success_rate(successful, total, empty=100.0):
+    """Percentage rounded to one decimal; empty when there is nothing to rate"""
+    return round(successful / total * 100, 1) if total else empty
+
+
+class EmailAnalyticsService:
+    """
+    Email processing analytics for one user, shared by the email settings page, the email
+    log and both stats APIs. Every count comes from one conditional aggregate and the
+    chart from one TruncDate group-by, both bounded by the (user, email_type, created_at)
+    index; the chart also adds the daily rollups of logs the retention engine has purged.
+    Results are cached under the user's dashboard version, which EmailProcessingLog
+    signals bump, so a newly processed email shows up on the next request. The summary's
+    24-hour and 7-day windows also move with the clock, so it is keyed by the hour too and
+    an email ageing out of a window is reflected within the hour.
+    """
+
+    def __init__(self):
+        self.chart_days = getattr(settings, 'EMAIL_ANALYTICS_CHART_DAYS', 30)
+
+    # ------------------------------------------------------------------
+    # Cached entry points
+    # ------------------------------------------------------------------
+
+    def get_summary(self, user):
+        return dashboard_fragments.get_context(
+            user.id, 'email_summary', lambda: self.compute_summary(user), timezone.now().strftime('%Y%m%d%H')
+        )
+
+    def get_daily(self, user):
+        return dashboard_fragments.get_context(
+            user.id, 'email_daily', lambda: self.compute_daily(user), timezone.localdate().isoformat()
+        )
+
+    def get_log_stats(self, user, logs, *filters):
+        """Stats for an already-filtered log queryset; filters are the values that built it"""
+        digest = hashlib.md5(repr(filters).encode()).hexdigest()
+        return dashboard_fragments.get_context(user.id, 'email_log_stats', lambda: self.compute_log_stats(logs), digest)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def compute_summary(self, user):
+        now = timezone.now()
+        recent = Q(created_at__gte=now - timedelta(hours=24))
+        totals = EmailProcessingLog.objects.filter(user=user).aggregate(
+            total=Count('id'),
+            successful=Count('id', filter=SUCCESS),
+            failed=Count('id', filter=Q(processing_result='failed')),
+            manual_review=Count('id', filter=Q(processing_result='manual_review')),
+            jobs_found=Count('id', filter=JOB_ALERTS),
+            interviews_detected=Count('id', filter=INTERVIEWS),
+            this_week=Count('id', filter=Q(created_at__gte=now - timedelta(days=7))),
+            recent=Count('id', filter=recent),
+            recent_successful=Count('id', filter=recent & SUCCESS),
+            recent_failed=Count('id', filter=recent & Q(processing_result='failed')),
+            jobs_today=Count('id', filter=recent & JOB_ALERTS),
+            interviews_today=Count('id', filter=recent & INTERVIEWS),
+            avg_confidence=Avg('confidence_score'),
+            avg_processing_time=Avg('processing_time'),
+            last_processed=Max('created_at'),
+        )
+        totals['avg_confidence'] = totals['avg_confidence'] or 0
+        totals['avg_processing_time'] = totals['avg_processing_time'] or 0
+        totals['success_rate'] = success_rate(totals['successful'], totals['total'])
+        totals['recent_success_rate'] = success_rate(totals['recent_successful'], totals['recent'])
+        return totals
+
+    def compute_daily(self, user):
+        """{'YYYY-MM-DD': {'jobs', 'interviews', 'total'}} for the last chart_days days, newest first"""
+        today = timezone.localdate()
+        start = today - timedelta(days=self.chart_days - 1)
+        # A bare datetime bound keeps the (user, email_type, created_at) index usable;
+        # created_at__date wraps the column in a conversion the index can't serve
+        start_of_day = timezone.make_aware(datetime.combine(start, time.min))
+        rows = (
+            EmailProcessingLog.objects.filter(user=user, created_at__gte=start_of_day)
+            .annotate(day=TruncDate('created_at'))
+            .values('day')
+            .annotate(
+                total=Count('id'),
+                jobs=Count('id', filter=JOB_ALERTS),
+                interviews=Count('id', filter=INTERVIEWS),
+            )
+            .order_by('day')
+        )
+        # Purged rows live on only in the rollups, so adding both never double counts
+        rolled_up = (
+            EmailProcessingDailyRollup.objects.filter(user=user, day__gte=start)
+            .values('day')
+            .annotate(
+                total=Sum('count'),
+                jobs=Sum('count', filter=JOB_ALERTS),
+                interviews=Sum('count', filter=INTERVIEWS),
+            )
+            .order_by('day')
+        )
+
+        daily = {}
+        for offset in range(self.chart_days):
+            day = today - timedelta(days=offset)
+            daily[day.strftime('%Y-%m-%d')] = {'jobs': 0, 'interviews': 0, 'total': 0}
+        for row in [*rows, *rolled_up]:
+            counts = daily.get(row['day'].strftime('%Y-%m-%d'))
+            if counts is not None:
+                for field in counts:
+                    counts[field] += row[field] or 0
+        return daily
+
+    def compute_log_stats(self, logs):
+        stats = logs.aggregate(
+            total=Count('id'),
+            success=Count('id', filter=SUCCESS),
+            failed=Count('id', filter=Q(processing_result='failed')),
+            manual_review=Count('id', filter=Q(processing_result='manual_review')),
+            avg_confidence=Avg('confidence_score'),
+            avg_processing_time=Avg('processing_time'),
+        )
+        stats['success_rate'] = success_rate(stats['success'], stats['total'], empty=0)
+        stats['avg_confidence'] = round(stats['avg_confidence'] or 0, 1)
+        stats['avg_processing_time'] = round(stats['avg_processing_time'] or 0, 3)
+        return stats
+
+
+# Singleton instance
+email_analytics = EmailAnalyticsService()
@@ -0,0 +1,87 @@
+# dashboard/fragments.py - PER-USER DASHBOARD CONTEXT CACHE
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from job_automation.caching import get_or_set
+
+
+class DashboardFragmentCache:
+    """
+    Cached view context for the dashboard pages, keyed by user and a per-user data version.
+    Signals bump the version whenever one of the user's applications, follow-ups, documents
+    or processed emails changes, so every cached page for that user is dropped at once
+    without having to know which keys exist.
+    """
+
+    def __init__(self):
+        self.cache_timeout = getattr(settings, 'DASHBOARD_FRAGMENT_CACHE_TIMEOUT', 600)
+
+    @property
+    def cache(self):
+        return caches['stats']
+
+    @staticmethod
+    def version_key(user_id):
+        return f'dashboard_version:{user_id}'
+
+    @staticmethod
+    def _seed():
+        # A lost version restarts from the clock, never from a number an old entry was built with
+        return int(time.time() * 1000)
+
+    def get_version(self, user_id):
+        key = self.version_key(user_id)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, self._seed(), None)
+            version = self.cache.get(key) or self._seed()
+        return version
+
+    def bump(self, user_id):
+        """Invalidate every cached dashboard context for a user"""
+        key = self.version_key(user_id)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, self._seed(), None)
+
+    def key(self, user_id, name, *parts):
+        suffix = ':'.join(str(part) for part in parts)
+        return f'dashboard_ctx:{name}:{user_id}:v{self.get_version(user_id)}' + (f':{suffix}' if suffix else '')
+
+    def get_context(self, user_id, name, builder, *parts):
+        """builder() runs only on a miss and must return a picklable dict (evaluate querysets to lists)"""
+        return get_or_set(self.key(user_id, name, *parts), builder, timeout=self.cache_timeout, alias='stats')
+
+
+class CachedContextMixin:
+    """
+    For TemplateViews whose context is per-user and derived from pipeline data.
+    Subclasses put the expensive part in build_cached_context(user); anything that
+    must stay live (profile, forms) belongs in get_context_data as usual.
+    """
+    cached_context_name = None
+
+    def cached_context_parts(self):
+        """Extra key parts for contexts that also depend on the date or request"""
+        return ()
+
+    def build_cached_context(self, user):
+        raise NotImplementedError
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        context.update(dashboard_fragments.get_context(
+            user.id,
+            self.cached_context_name or type(self).__name__,
+            lambda: self.build_cached_context(user),
+            *self.cached_context_parts()
+        ))
+        return context
+
+
+# Singleton instance
+dashboard_fragments = DashboardFragmentCache()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.counters import pipeline_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user pipeline counters from the source tables and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', help='Specific user ID (repeatable)')
+
+    def handle(self, *args, **options):
+        drifted = pipeline_counters.reconcile(options['user_id'])
+
+        if drifted:
+            self.stdout.write(self.style.WARNING(
+                f"Corrected drifted counters for {len(drifted)} users: {', '.join(map(str, drifted))}"
+            ))
+        self.stdout.write(self.style.SUCCESS('Pipeline counters rebuilt'))
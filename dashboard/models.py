@@ -219,4 +219,40 @@ class DashboardActivity(models.Model):
                 'user_agent': request.META.get('HTTP_USER_AGENT', '')
             })
 
-        return cls.objects.create(**activity_data)
\ No newline at end of file
+        return cls.objects.create(**activity_data)
+
+
+class UserPipelineCounters(models.Model):
+    """
+    Denormalised per-user pipeline counters, kept current by signals in dashboard/signals.py
+    so dashboards read one row instead of recounting every application.
+    Due follow-ups are not stored: they change with the date rather than on a write, so
+    they stay an indexed query in dashboard/stats.py.
+    Rebuild with `manage.py rebuild_pipeline_counters`.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='pipeline_counters')
+
+    total_applications = models.IntegerField(default=0)
+    extension_jobs = models.IntegerField(default=0)
+    status_counts = models.JSONField(default=dict)  # application_status -> count
+    approval_counts = models.JSONField(default=dict)  # approval_status -> count
+
+    follow_ups_sent = models.IntegerField(default=0)
+    documents_generated = models.IntegerField(default=0)
+    emails_processed = models.IntegerField(default=0)
+
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'User pipeline counters'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total_applications} applications"
+
+    def status_count(self, *statuses):
+        return sum(self.status_counts.get(status, 0) for status in statuses)
+
+    def approval_count(self, *statuses):
+        return sum(self.approval_counts.get(status, 0) for status in statuses)
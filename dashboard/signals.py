@@ -0,0 +1,131 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from documents.models import GeneratedDocument
+from followups.models import FollowUpHistory, FollowUpTemplate
+from jobs.models import EmailProcessingLog, JobApplication
+from .counters import pipeline_counters
+from .fragments import dashboard_fragments
+from .models import UserNotification
+from .stats import dashboard_stats
+
+# Fields whose changes move an application between pipeline counters
+COUNTED_FIELDS = ('application_status', 'approval_status', 'saved_from_extension')
+
+
+def _application_user_id(instance):
+    return JobApplication.objects.filter(pk=instance.application_id).values_list('user_id', flat=True).first()
+
+
+# =============================================================================
+# PIPELINE COUNTERS (connected first so the stats cache is dropped after they move)
+# =============================================================================
+
+@receiver(post_init, sender=JobApplication)
+def remember_counted_fields(sender, instance, **kwargs):
+    """Keep the loaded values so post_save can tell which counters moved"""
+    instance._counted_values = tuple(instance.__dict__.get(field) for field in COUNTED_FIELDS)
+
+
+@receiver(post_save, sender=JobApplication)
+def update_application_counters(sender, instance, created, **kwargs):
+    current = tuple(getattr(instance, field) for field in COUNTED_FIELDS)
+    previous = getattr(instance, '_counted_values', None)
+    instance._counted_values = current
+
+    if created:
+        status, approval, extension = current
+        pipeline_counters.apply_application_delta(
+            instance.user_id,
+            statuses={status: 1},
+            approvals={approval: 1},
+            total=1,
+            extension=int(bool(extension))
+        )
+    elif previous and previous != current and None not in previous:
+        (old_status, old_approval, old_extension), (status, approval, extension) = previous, current
+        pipeline_counters.apply_application_delta(
+            instance.user_id,
+            statuses={old_status: -1, status: 1} if old_status != status else None,
+            approvals={old_approval: -1, approval: 1} if old_approval != approval else None,
+            extension=int(bool(extension)) - int(bool(old_extension))
+        )
+
+
+@receiver(post_delete, sender=JobApplication)
+def remove_application_counters(sender, instance, **kwargs):
+    status, approval, extension = (getattr(instance, field) for field in COUNTED_FIELDS)
+    pipeline_counters.apply_application_delta(
+        instance.user_id,
+        statuses={status: -1},
+        approvals={approval: -1},
+        total=-1,
+        extension=-int(bool(extension)),
+        rebuild_missing=False  # Never recreate the row of a user whose cascade delete is running
+    )
+
+
+@receiver(post_save, sender=GeneratedDocument)
+@receiver(post_delete, sender=GeneratedDocument)
+def count_document(sender, instance, created=False, signal=None, **kwargs):
+    if created or signal is post_delete:
+        user_id = _application_user_id(instance)
+        if user_id:
+            pipeline_counters.increment(user_id, 'documents_generated', 1 if created else -1, rebuild_missing=created)
+
+
+@receiver(post_save, sender=EmailProcessingLog)
+@receiver(post_delete, sender=EmailProcessingLog)
+def count_processed_email(sender, instance, created=False, signal=None, **kwargs):
+    if created or signal is post_delete:
+        pipeline_counters.increment(instance.user_id, 'emails_processed', 1 if created else -1, rebuild_missing=created)
+
+
+# =============================================================================
+# DASHBOARD STATS CACHE
+# =============================================================================
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+@receiver(post_save, sender=UserNotification)
+@receiver(post_delete, sender=UserNotification)
+def invalidate_stats_for_user(sender, instance, **kwargs):
+    """Drop the cached dashboard stats when a user's applications or notifications change"""
+    dashboard_stats.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=FollowUpHistory)
+@receiver(post_delete, sender=FollowUpHistory)
+def update_follow_up_stats(sender, instance, created=False, signal=None, **kwargs):
+    """Count sent follow-ups and drop the cached dashboard stats"""
+    user_id = _application_user_id(instance)
+    if not user_id:
+        return
+    if created or signal is post_delete:
+        pipeline_counters.increment(user_id, 'follow_ups_sent', 1 if created else -1, rebuild_missing=created)
+    dashboard_stats.invalidate(user_id)
+
+
+# =============================================================================
+# DASHBOARD CONTEXT CACHE
+# =============================================================================
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+@receiver(post_save, sender=EmailProcessingLog)
+@receiver(post_delete, sender=EmailProcessingLog)
+@receiver(post_save, sender=FollowUpTemplate)
+@receiver(post_delete, sender=FollowUpTemplate)
+def bump_dashboard_version(sender, instance, **kwargs):
+    """Drop every cached dashboard page for the user whose data changed"""
+    dashboard_fragments.bump(instance.user_id)
+
+
+@receiver(post_save, sender=FollowUpHistory)
+@receiver(post_delete, sender=FollowUpHistory)
+@receiver(post_save, sender=GeneratedDocument)
+@receiver(post_delete, sender=GeneratedDocument)
+def bump_dashboard_version_for_application(sender, instance, **kwargs):
+    user_id = _application_user_id(instance)
+    if user_id:
+        dashboard_fragments.bump(user_id)
@@ -0,0 +1,137 @@
+# dashboard/stats.py - AGGREGATED DASHBOARD STATISTICS
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from documents.models import GeneratedDocument
+from job_automation.caching import get_or_set
+from followups.models import FollowUpHistory
+from jobs.models import JobApplication
+from .counters import pipeline_counters
+from .models import UserNotification
+
+logger = logging.getLogger(__name__)
+
+# Every status any dashboard endpoint reports on
+PIPELINE_STATUSES = ['discovered', 'found', 'applied', 'responded', 'interview', 'offer', 'hired', 'rejected']
+FOLLOW_UP_STATUSES = ['applied', 'responded']
+TREND_DAYS = 7
+
+
+class DashboardStatsService:
+    """
+    Dashboard statistics for one user. Totals come from the UserPipelineCounters row,
+    time-windowed numbers from conditional aggregation (one grouped query per activity trend),
+    and the result is cached per user until a JobApplication or FollowUpHistory changes.
+    """
+
+    def __init__(self):
+        self.cache_timeout = getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def cache_key(user_id):
+        return f'dashboard_stats:{user_id}'
+
+    def get_stats(self, user, use_cache=True):
+        """Return the cached stats for a user, computing them on a miss (one worker per miss)"""
+        key = self.cache_key(user.id)
+        if not use_cache:
+            self.invalidate(user.id)
+        return get_or_set(key, lambda: self.compute_stats(user), timeout=self.cache_timeout, alias='stats')
+
+    def invalidate(self, user_id):
+        caches['stats'].delete(self.cache_key(user_id))
+
+    def compute_stats(self, user):
+        now = timezone.now()
+        today = timezone.localdate()
+        week_ago = now - timedelta(days=7)
+        month_ago = now - timedelta(days=30)
+        trend_start = today - timedelta(days=TREND_DAYS - 1)
+
+        applications = JobApplication.objects.filter(user=user)
+        counters = pipeline_counters.get(user)  # Totals per status - one primary-key lookup
+
+        # 1. Time-windowed counters, bounded by the (user, created_at) index
+        recent = applications.filter(created_at__gte=month_ago).aggregate(
+            today=Count('id', filter=Q(created_at__date=today)),
+            this_week=Count('id', filter=Q(created_at__gte=week_ago)),
+            this_month=Count('id'),
+        )
+        follow_ups_due = applications.filter(
+            application_status__in=FOLLOW_UP_STATUSES,
+            next_follow_up_date__lte=today
+        ).aggregate(
+            due=Count('id'),
+            overdue=Count('id', filter=Q(next_follow_up_date__lt=today))
+        )
+
+        # 2. Per-day trends, grouped in the database
+        application_days = dict(
+            applications.filter(created_at__date__gte=trend_start)
+            .annotate(day=TruncDate('created_at'))
+            .values('day').annotate(count=Count('id'))
+            .values_list('day', 'count')
+        )
+        user_followups = FollowUpHistory.objects.filter(application__user=user)
+        followup_days = dict(
+            user_followups.filter(sent_date__date__gte=trend_start)
+            .annotate(day=TruncDate('sent_date'))
+            .values('day').annotate(count=Count('id'))
+            .values_list('day', 'count')
+        )
+
+        # 3. Recent documents and notifications - one aggregate each
+        recent_documents = GeneratedDocument.objects.filter(
+            application__user=user, generated_at__gte=week_ago
+        ).count()
+        notifications = UserNotification.objects.filter(user=user, is_read=False).aggregate(
+            unread=Count('id', filter=Q(is_dismissed=False)),
+            urgent=Count('id', filter=Q(priority='urgent'))
+        )
+
+        trend = []
+        for offset in range(TREND_DAYS):
+            day = trend_start + timedelta(days=offset)
+            trend.append({
+                'date': day.isoformat(),
+                'applications': application_days.get(day, 0),
+                'followups': followup_days.get(day, 0),
+            })
+
+        pipeline = {status: counters.status_count(status) for status in PIPELINE_STATUSES}
+        responded = pipeline['responded'] + pipeline['interview'] + pipeline['offer']
+        total = counters.total_applications
+
+        return {
+            'applications': {
+                'total': total,
+                'today': recent['today'],
+                'this_week': recent['this_week'],
+                'this_month': recent['this_month'],
+                'extension': counters.extension_jobs,
+            },
+            'pipeline': pipeline,
+            'response_rate': (responded / pipeline['applied'] * 100) if pipeline['applied'] > 0 else 0,
+            'follow_ups': {
+                'due_today': follow_ups_due['due'],
+                'overdue': follow_ups_due['overdue'],
+                'total_sent': counters.follow_ups_sent,
+            },
+            'documents': {
+                'total': counters.documents_generated,
+                'recent': recent_documents,
+                'avg_per_application': counters.documents_generated / max(total, 1),
+            },
+            'activity_trend': trend,
+            'notifications': notifications,
+        }
+
+
+# Singleton instance
+dashboard_stats = DashboardStatsService()
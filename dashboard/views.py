@@ -1,24 +1,21 @@
 import os
 import json
 import os
-import zipfile
 from datetime import date
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
-from io import BytesIO
 
 import openai
-import requests
-from celery import canvas
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
-from django.db.models import Avg, Count, Q
+from django.db.models import Count, Q
 from django.http import HttpResponse
 from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 # ADD THESE IMPORTS TO dashboard/views.py
 from django.shortcuts import get_object_or_404, redirect
 # Add these imports at the top if not already present
@@ -29,14 +26,19 @@ from django.views.generic import TemplateView, View
 
 from accounts.models import UserProfile
 from api.exceptions import logger
+from documents.archive import stream_documents_zip
 from documents.models import GeneratedDocument
 from followups.models import FollowUpHistory
 from job_automation import settings
+from job_automation.http_client import http_client
 from jobs.models import EmailProcessingLog, EmailSettings
 from jobs.models import JobApplication
 from jobs.models import JobSearchConfig
 from .forms import QuickSearchForm
+from .fragments import CachedContextMixin
+from .email_stats import email_analytics
 from .models import UserNotification, DashboardSettings, DashboardActivity
+from .stats import dashboard_stats
 
 
 
@@ -112,53 +114,20 @@ class EmailSettingsView(LoginRequiredMixin, TemplateView):
 
     def get_email_stats(self):
         """Get email processing statistics"""
-        user = self.request.user
-        logs = EmailProcessingLog.objects.filter(user=user)
-
-        # Recent activity (last 24 hours)
-        recent_logs = logs.filter(
-            created_at__gte=timezone.now() - timedelta(hours=24)
-        )
-
+        summary = email_analytics.get_summary(self.request.user)
         return {
-            'total_processed': logs.count(),
-            'jobs_found': logs.filter(
-                processing_result='success',
-                email_type='job_alert'
-            ).count(),
-            'interviews_detected': logs.filter(
-                processing_result='success',
-                email_type='interview_invite'
-            ).count(),
-            'success_rate': self.calculate_success_rate(logs),
-            'this_week': logs.filter(
-                created_at__gte=timezone.now() - timedelta(days=7)
-            ).count(),
-            'failed_processing': logs.filter(
-                processing_result='failed'
-            ).count(),
-            'avg_confidence': logs.aggregate(
-                avg_confidence=Avg('confidence_score')
-            )['avg_confidence'] or 0,
-            'recent_activity': recent_logs.count(),
-            'jobs_today': recent_logs.filter(
-                email_type='job_alert',
-                processing_result='success'
-            ).count(),
-            'interviews_today': recent_logs.filter(
-                email_type='interview_invite',
-                processing_result='success'
-            ).count(),
+            'total_processed': summary['total'],
+            'jobs_found': summary['jobs_found'],
+            'interviews_detected': summary['interviews_detected'],
+            'success_rate': summary['success_rate'],
+            'this_week': summary['this_week'],
+            'failed_processing': summary['failed'],
+            'avg_confidence': summary['avg_confidence'],
+            'recent_activity': summary['recent'],
+            'jobs_today': summary['jobs_today'],
+            'interviews_today': summary['interviews_today'],
         }
 
-    def calculate_success_rate(self, logs):
-        """Calculate email processing success rate"""
-        total = logs.count()
-        if total == 0:
-            return 100.0
-        successful = logs.filter(processing_result='success').count()
-        return round((successful / total) * 100, 1)
-
     def get_recent_emails(self):
         """Get recent processed emails"""
         return EmailProcessingLog.objects.filter(
@@ -167,29 +136,7 @@ class EmailSettingsView(LoginRequiredMixin, TemplateView):
 
     def get_processing_chart_data(self):
         """Get data for email processing chart"""
-        logs = EmailProcessingLog.objects.filter(
-            user=self.request.user,
-            created_at__gte=timezone.now() - timedelta(days=30)
-        )
-
-        # Group by day
-        daily_stats = {}
-        for i in range(30):
-            day = timezone.now().date() - timedelta(days=i)
-            daily_stats[day.strftime('%Y-%m-%d')] = {
-                'jobs': 0, 'interviews': 0, 'total': 0
-            }
-
-        for log in logs:
-            day = log.created_at.date().strftime('%Y-%m-%d')
-            if day in daily_stats:
-                daily_stats[day]['total'] += 1
-                if log.email_type == 'job_alert' and log.processing_result == 'success':
-                    daily_stats[day]['jobs'] += 1
-                elif log.email_type == 'interview_invite' and log.processing_result == 'success':
-                    daily_stats[day]['interviews'] += 1
-
-        return daily_stats
+        return email_analytics.get_daily(self.request.user)
 
     def get_setup_completion_status(self):
         """Get email setup completion status"""
@@ -300,6 +247,8 @@ class EmailLogView(LoginRequiredMixin, TemplateView):
                 Q(email_body_preview__icontains=search)
             )
 
+        stats = self.get_log_stats(logs, email_type, result, days, search)
+
         # Pagination
         paginator = Paginator(logs.order_by('-created_at'), 25)
         page_number = self.request.GET.get('page')
@@ -314,39 +263,14 @@ class EmailLogView(LoginRequiredMixin, TemplateView):
             'search_query': search,
             'email_types': EmailProcessingLog.EMAIL_TYPES,
             'processing_results': EmailProcessingLog.PROCESSING_RESULTS,
-            'stats': self.get_log_stats(logs),
-            'total_count': logs.count(),
+            'stats': stats,
+            'total_count': stats['total'],
         })
         return context
 
-    def get_log_stats(self, logs):
+    def get_log_stats(self, logs, *filters):
         """Get statistics for filtered logs"""
-        total = logs.count()
-        if total == 0:
-            return {
-                'total': 0,
-                'success': 0,
-                'failed': 0,
-                'manual_review': 0,
-                'success_rate': 0,
-                'avg_confidence': 0,
-                'avg_processing_time': 0,
-            }
-
-        stats = logs.aggregate(
-            success=Count('id', filter=Q(processing_result='success')),
-            failed=Count('id', filter=Q(processing_result='failed')),
-            manual_review=Count('id', filter=Q(processing_result='manual_review')),
-            avg_confidence=Avg('confidence_score'),
-            avg_processing_time=Avg('processing_time')
-        )
-
-        stats['total'] = total
-        stats['success_rate'] = round((stats['success'] / total) * 100, 1) if total > 0 else 0
-        stats['avg_confidence'] = round(stats['avg_confidence'] or 0, 1)
-        stats['avg_processing_time'] = round(stats['avg_processing_time'] or 0, 3)
-
-        return stats
+        return email_analytics.get_log_stats(self.request.user, logs, *filters)
 
 
 # API Views for AJAX requests
@@ -354,45 +278,22 @@ class EmailStatsAPIView(LoginRequiredMixin, View):
     """API endpoint for real-time email stats"""
 
     def get(self, request):
-        user = request.user
-        logs = EmailProcessingLog.objects.filter(user=user)
-
-        # Get recent activity (last 24 hours)
-        recent_logs = logs.filter(
-            created_at__gte=timezone.now() - timedelta(hours=24)
-        )
+        summary = email_analytics.get_summary(request.user)
+        last_processed = summary['last_processed']
 
         stats = {
-            'total_processed': logs.count(),
-            'recent_activity': recent_logs.count(),
-            'jobs_found_today': recent_logs.filter(
-                email_type='job_alert',
-                processing_result='success'
-            ).count(),
-            'interviews_today': recent_logs.filter(
-                email_type='interview_invite',
-                processing_result='success'
-            ).count(),
-            'success_rate': self.calculate_success_rate(recent_logs),
-            'last_processed': logs.first().created_at.isoformat() if logs.exists() else None,
-            'failed_today': recent_logs.filter(
-                processing_result='failed'
-            ).count(),
-            'avg_confidence': logs.aggregate(
-                avg_confidence=Avg('confidence_score')
-            )['avg_confidence'] or 0,
+            'total_processed': summary['total'],
+            'recent_activity': summary['recent'],
+            'jobs_found_today': summary['jobs_today'],
+            'interviews_today': summary['interviews_today'],
+            'success_rate': summary['recent_success_rate'],
+            'last_processed': last_processed.isoformat() if last_processed else None,
+            'failed_today': summary['recent_failed'],
+            'avg_confidence': summary['avg_confidence'],
         }
 
         return JsonResponse(stats)
 
-    def calculate_success_rate(self, logs):
-        """Calculate success rate"""
-        total = logs.count()
-        if total == 0:
-            return 100.0
-        successful = logs.filter(processing_result='success').count()
-        return round((successful / total) * 100, 1)
-
 
 class RecentEmailsAPIView(LoginRequiredMixin, View):
     """API endpoint for recent emails"""
@@ -829,7 +730,7 @@ class MarketIntelligenceView(LoginRequiredMixin, TemplateView):
             }
 
             # Call n8n webhook to get market data
-            response = requests.post(
+            response = http_client.post(
                 f"{settings.N8N_WEBHOOK_URL}/market-intelligence",
                 json=webhook_data,
                 headers={'Authorization': f'Bearer {settings.N8N_API_TOKEN}'}
@@ -998,13 +899,16 @@ class MarketIntelligenceView(LoginRequiredMixin, TemplateView):
                 ]
             }
 
-class WeeklyReportView(LoginRequiredMixin, TemplateView):
+class WeeklyReportView(LoginRequiredMixin, CachedContextMixin, TemplateView):
     """Weekly performance report"""
     template_name = 'dashboard/weekly_report.html'
+    cached_context_name = 'weekly_report'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
+    def cached_context_parts(self):
+        return (timezone.now().date().isoformat(),)
+
+    def build_cached_context(self, user):
+        context = {}
 
         # Calculate week boundaries
         today = timezone.now().date()
@@ -1066,8 +970,8 @@ class WeeklyReportView(LoginRequiredMixin, TemplateView):
             'changes': changes,
             'goals': goals,
             'achievements': achievements,
-            'weekly_applications': this_week_apps.order_by('-created_at'),
-            'top_companies': self._get_top_companies(this_week_apps),
+            'weekly_applications': list(this_week_apps.order_by('-created_at')),
+            'top_companies': list(self._get_top_companies(this_week_apps)),
         })
 
         return context
@@ -1109,19 +1013,12 @@ class BulkDocumentDownloadView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get user's applications with documents
-        applications = JobApplication.objects.filter(
+        # Get user's applications with documents (counted in the same query)
+        applications_with_docs = JobApplication.objects.filter(
             user=self.request.user
-        ).order_by('-created_at')
-
-        # Count documents for each application
-        for app in applications:
-            app.document_count = GeneratedDocument.objects.filter(
-                application=app
-            ).count()
-
-        # Filter to only show applications with documents
-        applications_with_docs = [app for app in applications if app.document_count > 0]
+        ).annotate(
+            document_count=Count('generateddocument')
+        ).filter(document_count__gt=0).order_by('-created_at')
 
         # Group documents by type
         document_types = GeneratedDocument.objects.filter(
@@ -1195,171 +1092,62 @@ class BulkDocumentDownloadView(LoginRequiredMixin, TemplateView):
             messages.error(request, f'Error processing download: {str(e)}')
             return redirect('dashboard:bulk_download')
 
-    def _download_all_documents(self):
-        """Download all documents for the user"""
-        try:
-            documents = GeneratedDocument.objects.filter(
-                application__user=self.request.user
-            )
+    def _stream_documents(self, documents, filename, empty_message):
+        """Stream the documents as a ZIP built on the fly"""
+        if not documents.exists():
+            messages.error(self.request, empty_message)
+            return redirect('dashboard:bulk_download')
 
-            if not documents.exists():
-                messages.error(self.request, 'No documents found to download.')
-                return redirect('dashboard:bulk_download')
+        response = StreamingHttpResponse(stream_documents_zip(documents), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-            # Create a zip file
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for document in documents:
-                    filename = f"{document.application.company_name}_{document.application.job_title}_{document.document_type}.pdf".replace(
-                        ' ', '_')
-
-                    # Get the document content (assuming PDF)
-                    if document.file_path and os.path.exists(document.file_path):
-                        # File exists on disk
-                        with open(document.file_path, 'rb') as file:
-                            zip_file.writestr(filename, file.read())
-                    else:
-                        # Generate PDF from content
-                        pdf_content = self._generate_pdf_from_content(document.content)
-                        zip_file.writestr(filename, pdf_content)
-
-            # Prepare response
-            zip_buffer.seek(0)
-            response = HttpResponse(zip_buffer, content_type='application/zip')
-            response['Content-Disposition'] = f'attachment; filename="all_documents.zip"'
-
-            return response
+    def _user_documents(self):
+        return GeneratedDocument.objects.filter(application__user=self.request.user)
 
-        except Exception as e:
-            messages.error(self.request, f'Error creating zip file: {str(e)}')
-            return redirect('dashboard:bulk_download')
+    def _download_all_documents(self):
+        """Download all documents for the user"""
+        return self._stream_documents(
+            self._user_documents(),
+            'all_documents.zip',
+            'No documents found to download.'
+        )
 
-    # dashboard/views.py (Continue BulkDocumentDownloadView)
+    def _download_selected_applications(self, application_ids):
+        """Download documents for the selected applications"""
+        return self._stream_documents(
+            self._user_documents().filter(application_id__in=application_ids),
+            'selected_applications.zip',
+            'No documents found for the selected applications.'
+        )
 
     def _download_selected_document_types(self, document_types):
         """Download specific document types across all applications"""
-        try:
-            documents = GeneratedDocument.objects.filter(
-                application__user=self.request.user,
-                document_type__in=document_types
-            )
-
-            if not documents.exists():
-                messages.error(self.request, 'No documents found for the selected types.')
-                return redirect('dashboard:bulk_download')
-
-            # Create a zip file
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for document in documents:
-                    filename = f"{document.application.company_name}_{document.application.job_title}_{document.document_type}.pdf".replace(
-                        ' ', '_')
-
-                    # Get the document content (assuming PDF)
-                    if document.file_path and os.path.exists(document.file_path):
-                        # File exists on disk
-                        with open(document.file_path, 'rb') as file:
-                            zip_file.writestr(filename, file.read())
-                    else:
-                        # Generate PDF from content
-                        pdf_content = self._generate_pdf_from_content(document.content)
-                        zip_file.writestr(filename, pdf_content)
-
-            # Prepare response
-            zip_buffer.seek(0)
-            response = HttpResponse(zip_buffer, content_type='application/zip')
-            response['Content-Disposition'] = f'attachment; filename="selected_document_types.zip"'
-
-            return response
-
-        except Exception as e:
-            messages.error(self.request, f'Error creating zip file: {str(e)}')
-            return redirect('dashboard:bulk_download')
+        return self._stream_documents(
+            self._user_documents().filter(document_type__in=document_types),
+            'selected_document_types.zip',
+            'No documents found for the selected types.'
+        )
 
     def _download_date_range(self, start_date, end_date):
         """Download documents within a date range"""
-        try:
-            # Convert end_date to include the entire day
-            end_date = datetime.combine(end_date, time.max)
-
-            documents = GeneratedDocument.objects.filter(
-                application__user=self.request.user,
-                generated_at__gte=start_date,
-                generated_at__lte=end_date
-            )
-
-            if not documents.exists():
-                messages.error(self.request, 'No documents found in the specified date range.')
-                return redirect('dashboard:bulk_download')
-
-            # Create a zip file
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for document in documents:
-                    filename = f"{document.application.company_name}_{document.application.job_title}_{document.document_type}.pdf".replace(
-                        ' ', '_')
-
-                    # Get the document content (assuming PDF)
-                    if document.file_path and os.path.exists(document.file_path):
-                        # File exists on disk
-                        with open(document.file_path, 'rb') as file:
-                            zip_file.writestr(filename, file.read())
-                    else:
-                        # Generate PDF from content
-                        pdf_content = self._generate_pdf_from_content(document.content)
-                        zip_file.writestr(filename, pdf_content)
-
-            # Prepare response
-            zip_buffer.seek(0)
-            response = HttpResponse(zip_buffer, content_type='application/zip')
-            response[
-                'Content-Disposition'] = f'attachment; filename="documents_{start_date.strftime("%Y-%m-%d")}_to_{end_date.strftime("%Y-%m-%d")}.zip"'
-
-            return response
-
-        except Exception as e:
-            messages.error(self.request, f'Error creating zip file: {str(e)}')
-            return redirect('dashboard:bulk_download')
-
-    def _generate_pdf_from_content(self, content):
-        """Generate a PDF from text content"""
-        # Create a file-like buffer to receive PDF data
-        buffer = BytesIO()
-
-        # Create the PDF object using the buffer as its "file"
-        p = canvas.Canvas(buffer)
-
-        # Set up the PDF document
-        p.setFont("Helvetica", 12)
-
-        # Write the content to the PDF
-        y = 800  # Starting y position
-        for line in content.split('\n'):
-            if y < 50:  # If we're near the bottom of the page
-                p.showPage()  # Start a new page
-                p.setFont("Helvetica", 12)
-                y = 800  # Reset y position
-
-            p.drawString(50, y, line)
-            y -= 15  # Move down to the next line
-
-        # Close the PDF object cleanly
-        p.showPage()
-        p.save()
-
-        # Get the value of the BytesIO buffer and return it
-        buffer.seek(0)
-        return buffer.read()
+        # Convert end_date to include the entire day
+        end_date = datetime.combine(end_date, time.max)
 
+        return self._stream_documents(
+            self._user_documents().filter(generated_at__gte=start_date, generated_at__lte=end_date),
+            f'documents_{start_date.strftime("%Y-%m-%d")}_to_{end_date.strftime("%Y-%m-%d")}.zip',
+            'No documents found in the specified date range.'
+        )
 
 
-class PipelineVisualizationView(LoginRequiredMixin, TemplateView):
+class PipelineVisualizationView(LoginRequiredMixin, CachedContextMixin, TemplateView):
     """Enhanced pipeline visualization"""
     template_name = 'dashboard/pipeline_visualization.html'
+    cached_context_name = 'pipeline'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
+    def build_cached_context(self, user):
+        context = {}
 
         # Get pipeline data
         pipeline_stages = [
@@ -1388,10 +1176,10 @@ class PipelineVisualizationView(LoginRequiredMixin, TemplateView):
         # Get applications by stage for detailed view
         applications_by_stage = {}
         for stage in pipeline_stages:
-            applications_by_stage[stage] = JobApplication.objects.filter(
+            applications_by_stage[stage] = list(JobApplication.objects.filter(
                 user=user,
                 application_status=stage
-            ).order_by('-updated_at')[:5]  # Latest 5 per stage
+            ).order_by('-updated_at')[:5])  # Latest 5 per stage
 
         context.update({
             'pipeline_data': pipeline_data,
@@ -1465,8 +1253,12 @@ class ApplicationTimelineAPIView(LoginRequiredMixin, View):
             })
 
         return JsonResponse({'timeline': timeline_data})
-class DashboardView(LoginRequiredMixin, TemplateView):
+class DashboardView(LoginRequiredMixin, CachedContextMixin, TemplateView):
     template_name = 'dashboard/dashboard.html'
+    cached_context_name = 'dashboard'
+
+    def cached_context_parts(self):
+        return (timezone.localdate().isoformat(),)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1476,6 +1268,16 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         profile, created = UserProfile.objects.get_or_create(user=user)
         context['profile'] = profile
 
+        # Search configurations
+        context['search_configs'] = JobSearchConfig.objects.filter(
+            user=user, is_active=True
+        )
+
+        return context
+
+    def build_cached_context(self, user):
+        context = {}
+
         # Application statistics
         applications = JobApplication.objects.filter(user=user)
         context['total_applications'] = applications.count()
@@ -1501,14 +1303,14 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         # Applications by status for pipeline
         context['pipeline_data'] = {
             'found': applications.filter(application_status='found').count(),
-            'applied': applications.filter(application_status='applied').count(),
+            'applied': applied_count,
             'responded': applications.filter(application_status='responded').count(),
-            'interview': applications.filter(application_status='interview').count(),
+            'interview': context['interviews_scheduled'],
             'offer': applications.filter(application_status='offer').count(),
         }
 
         # Recent applications
-        context['recent_applications'] = applications.order_by('-created_at')[:5]
+        context['recent_applications'] = list(applications.order_by('-created_at')[:5])
 
         # Due follow-ups
 
@@ -1517,20 +1319,18 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             application_status__in=['applied', 'responded']
         ).count()
 
-        # Search configurations
-        context['search_configs'] = JobSearchConfig.objects.filter(
-            user=user, is_active=True
-        )
-
         return context
 
 
-class AnalyticsView(LoginRequiredMixin, TemplateView):
+class AnalyticsView(LoginRequiredMixin, CachedContextMixin, TemplateView):
     template_name = 'dashboard/analytics.html'
+    cached_context_name = 'analytics'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
+    def cached_context_parts(self):
+        return (timezone.localdate().isoformat(),)
+
+    def build_cached_context(self, user):
+        context = {}
 
         # Monthly application trends
         applications = JobApplication.objects.filter(user=user)
@@ -1616,7 +1416,7 @@ class QuickSearchView(LoginRequiredMixin, TemplateView):
                 }
 
                 # Send to n8n webhook
-                response = requests.post(
+                response = http_client.post(
                     f"{settings.N8N_WEBHOOK_URL}/job-search",
                     json=webhook_data,
                     headers={'Authorization': f'Bearer {settings.N8N_API_TOKEN}'}
@@ -1963,47 +1763,23 @@ class DashboardAPIView(LoginRequiredMixin, View):
 
     def get(self, request):
         try:
-            # Get fresh dashboard statistics
-            applications = JobApplication.objects.filter(user=request.user)
+            # Shared aggregated statistics (cached per user)
+            shared = dashboard_stats.get_stats(request.user)
+            pipeline = shared['pipeline']
 
             # Basic stats
             stats = {
-                'total_applications': applications.count(),
-                'applications_this_week': applications.filter(
-                    created_at__gte=timezone.now() - timedelta(days=7)
-                ).count(),
-                'applications_this_month': applications.filter(
-                    created_at__gte=timezone.now() - timedelta(days=30)
-                ).count(),
-            }
-
-            # Response rate
-            applied_count = applications.filter(application_status='applied').count()
-            responded_count = applications.filter(
-                application_status__in=['responded', 'interview', 'offer']
-            ).count()
-            stats['response_rate'] = (responded_count / applied_count * 100) if applied_count > 0 else 0
-
-            # Interview statistics
-            stats['interviews_scheduled'] = applications.filter(
-                application_status='interview'
-            ).count()
-
-            # Pipeline data
-            stats['pipeline_data'] = {
-                'found': applications.filter(application_status='found').count(),
-                'applied': applications.filter(application_status='applied').count(),
-                'responded': applications.filter(application_status='responded').count(),
-                'interview': applications.filter(application_status='interview').count(),
-                'offer': applications.filter(application_status='offer').count(),
+                'total_applications': shared['applications']['total'],
+                'applications_this_week': shared['applications']['this_week'],
+                'applications_this_month': shared['applications']['this_month'],
+                'response_rate': shared['response_rate'],
+                'interviews_scheduled': pipeline['interview'],
+                'pipeline_data': {
+                    status: pipeline[status] for status in ['found', 'applied', 'responded', 'interview', 'offer']
+                },
+                'due_followups': shared['follow_ups']['due_today'],
             }
 
-            # Due follow-ups
-            stats['due_followups'] = applications.filter(
-                next_follow_up_date__lte=timezone.now().date(),
-                application_status__in=['applied', 'responded']
-            ).count()
-
             # Recent activity
             recent_activity = DashboardActivity.objects.filter(
                 user=request.user
@@ -2018,14 +1794,7 @@ class DashboardAPIView(LoginRequiredMixin, View):
                 for activity in recent_activity
             ]
 
-            # Unread notifications
-            unread_notifications = UserNotification.objects.filter(
-                user=request.user,
-                is_read=False,
-                is_dismissed=False
-            ).count()
-
-            stats['unread_notifications'] = unread_notifications
+            stats['unread_notifications'] = shared['notifications']['unread']
 
             return JsonResponse({
                 'success': True,
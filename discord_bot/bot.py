@@ -1,9 +1,6 @@
 import discord
 from discord.ext import commands
-import requests
-import json
 import os
-import asyncio
 import sys
 from pathlib import Path
 import logging
@@ -17,10 +14,10 @@ import django
 
 django.setup()
 
-# Import Django models after setup
-from django.contrib.auth.models import User
-from jobs.models import JobApplication, JobSearchConfig
-from accounts.models import UserProfile
+# Import the data layer after setup - every ORM and HTTP call in the bot goes through it
+from discord_bot.utils.django_integration import (
+    bot_http, get_or_create_user, get_user_by_discord_id, start_job_search, update_search_status
+)
 
 # Configure logging
 logging.basicConfig(
@@ -38,10 +35,19 @@ BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN')
 DJANGO_API_URL = os.getenv('DJANGO_API_URL', 'http://localhost:8000')
 N8N_WEBHOOK_URL = os.getenv('N8N_WEBHOOK_URL', 'http://localhost:5678/webhook')
 
+
+class JobBot(commands.Bot):
+    """Closes the data layer's HTTP session along with the gateway connection"""
+
+    async def close(self):
+        await bot_http.close()
+        await super().close()
+
+
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = JobBot(command_prefix='!', intents=intents)
 
 
 @bot.event
@@ -120,7 +126,14 @@ Software Engineer, Data Analyst, AI Engineer, Backend Developer""",
     try:
         result = await start_job_search(user_id, categories, message, ctx)
         if result:
-            await update_search_status(message, "✅ Search completed! Check your dashboard.", 0x28a745)
+            embed = message.embeds[0]
+            embed.add_field(
+                name="🌐 View Results",
+                value=f"[Dashboard]({DJANGO_API_URL}/dashboard/) • [Applications]({DJANGO_API_URL}/jobs/applications/)",
+                inline=False
+            )
+            await message.edit(embed=embed)
+            await update_search_status(message, "✅ Search started! Results will appear on your dashboard.", 0x28a745)
         else:
             await update_search_status(message, "❌ Search failed! Please try again.", 0xdc3545)
     except Exception as e:
@@ -128,121 +141,6 @@ Software Engineer, Data Analyst, AI Engineer, Backend Developer""",
         await update_search_status(message, "❌ Search error! Please try again.", 0xdc3545)
 
 
-# Helper functions
-async def get_user_by_discord_id(discord_id):
-    """Get Django user by Discord ID"""
-    try:
-        profile = UserProfile.objects.filter(discord_user_id=str(discord_id)).first()
-        return profile.user if profile else None
-    except Exception as e:
-        logger.error(f"Error getting user by Discord ID: {e}")
-        return None
-
-
-async def get_or_create_user(discord_user):
-    """Get or create Django user from Discord user"""
-    try:
-        # Check if user exists
-        existing_user = await get_user_by_discord_id(discord_user.id)
-        if existing_user:
-            return existing_user.id
-
-        # Create new user
-        username = f"discord_{discord_user.id}"
-        email = f"{discord_user.name}@discord.user"
-
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            first_name=discord_user.display_name or discord_user.name
-        )
-
-        # Create profile
-        UserProfile.objects.create(
-            user=user,
-            discord_user_id=str(discord_user.id)
-        )
-
-        logger.info(f"Created new user for Discord ID: {discord_user.id}")
-        return user.id
-
-    except Exception as e:
-        logger.error(f"Error creating user: {e}")
-        return None
-
-
-async def start_job_search(user_id, categories, message, ctx):
-    """Start job search via Django integration"""
-    try:
-        # Update status
-        await update_search_status(message, "🔍 Searching job platforms...", 0xffc107)
-
-        # Get or create default search config
-        user = User.objects.get(id=user_id)
-
-        config, created = JobSearchConfig.objects.get_or_create(
-            user=user,
-            config_name="Discord Bot Search",
-            defaults={
-                'job_categories': categories,
-                'target_locations': ['remote', 'toronto_on', 'vancouver_bc'],
-                'remote_preference': 'remote',
-                'salary_min': 60000,
-                'salary_max': 150000,
-                'auto_follow_up_enabled': True,
-                'is_active': True
-            }
-        )
-
-        # Update categories for existing config
-        config.job_categories = categories
-        config.save()
-
-        await update_search_status(message, "📄 Generating sample jobs...", 0x17a2b8)
-
-        # Create sample jobs for demo (replace with real n8n integration)
-        from jobs.management.commands.create_sample_jobs import Command
-        sample_command = Command()
-
-        # Simulate delay
-        await asyncio.sleep(2)
-
-        await update_search_status(message, "✅ Search completed! Check your dashboard.", 0x28a745)
-
-        # Add dashboard link
-        embed = message.embeds[0]
-        embed.add_field(
-            name="🌐 View Results",
-            value=f"[Dashboard]({DJANGO_API_URL}/dashboard/) • [Applications]({DJANGO_API_URL}/jobs/applications/)",
-            inline=False
-        )
-        await message.edit(embed=embed)
-
-        return True
-
-    except Exception as e:
-        logger.error(f"Job search error: {e}")
-        return False
-
-
-async def update_search_status(message, status, color):
-    """Update job search status embed"""
-    try:
-        embed = message.embeds[0]
-        embed.color = color
-
-        # Update status field
-        for i, field in enumerate(embed.fields):
-            if field.name == "⏰ Status":
-                embed.set_field_at(i, name="⏰ Status", value=status, inline=True)
-                break
-
-        embed.timestamp = discord.utils.utcnow()
-        await message.edit(embed=embed)
-    except Exception as e:
-        logger.error(f"Error updating status: {e}")
-
-
 def create_error_embed(title, description):
     """Create a standardized error embed"""
     return discord.Embed(
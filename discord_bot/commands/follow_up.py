@@ -1,7 +1,14 @@
 import discord
 from discord.ext import commands
-import requests
+import asyncio
 import logging
+from datetime import date
+
+from discord_bot.bot import bot, create_error_embed
+from discord_bot.utils.django_integration import (
+    find_followup_application, get_default_template, get_due_followups, get_user_by_discord_id,
+    queue_bulk_followups, queue_followup
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,13 +37,8 @@ async def followup_command(ctx, *, company_name=None):
 async def send_bulk_followups(ctx, user):
     """Send bulk follow-up emails"""
     try:
-        from datetime import date
         # Get applications that need follow-up
-        due_applications = JobApplication.objects.filter(
-            user=user,
-            next_follow_up_date__lte=date.today(),
-            application_status__in=['applied', 'responded']
-        )
+        due_applications = await get_due_followups(user)
 
         if not due_applications:
             embed = discord.Embed(
@@ -76,17 +78,11 @@ async def send_bulk_followups(ctx, user):
 
             if str(reaction.emoji) == "✅":
                 # Send follow-ups via Celery task
-                from followups.tasks import send_bulk_followup_emails
                 app_ids = [app.id for app in due_applications]
-
-                # Get default template
-                from followups.models import FollowUpTemplate
-                template = FollowUpTemplate.objects.filter(
-                    user=user, is_default=True, is_active=True
-                ).first()
+                template = await get_default_template(user)
 
                 if template:
-                    send_bulk_followup_emails.delay(app_ids, template.id)
+                    await queue_bulk_followups(app_ids, template.id)
 
                     success_embed = discord.Embed(
                         title="✅ Follow-ups Sent!",
@@ -121,13 +117,9 @@ async def send_specific_followup(ctx, user, company_name):
     """Send follow-up to specific company"""
     try:
         # Find application for company
-        applications = JobApplication.objects.filter(
-            user=user,
-            company_name__icontains=company_name,
-            application_status__in=['applied', 'responded']
-        )
+        app = await find_followup_application(user, company_name)
 
-        if not applications:
+        if not app:
             embed = discord.Embed(
                 title="❌ Company Not Found",
                 description=f"No applications found for companies matching '{company_name}'",
@@ -136,18 +128,11 @@ async def send_specific_followup(ctx, user, company_name):
             await ctx.send(embed=embed)
             return
 
-        app = applications.first()
-
         # Send follow-up via Celery task
-        from followups.tasks import send_followup_email
-        from followups.models import FollowUpTemplate
-
-        template = FollowUpTemplate.objects.filter(
-            user=user, is_default=True, is_active=True
-        ).first()
+        template = await get_default_template(user)
 
         if template:
-            send_followup_email.delay(app.id, template.id)
+            await queue_followup(app.id, template.id)
 
             embed = discord.Embed(
                 title="📧 Follow-up Sent!",
@@ -173,12 +158,7 @@ async def due_followups_command(ctx):
             await ctx.send("❌ Profile not found.")
             return
 
-        from datetime import date
-        due_apps = JobApplication.objects.filter(
-            user=user,
-            next_follow_up_date__lte=date.today(),
-            application_status__in=['applied', 'responded']
-        )
+        due_apps = await get_due_followups(user)
 
         if not due_apps:
             embed = discord.Embed(
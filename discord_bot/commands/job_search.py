@@ -1,9 +1,10 @@
 import discord
 from discord.ext import commands
-import requests
-import asyncio
 import logging
 
+from discord_bot.bot import DJANGO_API_URL, bot
+from discord_bot.utils.django_integration import get_active_configs, get_recent_applications, get_user_by_discord_id
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +28,7 @@ async def status_command(ctx):
             return
 
         # Get user applications
-        applications = JobApplication.objects.filter(user=user).order_by('-created_at')[:15]
+        applications = await get_recent_applications(user, limit=15)
 
         if not applications:
             embed = discord.Embed(
@@ -105,7 +106,7 @@ async def configs_command(ctx):
             await ctx.send("❌ Profile not found. Use `!search` to get started.")
             return
 
-        configs = JobSearchConfig.objects.filter(user=user, is_active=True)
+        configs = await get_active_configs(user)
 
         if not configs:
             embed = discord.Embed(
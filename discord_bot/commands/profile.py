@@ -2,9 +2,8 @@ import discord
 from discord.ext import commands
 import logging
 
-from accounts.models import UserProfile
-from discord_bot.bot import DJANGO_API_URL, get_user_by_discord_id, bot
-from jobs.models import JobApplication
+from discord_bot.bot import DJANGO_API_URL, bot
+from discord_bot.utils.django_integration import get_application_stats, get_user_by_discord_id
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +27,9 @@ async def profile_command(ctx):
             await ctx.send(embed=embed)
             return
 
-        try:
-            profile = UserProfile.objects.get(user=user)
-        except UserProfile.DoesNotExist:
+        # Loaded with the user by the data layer - no query here
+        profile = getattr(user, 'userprofile', None)
+        if profile is None:
             await ctx.send("❌ Profile data not found. Please complete your profile on the web dashboard.")
             return
 
@@ -97,19 +96,18 @@ async def stats_command(ctx):
             await ctx.send("❌ Profile not found.")
             return
 
-        # Get statistics
-        applications = JobApplication.objects.filter(user=user)
-        total_apps = applications.count()
+        # Get statistics - one aggregate query
+        stats = await get_application_stats(user)
+        total_apps = stats['total']
 
         if total_apps == 0:
             await ctx.send("📊 No statistics yet. Start by using `!search` to find jobs!")
             return
 
-        # Calculate stats
-        applied_count = applications.filter(application_status='applied').count()
-        responded_count = applications.filter(application_status__in=['responded', 'interview', 'offer']).count()
-        interview_count = applications.filter(application_status='interview').count()
-        offer_count = applications.filter(application_status='offer').count()
+        applied_count = stats['applied']
+        responded_count = stats['responded']
+        interview_count = stats['interviews']
+        offer_count = stats['offers']
 
         response_rate = (responded_count / applied_count * 100) if applied_count > 0 else 0
 
@@ -126,9 +124,7 @@ async def stats_command(ctx):
         embed.add_field(name="📈 Response Rate", value=f"{response_rate:.1f}%", inline=True)
 
         # Recent activity
-        from datetime import datetime, timedelta
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_apps = applications.filter(created_at__gte=week_ago).count()
+        recent_apps = stats['this_week']
 
         embed.add_field(
             name="📅 This Week",
@@ -1,46 +1,180 @@
-import discord
-import requests
+# discord_bot/utils/django_integration.py - ASYNC DATA LAYER FOR THE DISCORD BOT
+# aiohttp and discord are imported where they are used, so the data layer also loads
+# (and is tested) in the web/worker environment, which doesn't install the bot's packages
+import functools
 import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
 from accounts.models import UserProfile
+from jobs.models import JobApplication, JobSearchConfig
 
 logger = logging.getLogger(__name__)
 
+DB_WORKERS = int(os.getenv('DISCORD_DB_WORKERS', '8'))
+USER_CACHE_TTL = int(os.getenv('DISCORD_USER_CACHE_TTL', '300'))
+USER_CACHE_SIZE = int(os.getenv('DISCORD_USER_CACHE_SIZE', '2048'))
+HTTP_TIMEOUT = int(os.getenv('DISCORD_HTTP_TIMEOUT', '30'))
+
+FOLLOW_UP_STATUSES = ['applied', 'responded']
+
+# ORM work runs here so a slow query never blocks the event loop for other guilds
+_db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix='discord-db')
+
+
+def database_sync_to_async(func):
+    """
+    Make an ORM function awaitable. Calls run on the bot's database thread pool and
+    drop stale connections before and after, as a Django request would.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False, executor=_db_executor)
+
+
+# ------------------------------------------------------------------
+# Per-Discord-ID user cache
+# ------------------------------------------------------------------
+
+class DiscordUserCache:
+    """
+    discord id -> User (with userprofile loaded), LRU with a TTL. Only touched from the
+    event loop, so it needs no lock. Misses are not cached, so a profile linked on the
+    web dashboard is picked up on the next command.
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_entries=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._users = OrderedDict()
+
+    def get(self, discord_id):
+        entry = self._users.get(str(discord_id))
+        if entry is None:
+            return None
+        expires, user = entry
+        if expires < time.monotonic():
+            del self._users[str(discord_id)]
+            return None
+        self._users.move_to_end(str(discord_id))
+        return user
+
+    def set(self, discord_id, user):
+        self._users[str(discord_id)] = (time.monotonic() + self.ttl, user)
+        self._users.move_to_end(str(discord_id))
+        while len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+
+    def invalidate(self, discord_id=None):
+        if discord_id is None:
+            self._users.clear()
+        else:
+            self._users.pop(str(discord_id), None)
+
+
+user_cache = DiscordUserCache()
+
+
+# ------------------------------------------------------------------
+# Outbound HTTP
+# ------------------------------------------------------------------
+
+class BotHTTPClient:
+    """One keep-alive aiohttp session for the bot's outbound calls (discord.py already ships aiohttp)"""
+
+    def __init__(self, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self._session = None
+
+    def session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def post_json(self, url, payload, headers=None):
+        """POST payload as JSON; returns the response status"""
+        async with self.session().post(url, json=payload, headers=headers) as response:
+            await response.read()
+            return response.status
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+bot_http = BotHTTPClient()
+
+
+# ------------------------------------------------------------------
+# Users
+# ------------------------------------------------------------------
+
+@database_sync_to_async
+def _load_user(discord_id):
+    profile = UserProfile.objects.select_related('user').filter(discord_user_id=str(discord_id)).first()
+    return profile.user if profile else None
+
+
+@database_sync_to_async
+def _create_user(discord_id, name, display_name):
+    with transaction.atomic():
+        user, created = User.objects.get_or_create(
+            username=f"discord_{discord_id}",
+            defaults={'email': f"{name}@discord.user", 'first_name': display_name or name}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        profile, _ = UserProfile.objects.get_or_create(user=user, defaults={'discord_user_id': str(discord_id)})
+        if profile.discord_user_id != str(discord_id):
+            profile.discord_user_id = str(discord_id)
+            profile.save(update_fields=['discord_user_id'])
+    user.userprofile = profile
+    return user
+
 
 async def get_user_by_discord_id(discord_id):
-    """Get Django user by Discord ID"""
+    """Get Django user by Discord ID (cached per Discord ID)"""
+    user = user_cache.get(discord_id)
+    if user is not None:
+        return user
     try:
-        profile = UserProfile.objects.filter(discord_user_id=str(discord_id)).first()
-        return profile.user if profile else None
+        user = await _load_user(discord_id)
     except Exception as e:
         logger.error(f"Error getting user by Discord ID: {e}")
         return None
+    if user is not None:
+        user_cache.set(discord_id, user)
+    return user
 
 
 async def get_or_create_user(discord_user):
-    """Get or create Django user from Discord user"""
+    """Get or create Django user from Discord user; returns the user id"""
     try:
-        # Check if user exists
         existing_user = await get_user_by_discord_id(discord_user.id)
         if existing_user:
             return existing_user.id
 
-        # Create new user
-        username = f"discord_{discord_user.id}"
-        email = f"{discord_user.name}@discord.user"
-
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            first_name=discord_user.display_name or discord_user.name
-        )
-
-        # Create profile
-        UserProfile.objects.create(
-            user=user,
-            discord_user_id=str(discord_user.id)
-        )
-
+        user = await _create_user(discord_user.id, discord_user.name, discord_user.display_name)
+        user_cache.set(discord_user.id, user)
         logger.info(f"Created new user for Discord ID: {discord_user.id}")
         return user.id
 
@@ -49,54 +183,139 @@ async def get_or_create_user(discord_user):
         return None
 
 
+# ------------------------------------------------------------------
+# Applications and follow-ups
+# ------------------------------------------------------------------
+
+@database_sync_to_async
+def get_recent_applications(user, limit=15):
+    return list(JobApplication.objects.filter(user=user).order_by('-created_at')[:limit])
+
+
+@database_sync_to_async
+def get_active_configs(user):
+    return list(JobSearchConfig.objects.filter(user=user, is_active=True))
+
+
+@database_sync_to_async
+def get_application_stats(user):
+    """Every number the !stats command shows, in one query"""
+    return JobApplication.objects.filter(user=user).aggregate(
+        total=Count('id'),
+        applied=Count('id', filter=Q(application_status='applied')),
+        responded=Count('id', filter=Q(application_status__in=['responded', 'interview', 'offer'])),
+        interviews=Count('id', filter=Q(application_status='interview')),
+        offers=Count('id', filter=Q(application_status='offer')),
+        this_week=Count('id', filter=Q(created_at__gte=timezone.now() - timedelta(days=7))),
+    )
+
+
+@database_sync_to_async
+def get_due_followups(user):
+    return list(JobApplication.objects.filter(
+        user=user,
+        next_follow_up_date__lte=date.today(),
+        application_status__in=FOLLOW_UP_STATUSES
+    ).order_by('next_follow_up_date'))
+
+
+@database_sync_to_async
+def find_followup_application(user, company_name):
+    return JobApplication.objects.filter(
+        user=user,
+        company_name__icontains=company_name,
+        application_status__in=FOLLOW_UP_STATUSES
+    ).first()
+
+
+@database_sync_to_async
+def get_default_template(user):
+    from followups.models import FollowUpTemplate
+
+    return FollowUpTemplate.objects.filter(user=user, is_default=True, is_active=True).first()
+
+
+@database_sync_to_async
+def queue_followup(application_id, template_id):
+    # Publishing to the broker is network I/O too, so it stays off the event loop
+    from followups.tasks import send_followup_email
+
+    send_followup_email.delay(application_id, template_id)
+
+
+@database_sync_to_async
+def queue_bulk_followups(application_ids, template_id):
+    from followups.tasks import send_bulk_followup_emails
+
+    send_bulk_followup_emails.delay(application_ids, template_id)
+
+
+# ------------------------------------------------------------------
+# Job search
+# ------------------------------------------------------------------
+
+@database_sync_to_async
+def save_search_config(user_id, categories):
+    config, created = JobSearchConfig.objects.get_or_create(
+        user_id=user_id,
+        config_name="Discord Bot Search",
+        defaults={
+            'job_categories': categories,
+            'target_locations': ['remote', 'toronto_on', 'vancouver_bc'],
+            'remote_preference': 'remote',
+            'salary_min': 60000,
+            'salary_max': 150000,
+            'auto_follow_up_enabled': True,
+            'is_active': True
+        }
+    )
+    if not created:
+        config.job_categories = categories
+        config.save(update_fields=['job_categories'])
+    return config
+
+
+@database_sync_to_async
+def mark_search_started(config_id):
+    JobSearchConfig.objects.filter(id=config_id).update(last_search_date=timezone.now())
+
+
 async def start_job_search(user_id, categories, message, ctx):
-    """Start job search via Django/n8n integration"""
+    """Save the Discord search config and start an n8n universal job search"""
     try:
-        # Update status
         await update_search_status(message, "🔍 Searching job platforms...", 0xffc107)
 
-        # Get or create default search config
-        user = User.objects.get(id=user_id)
-        from jobs.models import JobSearchConfig
-
-        config, created = JobSearchConfig.objects.get_or_create(
-            user=user,
-            config_name="Discord Bot Search",
-            defaults={
-                'job_categories': categories,
-                'target_locations': ['remote', 'toronto_on', 'vancouver_bc'],
-                'remote_preference': 'remote',
-                'salary_min': 60000,
-                'salary_max': 150000,
-                'auto_follow_up_enabled': True,
-                'is_active': True
-            }
-        )
-
-        # Update categories for existing config
-        config.job_categories = categories
-        config.save()
+        config = await save_search_config(user_id, categories)
+        webhook_url = getattr(settings, 'N8N_WEBHOOK_URL', None)
+        if not webhook_url:
+            logger.error("Job search error: N8N_WEBHOOK_URL is not configured")
+            return False
 
-        # Trigger job search via Django view
         search_data = {
+            'search_id': f"{config.id}_{timezone.now().timestamp()}",
             'user_id': user_id,
             'config_id': config.id,
+            'config_name': config.config_name,
             'job_categories': categories,
             'target_locations': config.target_locations,
+            'remote_preference': config.remote_preference,
             'salary_min': config.salary_min,
-            'salary_max': config.salary_max
+            'salary_max': config.salary_max,
+            'auto_follow_up_enabled': config.auto_follow_up_enabled,
+            'timestamp': timezone.now().isoformat(),
+            'search_type': 'discord',
         }
+        status = await bot_http.post_json(
+            f"{webhook_url.rstrip('/')}/universal-job-search",
+            search_data,
+            headers={'Authorization': f'Bearer {getattr(settings, "N8N_API_TOKEN", "") or ""}'}
+        )
+        if status != 200:
+            logger.error(f"Job search error: search service returned status {status}")
+            return False
 
+        await mark_search_started(config.id)
         await update_search_status(message, "📄 Generating documents...", 0x17a2b8)
-
-        # Simulate job search completion (in real implementation, this would trigger n8n)
-
-        result = simulate_job_search.delay(config.id)
-
-        # Wait for completion
-        import asyncio
-        await asyncio.sleep(3)
-
         return True
 
     except Exception as e:
@@ -107,6 +326,8 @@ async def start_job_search(user_id, categories, message, ctx):
 async def update_search_status(message, status, color):
     """Update job search status embed"""
     try:
+        import discord
+
         embed = message.embeds[0]
         embed.color = color
 
@@ -119,4 +340,4 @@ async def update_search_status(message, status, color):
         embed.timestamp = discord.utils.utcnow()
         await message.edit(embed=embed)
     except Exception as e:
-        logger.error(f"Error updating status: {e}")
\ No newline at end of file
+        logger.error(f"Error updating status: {e}")
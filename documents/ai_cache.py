@@ -0,0 +1,156 @@
+# documents/ai_cache.py - CONTENT-ADDRESSED AI RESPONSE CACHE
+import hashlib
+import json
+import logging
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AIResponseCache, AIUsageLog
+
+logger = logging.getLogger('documents.ai_services')
+
+
+class AIResponseCacheService:
+    """
+    Persistent AI response cache.
+    Entries are keyed by a hash of (provider, model, system prompt, prompt, temperature),
+    expire after a TTL and are evicted least-recently-used beyond MAX_ENTRIES by the
+    periodic documents.tasks.evict_ai_response_cache task, so a write is a single upsert.
+    """
+
+    def __init__(self):
+        cache_settings = getattr(settings, 'AI_CACHE_SETTINGS', {})
+        self.enabled = cache_settings.get('ENABLED', True)
+        self.ttl_seconds = cache_settings.get('TTL_SECONDS', 7 * 24 * 3600)
+        self.max_entries = cache_settings.get('MAX_ENTRIES', 5000)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, prompt: str, temperature: float) -> str:
+        """Content address for a request - identical requests share one entry"""
+        payload = json.dumps(
+            [provider, model, system_prompt, prompt, float(temperature)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, cache_key, bypass: bool = False) -> Optional[AIResponseCache]:
+        """
+        Return a live cache entry or None (counts one hit or one miss).
+        cache_key may be a list of keys (e.g. one per provider) - the first key with a live entry wins.
+        """
+        if bypass or not self.enabled:
+            return None
+
+        keys = [cache_key] if isinstance(cache_key, str) else list(cache_key)
+        try:
+            entries = {
+                entry.cache_key: entry
+                for entry in AIResponseCache.objects.filter(cache_key__in=keys, expires_at__gt=timezone.now())
+            }
+        except Exception as e:
+            logger.error(f"AI cache lookup failed: {e}")
+            return None
+
+        entry = next((entries[key] for key in keys if key in entries), None)
+        if entry is None:
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        AIResponseCache.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_accessed_at=timezone.now()
+        )
+        return entry
+
+    def set(self, cache_key: str, provider: str, model: str, response: str,
+            tokens_used: int = 0, cost: Decimal = Decimal('0'), bypass: bool = False):
+        """Store a provider response (expired and surplus entries are trimmed by evict())"""
+        if bypass or not self.enabled:
+            return
+
+        now = timezone.now()
+        try:
+            AIResponseCache.objects.update_or_create(
+                cache_key=cache_key,
+                defaults={
+                    'provider': provider,
+                    'model_used': model,
+                    'response': response,
+                    'tokens_used': tokens_used or 0,
+                    'cost_usd': cost or Decimal('0'),
+                    'last_accessed_at': now,
+                    'expires_at': now + timedelta(seconds=self.ttl_seconds),
+                }
+            )
+        except Exception as e:
+            logger.error(f"AI cache write failed: {e}")
+
+    def evict(self, now=None):
+        """Drop expired entries, then the least recently used ones beyond the limit; returns rows removed"""
+        now = now or timezone.now()
+        expired, _ = AIResponseCache.objects.filter(expires_at__lte=now).delete()
+
+        overflow = AIResponseCache.objects.count() - self.max_entries
+        stale_ids = []
+        if overflow > 0:
+            stale_ids = list(
+                AIResponseCache.objects.order_by('last_accessed_at').values_list('id', flat=True)[:overflow]
+            )
+            AIResponseCache.objects.filter(id__in=stale_ids).delete()
+            logger.info(f"AI cache evicted {len(stale_ids)} least recently used entries")
+        return expired + len(stale_ids)
+
+    def record_hit(self, user_id: Optional[int], entry: AIResponseCache, request_type: str):
+        """Report a cache hit in AIUsageLog with zero tokens and zero cost"""
+        if not user_id:
+            return
+        try:
+            AIUsageLog.objects.create(
+                user_id=user_id,
+                provider=entry.provider,
+                model_used=entry.model_used,
+                tokens_used=0,
+                cost_usd=Decimal('0'),
+                request_type=request_type,
+                cache_hit=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to log cache hit: {e}")
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus persisted totals"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': AIResponseCache.objects.count(),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+        }
+
+    def clear(self):
+        """Remove every cached response"""
+        AIResponseCache.objects.all().delete()
+
+
+# Singleton instance
+ai_response_cache = AIResponseCacheService()
@@ -1,15 +1,17 @@
 # documents/ai_services.py - MAIN AI SERVICE MANAGER
 import os
-
-import requests
 import time
 import json
 import logging
 from typing import Dict, Any, Optional, Tuple
 from decimal import Decimal
 from django.conf import settings
+from django.db.models import F
 from django.utils import timezone
+from job_automation.http_client import http_client
+from .ai_cache import ai_response_cache
 from .models import AIUsageLog, AIProviderStatus
+from .provider_router import provider_router
 
 logger = logging.getLogger('documents.ai_services')
 
@@ -17,7 +19,8 @@ logger = logging.getLogger('documents.ai_services')
 class AIServiceManager:
     """
     Manages dual AI providers: Groq (primary) + OpenRouter (fallback)
-    Handles automatic failover, cost tracking, and performance monitoring
+    Handles automatic failover, cost tracking, and performance monitoring.
+    Provider order, circuit breaking and budget checks come from provider_router.
     """
 
     def __init__(self):
@@ -66,9 +69,11 @@ class AIServiceManager:
             # During migrations or initial setup, tables might not exist
             logger.warning(f"Could not ensure provider status (this is normal during migrations): {e}")
 
-    def generate_content(self, prompt: str, document_type: str, user_id: int) -> Dict[str, Any]:
+    def generate_content(self, prompt: str, document_type: str, user_id: int,
+                         use_cache: bool = True) -> Dict[str, Any]:
         """
         Main method to generate content using dual provider system
+        Identical requests are served from the response cache unless use_cache=False
         Returns: {
             'content': str,
             'provider': str,
@@ -76,42 +81,88 @@ class AIServiceManager:
             'cost': Decimal,
             'generation_time': float,
             'success': bool,
+            'cached': bool,
             'error': str (if any)
         }
         """
         start_time = time.time()
 
-        # Try primary provider first
-        result = self._try_provider(
-            provider=self.primary_provider,
-            prompt=prompt,
-            document_type=document_type,
-            user_id=user_id
-        )
-
-        if result['success']:
-            result['generation_time'] = time.time() - start_time
-            return result
+        # Serve identical requests from the cache (no provider call, no cost)
+        cached = self._get_cached_response(prompt, document_type, user_id, bypass=not use_cache)
+        if cached:
+            cached['generation_time'] = time.time() - start_time
+            return cached
 
-        logger.warning(f"Primary provider {self.primary_provider} failed: {result.get('error')}")
+        # Try providers in health order - open circuits are skipped without a network call
+        result = None
+        for provider in provider_router.route([self.primary_provider, self.fallback_provider]):
+            if result is not None:
+                logger.warning(f"Provider {result['provider']} failed: {result.get('error')}")
 
-        # Fallback to secondary provider
-        result = self._try_provider(
-            provider=self.fallback_provider,
-            prompt=prompt,
-            document_type=document_type,
-            user_id=user_id
-        )
+            result = self._try_provider(
+                provider=provider,
+                prompt=prompt,
+                document_type=document_type,
+                user_id=user_id
+            )
+            if result['success']:
+                break
 
         result['generation_time'] = time.time() - start_time
+        if result['success']:
+            self._store_cached_response(result, prompt, document_type, bypass=not use_cache)
         return result
 
+    def _request_params(self, provider: str, document_type: str) -> Tuple[str, str, float]:
+        """Model, system prompt and temperature sent to a provider (also the cache key inputs)"""
+        provider_settings = settings.GROQ_SETTINGS if provider == 'groq' else settings.OPENROUTER_SETTINGS
+        system_prompt = f'You are an expert job application assistant. Generate a professional {document_type}.'
+        return provider_settings['MODEL'], system_prompt, provider_settings['TEMPERATURE']
+
+    def _cache_key(self, provider: str, prompt: str, document_type: str) -> str:
+        model, system_prompt, temperature = self._request_params(provider, document_type)
+        return ai_response_cache.make_key(provider, model, system_prompt, prompt, temperature)
+
+    def _get_cached_response(self, prompt: str, document_type: str, user_id: int,
+                             bypass: bool = False) -> Optional[Dict[str, Any]]:
+        """Look up a cached response from either provider - hits skip cost accounting"""
+        keys = [
+            self._cache_key(provider, prompt, document_type)
+            for provider in (self.primary_provider, self.fallback_provider)
+        ]
+        entry = ai_response_cache.get(keys, bypass=bypass)
+        if entry is None:
+            return None
+
+        ai_response_cache.record_hit(user_id, entry, document_type)
+        logger.info(f"AI cache hit for {document_type} ({entry.provider})")
+        return {
+            'success': True,
+            'content': entry.response,
+            'provider': entry.provider,
+            'tokens_used': 0,
+            'cost': Decimal('0'),
+            'model': entry.model_used,
+            'cached': True
+        }
+
+    def _store_cached_response(self, result: Dict[str, Any], prompt: str, document_type: str,
+                               bypass: bool = False):
+        ai_response_cache.set(
+            self._cache_key(result['provider'], prompt, document_type),
+            provider=result['provider'],
+            model=result.get('model', ''),
+            response=result['content'],
+            tokens_used=result.get('tokens_used', 0),
+            cost=result.get('cost', Decimal('0')),
+            bypass=bypass
+        )
+
     def _try_provider(self, provider: str, prompt: str, document_type: str, user_id: int) -> Dict[str, Any]:
         """Try a specific AI provider"""
 
-        # Check if provider is active
-        status_obj = AIProviderStatus.objects.get(provider=provider)
-        if not status_obj.is_active:
+        # Check if provider is active (cached flag, no database read per call)
+        if not self._is_active(provider):
             return {
                 'success': False,
                 'error': f'{provider} is currently inactive',
@@ -126,11 +177,19 @@ class AIServiceManager:
                 'provider': provider
             }
 
+        if not provider_router.allow_request(provider):
+            return {
+                'success': False,
+                'error': f'{provider} circuit is open',
+                'provider': provider
+            }
+
+        started = time.perf_counter()
         try:
             if provider == 'groq':
-                return self._call_groq(prompt, document_type, user_id)
+                result = self._call_groq(prompt, document_type, user_id)
             elif provider == 'openrouter':
-                return self._call_openrouter(prompt, document_type, user_id)
+                result = self._call_openrouter(prompt, document_type, user_id)
             else:
                 return {
                     'success': False,
@@ -140,13 +199,22 @@ class AIServiceManager:
 
         except Exception as e:
             logger.error(f"Error calling {provider}: {str(e)}")
-            self._update_provider_failure(provider)
-            return {
+            result = {
                 'success': False,
                 'error': str(e),
                 'provider': provider
             }
 
+        elapsed = time.perf_counter() - started
+        if result['success']:
+            provider_router.record_success(provider, elapsed)
+            provider_router.add_spend(provider, result['cost'])
+            self._update_provider_success(provider, elapsed)
+        else:
+            provider_router.record_failure(provider, elapsed)
+            self._update_provider_failure(provider)
+        return result
+
     def _call_groq(self, prompt: str, document_type: str, user_id: int) -> Dict[str, Any]:
         """Call Groq API"""
         headers = {
@@ -154,12 +222,13 @@ class AIServiceManager:
             'Content-Type': 'application/json'
         }
 
+        model, system_prompt, temperature = self._request_params('groq', document_type)
         data = {
-            'model': settings.GROQ_SETTINGS['MODEL'],
+            'model': model,
             'messages': [
                 {
                     'role': 'system',
-                    'content': f'You are an expert job application assistant. Generate a professional {document_type}.'
+                    'content': system_prompt
                 },
                 {
                     'role': 'user',
@@ -167,11 +236,11 @@ class AIServiceManager:
                 }
             ],
             'max_tokens': settings.GROQ_SETTINGS['MAX_TOKENS'],
-            'temperature': settings.GROQ_SETTINGS['TEMPERATURE'],
+            'temperature': temperature,
             'top_p': settings.GROQ_SETTINGS['TOP_P']
         }
 
-        response = requests.post(
+        response = http_client.post(
             'https://api.groq.com/openai/v1/chat/completions',
             headers=headers,
             json=data,
@@ -190,20 +259,17 @@ class AIServiceManager:
             self._log_usage(user_id, 'groq', settings.GROQ_SETTINGS['MODEL'],
                             tokens_used, cost, document_type)
 
-            # Update provider success
-            self._update_provider_success('groq')
-
             return {
                 'success': True,
                 'content': content,
                 'provider': 'groq',
                 'tokens_used': tokens_used,
                 'cost': cost,
-                'model': settings.GROQ_SETTINGS['MODEL']
+                'model': settings.GROQ_SETTINGS['MODEL'],
+                'cached': False
             }
         else:
             error_msg = f"Groq API error: {response.status_code} - {response.text}"
-            self._update_provider_failure('groq')
             return {
                 'success': False,
                 'error': error_msg,
@@ -219,12 +285,13 @@ class AIServiceManager:
             'X-Title': settings.OPENROUTER_SETTINGS['APP_NAME']
         }
 
+        model, system_prompt, temperature = self._request_params('openrouter', document_type)
         data = {
-            'model': settings.OPENROUTER_SETTINGS['MODEL'],
+            'model': model,
             'messages': [
                 {
                     'role': 'system',
-                    'content': f'You are an expert job application assistant. Generate a professional {document_type}.'
+                    'content': system_prompt
                 },
                 {
                     'role': 'user',
@@ -232,11 +299,11 @@ class AIServiceManager:
                 }
             ],
             'max_tokens': settings.OPENROUTER_SETTINGS['MAX_TOKENS'],
-            'temperature': settings.OPENROUTER_SETTINGS['TEMPERATURE'],
+            'temperature': temperature,
             'top_p': settings.OPENROUTER_SETTINGS['TOP_P']
         }
 
-        response = requests.post(
+        response = http_client.post(
             'https://openrouter.ai/api/v1/chat/completions',
             headers=headers,
             json=data,
@@ -255,20 +322,17 @@ class AIServiceManager:
             self._log_usage(user_id, 'openrouter', settings.OPENROUTER_SETTINGS['MODEL'],
                             tokens_used, cost, document_type)
 
-            # Update provider success
-            self._update_provider_success('openrouter')
-
             return {
                 'success': True,
                 'content': content,
                 'provider': 'openrouter',
                 'tokens_used': tokens_used,
                 'cost': cost,
-                'model': settings.OPENROUTER_SETTINGS['MODEL']
+                'model': settings.OPENROUTER_SETTINGS['MODEL'],
+                'cached': False
             }
         else:
             error_msg = f"OpenRouter API error: {response.status_code} - {response.text}"
-            self._update_provider_failure('openrouter')
             return {
                 'success': False,
                 'error': error_msg,
@@ -293,60 +357,50 @@ class AIServiceManager:
         except Exception as e:
             logger.error(f"Failed to log usage: {e}")
 
-    def _update_provider_success(self, provider: str):
-        """Update provider status on successful request"""
+    def _update_provider_success(self, provider: str, elapsed: Optional[float] = None):
+        """Update provider status on successful request (single UPDATE, no read)"""
         try:
-            status = AIProviderStatus.objects.get(provider=provider)
-            status.last_success = timezone.now()
-            status.total_requests += 1
-            status.successful_requests += 1
-            status.failure_count = 0  # Reset failure count on success
-
-            # Update average response time (simplified)
-            # In production, you'd track actual response times
-
-            status.save()
+            updates = {
+                'last_success': timezone.now(),
+                'total_requests': F('total_requests') + 1,
+                'successful_requests': F('successful_requests') + 1,
+                'failure_count': 0,  # Reset failure count on success
+            }
+            if elapsed is not None:
+                # Running mean of measured response times
+                updates['average_response_time'] = (
+                    (F('average_response_time') * F('successful_requests') + elapsed)
+                    / (F('successful_requests') + 1)
+                )
+            AIProviderStatus.objects.filter(provider=provider).update(**updates)
         except Exception as e:
             logger.error(f"Failed to update provider success: {e}")
 
     def _update_provider_failure(self, provider: str):
-        """Update provider status on failed request"""
+        """
+        Update provider status on failed request (single UPDATE, no read).
+        Failing providers are taken out of rotation by the circuit breaker, not by is_active.
+        """
         try:
-            status = AIProviderStatus.objects.get(provider=provider)
-            status.last_failure = timezone.now()
-            status.total_requests += 1
-            status.failure_count += 1
-
-            # Deactivate provider if too many failures
-            if status.failure_count >= 5:
-                status.is_active = False
-                logger.warning(f"Deactivated {provider} due to repeated failures")
-
-            status.save()
+            AIProviderStatus.objects.filter(provider=provider).update(
+                last_failure=timezone.now(),
+                total_requests=F('total_requests') + 1,
+                failure_count=F('failure_count') + 1
+            )
         except Exception as e:
             logger.error(f"Failed to update provider failure: {e}")
 
+    def _is_active(self, provider: str) -> bool:
+        try:
+            return provider_router.is_active(provider)
+        except Exception as e:
+            logger.error(f"Provider status check failed: {e}")
+            return True
+
     def _is_over_budget(self, provider: str) -> bool:
         """Check if provider is over monthly budget"""
         try:
-            status = AIProviderStatus.objects.get(provider=provider)
-
-            # Reset monthly counters if it's a new month
-            now = timezone.now()
-            if status.last_reset.month != now.month:
-                status.monthly_cost = Decimal('0.0')
-                status.monthly_requests = 0
-                status.last_reset = now
-                status.save()
-
-            # Check budget limits
-            if provider == 'groq':
-                limit = settings.AI_SETTINGS.get('GROQ_MONTHLY_LIMIT', 10)
-            else:
-                limit = settings.AI_SETTINGS.get('OPENROUTER_MONTHLY_LIMIT', 10)
-
-            return float(status.monthly_cost) >= limit
-
+            return provider_router.is_over_budget(provider)
         except Exception as e:
             logger.error(f"Budget check failed: {e}")
             return False
@@ -354,6 +408,7 @@ class AIServiceManager:
     def get_provider_status(self) -> Dict[str, Any]:
         """Get current status of all providers"""
         status_data = {}
+        health = provider_router.get_health()
 
         for provider in ['groq', 'openrouter']:
             try:
@@ -361,8 +416,12 @@ class AIServiceManager:
                 status_data[provider] = {
                     'active': status.is_active,
                     'success_rate': status.success_rate(),
-                    'monthly_cost': float(status.monthly_cost),
+                    'monthly_cost': float(provider_router.monthly_spend(provider)),
                     'monthly_requests': status.monthly_requests,
+                    'average_response_time': status.average_response_time,
+                    'circuit': health.get(provider, {}).get('circuit', 'closed'),
+                    'p50_ms': health.get(provider, {}).get('p50_ms'),
+                    'p95_ms': health.get(provider, {}).get('p95_ms'),
                     'last_success': status.last_success,
                     'last_failure': status.last_failure,
                     'failure_count': status.failure_count
@@ -383,6 +442,7 @@ class AIServiceManager:
             if active:
                 status.failure_count = 0  # Reset failures when manually activated
             status.save()
+            provider_router.set_active(provider, active)
             logger.info(f"Provider {provider} {'activated' if active else 'deactivated'}")
             return True
         except Exception as e:
@@ -0,0 +1,112 @@
+# documents/archive.py - STREAMING ZIP EXPORT
+import os
+import re
+import zipfile
+from io import BytesIO
+
+from reportlab.pdfgen import canvas
+
+READ_CHUNK_SIZE = 64 * 1024
+QUERY_CHUNK_SIZE = 200
+
+
+class _ZipStreamBuffer:
+    """
+    Write-only sink for zipfile. It has no tell()/seek(), so zipfile writes
+    data descriptors after each entry and never needs to go back.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yield a ZIP archive piece by piece.
+    entries is an iterable of (archive_name, iterable_of_bytes); nothing is held
+    in memory beyond the chunk currently being compressed.
+    """
+    sink = _ZipStreamBuffer()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in entries:
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.pop()
+                    if data:
+                        yield data
+            data = sink.pop()
+            if data:
+                yield data
+    yield sink.pop()
+
+
+def read_file_chunks(path, chunk_size=READ_CHUNK_SIZE):
+    with open(path, 'rb') as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def render_text_pdf(content):
+    """Render plain text into a simple one-column PDF"""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.setFont("Helvetica", 12)
+
+    y = 800  # Starting y position
+    for line in (content or '').split('\n'):
+        if y < 50:  # Start a new page near the bottom
+            pdf.showPage()
+            pdf.setFont("Helvetica", 12)
+            y = 800
+        pdf.drawString(50, y, line)
+        y -= 15
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def document_archive_name(document):
+    name = f"{document.application.company_name}_{document.application.job_title}_{document.document_type}"
+    return re.sub(r'[\s/\\]+', '_', name) + '.pdf'
+
+
+def document_entries(documents):
+    """
+    (name, chunks) pairs for GeneratedDocument rows.
+    Files on disk are read in chunks; documents without a file are rendered one at a time.
+    """
+    seen = {}
+    queryset = documents.select_related('application').order_by('application_id', 'id')
+    for document in queryset.iterator(chunk_size=QUERY_CHUNK_SIZE):
+        name = document_archive_name(document)
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            base, ext = os.path.splitext(name)
+            name = f"{base}_{seen[name]}{ext}"
+
+        if document.file_path and os.path.exists(document.file_path):
+            yield name, read_file_chunks(document.file_path)
+        else:
+            yield name, [render_text_pdf(document.content)]
+
+
+def stream_documents_zip(documents):
+    """Streaming ZIP of a GeneratedDocument queryset"""
+    return stream_zip(document_entries(documents))
@@ -73,6 +73,7 @@ class AIUsageLog(models.Model):
     tokens_used = models.IntegerField()
     cost_usd = models.DecimalField(max_digits=10, decimal_places=6)
     request_type = models.CharField(max_length=50)  # document_generation, research, etc.
+    cache_hit = models.BooleanField(default=False)  # Served from AIResponseCache - no provider cost
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -82,6 +83,29 @@ class AIUsageLog(models.Model):
         ]
 
 
+class AIResponseCache(models.Model):
+    """Persistent cache of AI responses keyed by a hash of the full request"""
+    cache_key = models.CharField(max_length=64, unique=True)  # sha256 of provider/model/prompts/temperature
+    provider = models.CharField(max_length=20)
+    model_used = models.CharField(max_length=100)
+    response = models.TextField()
+    tokens_used = models.IntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=10, decimal_places=6, default=0)  # Cost of the original call
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_accessed_at']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}/{self.model_used} cache entry ({self.hit_count} hits)"
+
+
 class AIProviderStatus(models.Model):
     """Track AI provider status and performance"""
     provider = models.CharField(max_length=20, unique=True)
@@ -122,6 +146,30 @@ class CompanyResearch(models.Model):
         return f"Research for {self.application.company_name}"
 
 
+class CompanyResearchSnapshot(models.Model):
+    """
+    Research shared by every application for the same role at the same company. The
+    analysis is written for one job title, so the role is part of the key.
+    """
+    company_key = models.CharField(max_length=255)  # jobs.dedup.canonical_company
+    role_key = models.CharField(max_length=255, blank=True)  # jobs.dedup.title_tokens, space-joined
+    company_name = models.CharField(max_length=200)
+    company_overview = models.TextField(blank=True)
+    recent_news = models.TextField(blank=True)
+    interview_talking_points = models.TextField(blank=True)
+    questions_to_ask = models.TextField(blank=True)
+    industry_context = models.TextField(blank=True)
+    research_source = models.CharField(max_length=20, default='serper_ai')
+    hit_count = models.IntegerField(default=0)
+    researched_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['company_key', 'role_key']
+
+    def __str__(self):
+        return f"Research snapshot for {self.company_name}"
+
+
 # from django.db import models
 #
 # # Create your models here.
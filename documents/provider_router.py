@@ -0,0 +1,293 @@
+# documents/provider_router.py - CIRCUIT BREAKER + HEALTH-WEIGHTED PROVIDER ROUTING
+import logging
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger('documents.ai_services')
+
+# Circuit state, activation flags and spend are shared by every worker through the 'ai' cache alias
+cache = ConnectionProxy(caches, 'ai')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProviderHealth:
+    """In-process breaker state and rolling call window for one provider"""
+
+    def __init__(self, window_size: int):
+        self.state = CLOSED
+        self.opened_until = 0.0
+        self.probe_in_flight = False
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=window_size)  # seconds, successful calls only
+        self.outcomes = deque(maxlen=window_size)  # True for success
+        self.shared_checked_at = 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - (sum(self.outcomes) / len(self.outcomes))
+
+
+class ProviderRouter:
+    """
+    Decides which AI provider to call without touching the database on the hot path.
+    Each provider has a closed/open/half-open circuit breaker; open circuits are shared
+    through the Django cache so every worker stops calling a failing provider.
+    Healthy providers are ordered by measured latency and error rate, and manual
+    activation flags and monthly spend are cached.
+    """
+
+    def __init__(self):
+        router_settings = getattr(settings, 'AI_ROUTER_SETTINGS', {})
+        self.failure_threshold = router_settings.get('FAILURE_THRESHOLD', 3)
+        self.failure_rate_threshold = router_settings.get('FAILURE_RATE_THRESHOLD', 0.5)
+        self.min_calls = router_settings.get('MIN_CALLS', 10)
+        self.window_size = router_settings.get('WINDOW_SIZE', 50)
+        self.open_seconds = router_settings.get('OPEN_SECONDS', 30)
+        self.slow_call_seconds = router_settings.get('SLOW_CALL_SECONDS', 20)
+        self.min_samples = router_settings.get('MIN_SAMPLES', 5)
+        self.switch_margin = router_settings.get('SWITCH_MARGIN', 1.5)
+        self.error_penalty = router_settings.get('ERROR_PENALTY', 4)
+        self.state_cache_seconds = router_settings.get('STATE_CACHE_SECONDS', 300)
+        self.shared_refresh_seconds = router_settings.get('SHARED_REFRESH_SECONDS', 2)
+
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def _get_health(self, provider: str) -> ProviderHealth:
+        health = self._health.get(provider)
+        if health is None:
+            with self._lock:
+                health = self._health.setdefault(provider, ProviderHealth(self.window_size))
+        return health
+
+    @staticmethod
+    def _circuit_key(provider: str) -> str:
+        return f'ai_provider:circuit:{provider}'
+
+    @staticmethod
+    def _active_key(provider: str) -> str:
+        return f'ai_provider:active:{provider}'
+
+    @staticmethod
+    def _spend_key(provider: str) -> str:
+        return f"ai_provider:spend:{provider}:{timezone.now().strftime('%Y%m')}"
+
+    # ------------------------------------------------------------------
+    # Circuit breaker
+    # ------------------------------------------------------------------
+
+    def allow_request(self, provider: str) -> bool:
+        """
+        True if a call may go to the provider now.
+        An open circuit lets a single probe through once its cool-down has passed.
+        """
+        health = self._get_health(provider)
+        now = time.time()
+
+        if health.state == CLOSED:
+            self._sync_shared_state(provider, health, now)
+
+        with self._lock:
+            if health.state == CLOSED:
+                return True
+
+            if health.state == OPEN and now >= health.opened_until:
+                health.state = HALF_OPEN
+                health.probe_in_flight = False
+
+            if health.state == HALF_OPEN and not health.probe_in_flight:
+                health.probe_in_flight = True
+                logger.info(f"Sending probe request to {provider}")
+                return True
+
+            return False
+
+    def _sync_shared_state(self, provider: str, health: ProviderHealth, now: float):
+        """Pick up a circuit opened by another worker (checked at most every SHARED_REFRESH_SECONDS)"""
+        if now - health.shared_checked_at < self.shared_refresh_seconds:
+            return
+        health.shared_checked_at = now
+        try:
+            opened_until = cache.get(self._circuit_key(provider))
+        except Exception as e:
+            logger.error(f"Circuit state lookup failed for {provider}: {e}")
+            return
+        if opened_until and opened_until > now:
+            with self._lock:
+                if health.state == CLOSED:
+                    health.state = OPEN
+                    health.opened_until = opened_until
+
+    def record_success(self, provider: str, elapsed: float):
+        health = self._get_health(provider)
+        if elapsed >= self.slow_call_seconds:
+            # A call this slow holds a request thread hostage - treat it like a failure
+            logger.warning(f"{provider} responded in {elapsed:.1f}s, counting as a slow call")
+            self.record_failure(provider, elapsed)
+            return
+
+        with self._lock:
+            health.latencies.append(elapsed)
+            health.outcomes.append(True)
+            health.consecutive_failures = 0
+            was_open = health.state != CLOSED
+            health.state = CLOSED
+            health.probe_in_flight = False
+
+        if was_open:
+            logger.info(f"Circuit for {provider} closed after successful probe")
+            try:
+                cache.delete(self._circuit_key(provider))
+            except Exception as e:
+                logger.error(f"Failed to clear circuit state for {provider}: {e}")
+
+    def record_failure(self, provider: str, elapsed: float = 0.0):
+        health = self._get_health(provider)
+        with self._lock:
+            health.outcomes.append(False)
+            health.consecutive_failures += 1
+            should_open = (
+                health.state == HALF_OPEN
+                or health.consecutive_failures >= self.failure_threshold
+                or (len(health.outcomes) >= self.min_calls
+                    and health.error_rate() >= self.failure_rate_threshold)
+            )
+            if should_open:
+                health.state = OPEN
+                health.opened_until = time.time() + self.open_seconds
+                health.probe_in_flight = False
+
+        if should_open:
+            logger.warning(f"Circuit for {provider} opened for {self.open_seconds}s")
+            try:
+                cache.set(self._circuit_key(provider), health.opened_until, self.open_seconds)
+            except Exception as e:
+                logger.error(f"Failed to share circuit state for {provider}: {e}")
+
+    def reset(self, provider: str):
+        """Close the circuit and forget measurements (used when a provider is re-enabled)"""
+        with self._lock:
+            self._health[provider] = ProviderHealth(self.window_size)
+        try:
+            cache.delete(self._circuit_key(provider))
+        except Exception as e:
+            logger.error(f"Failed to clear circuit state for {provider}: {e}")
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def score(self, provider: str) -> Optional[float]:
+        """Blend of p50/p95 latency, inflated by error rate - lower is better, None until measured"""
+        health = self._get_health(provider)
+        if len(health.latencies) < self.min_samples:
+            return None
+        latency = (health.percentile(0.5) + health.percentile(0.95)) / 2
+        return latency * (1 + self.error_penalty * health.error_rate())
+
+    def route(self, providers: List[str]) -> List[str]:
+        """
+        Providers in the order they should be tried.
+        The configured order wins unless a later provider is measurably healthier
+        by more than SWITCH_MARGIN, so traffic doesn't flap between close scores.
+        """
+        ordered = list(providers)
+        scores = {provider: self.score(provider) for provider in ordered}
+        for i in range(1, len(ordered)):
+            j = i
+            while j > 0:
+                current, previous = scores[ordered[j]], scores[ordered[j - 1]]
+                if current is None or previous is None or previous <= current * self.switch_margin:
+                    break
+                ordered[j - 1], ordered[j] = ordered[j], ordered[j - 1]
+                j -= 1
+        return ordered
+
+    # ------------------------------------------------------------------
+    # Cached provider state and budget
+    # ------------------------------------------------------------------
+
+    def is_active(self, provider: str) -> bool:
+        """Manual activation flag from AIProviderStatus, cached for STATE_CACHE_SECONDS"""
+        key = self._active_key(provider)
+        active = cache.get(key)
+        if active is None:
+            from .models import AIProviderStatus
+
+            active = AIProviderStatus.objects.filter(provider=provider).values_list('is_active', flat=True).first()
+            active = True if active is None else active
+            cache.set(key, active, self.state_cache_seconds)
+        return active
+
+    def set_active(self, provider: str, active: bool):
+        cache.set(self._active_key(provider), active, self.state_cache_seconds)
+        if active:
+            self.reset(provider)
+
+    def monthly_spend(self, provider: str) -> Decimal:
+        """This month's spend, loaded from AIUsageLog once and then kept up to date in the cache"""
+        key = self._spend_key(provider)
+        micro_dollars = cache.get(key)
+        if micro_dollars is None:
+            from .models import AIUsageLog
+
+            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            total = AIUsageLog.objects.filter(
+                provider=provider,
+                created_at__gte=month_start
+            ).aggregate(total=Sum('cost_usd'))['total'] or Decimal('0')
+            micro_dollars = int(total * 1000000)
+            cache.add(key, micro_dollars, 32 * 24 * 3600)
+        return Decimal(micro_dollars) / 1000000
+
+    def add_spend(self, provider: str, cost: Decimal):
+        key = self._spend_key(provider)
+        self.monthly_spend(provider)  # Make sure the month's total is loaded before incrementing
+        try:
+            cache.incr(key, int(Decimal(cost) * 1000000))
+        except ValueError:
+            cache.delete(key)
+
+    def is_over_budget(self, provider: str) -> bool:
+        if provider == 'groq':
+            limit = settings.AI_SETTINGS.get('GROQ_MONTHLY_LIMIT', 10)
+        else:
+            limit = settings.AI_SETTINGS.get('OPENROUTER_MONTHLY_LIMIT', 10)
+        return self.monthly_spend(provider) >= Decimal(str(limit))
+
+    def get_health(self) -> Dict[str, Dict]:
+        """Breaker state and latency figures for every provider seen by this process"""
+        report = {}
+        for provider, health in list(self._health.items()):
+            p50, p95 = health.percentile(0.5), health.percentile(0.95)
+            report[provider] = {
+                'circuit': health.state,
+                'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                'error_rate': round(health.error_rate(), 3),
+                'samples': len(health.outcomes),
+            }
+        return report
+
+
+# Singleton instance
+provider_router = ProviderRouter()
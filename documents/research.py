@@ -1,11 +1,16 @@
 # documents/research.py - HYBRID RESEARCH SYSTEM
-import requests
 import json
 import logging
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
 from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from job_automation.http_client import http_client
+from jobs.dedup import canonical_company, title_tokens
 from .ai_services import ai_service
-from .models import CompanyResearch
+from .models import CompanyResearch, CompanyResearchSnapshot
 
 logger = logging.getLogger('documents.ai_services')
 
@@ -13,12 +18,18 @@ logger = logging.getLogger('documents.ai_services')
 class CompanyResearchService:
     """
     Hybrid research system combining web search with AI analysis
-    Uses Serper API for real-time data + AI for analysis
+    Uses Serper API for real-time data + AI for analysis.
+    Results are kept per company and role (CompanyResearchSnapshot) and reused by every
+    application for the same role at that company until they go stale; the search and
+    the analysis both depend on the job title, so other roles get their own research.
     """
 
     def __init__(self):
         self.serper_api_key = settings.SERPER_API_KEY
         self.serper_settings = settings.SERPER_SETTINGS
+        research_settings = getattr(settings, 'COMPANY_RESEARCH_SETTINGS', {})
+        self.cache_ttl = timedelta(days=research_settings.get('CACHE_TTL_DAYS', 14))
+        self.max_parallel_queries = research_settings.get('MAX_PARALLEL_QUERIES', 4)
 
     def research_company(self, application_id: int, company_name: str, job_title: str = "") -> Dict[str, Any]:
         """
@@ -26,6 +37,20 @@ class CompanyResearchService:
         Returns comprehensive research data or fallback analysis
         """
         try:
+            # Step 0: Reuse fresh research for the same role at the same company
+            company_key = canonical_company(company_name)
+            role_key = ' '.join(title_tokens(job_title))[:255]
+            snapshot = self._get_snapshot(company_key, role_key)
+            if snapshot:
+                research_data = self._save_research(
+                    application_id, self._snapshot_data(snapshot), source=snapshot.research_source
+                )
+                return {
+                    'success': True,
+                    'data': research_data,
+                    'source': 'company_cache'
+                }
+
             # Step 1: Search for company information
             search_results = self._search_company_info(company_name, job_title)
 
@@ -37,6 +62,7 @@ class CompanyResearchService:
 
                 if analysis['success']:
                     # Step 3: Save research to database
+                    self._store_snapshot(company_key, role_key, company_name, analysis['data'])
                     research_data = self._save_research(application_id, analysis['data'])
 
                     return {
@@ -88,36 +114,11 @@ class CompanyResearchService:
             if job_title:
                 queries.append(f"{company_name} {job_title} job requirements")
 
+            # Queries are independent - run them side by side instead of back to back
             all_results = []
-
-            for query in queries:
-                headers = {
-                    'X-API-KEY': self.serper_api_key,
-                    'Content-Type': 'application/json'
-                }
-
-                data = {
-                    'q': query,
-                    'gl': self.serper_settings.get('GL', 'ca'),
-                    'hl': self.serper_settings.get('HL', 'en'),
-                    'num': self.serper_settings.get('NUM_RESULTS', 10),
-                }
-
-                response = requests.post(
-                    'https://google.serper.dev/search',
-                    headers=headers,
-                    json=data,
-                    timeout=10
-                )
-
-                if response.status_code == 200:
-                    results = response.json()
-                    if 'organic' in results:
-                        all_results.extend(results['organic'][:3])  # Top 3 results per query
-
-                # Rate limiting - small delay between requests
-                import time
-                time.sleep(0.5)
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel_queries, len(queries))) as executor:
+                for results in executor.map(self._run_search_query, queries):
+                    all_results.extend(results)
 
             if all_results:
                 return {
@@ -135,6 +136,74 @@ class CompanyResearchService:
             logger.error(f"Serper API error: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def _run_search_query(self, query: str) -> List[Dict[str, Any]]:
+        """Top 3 organic results for one Serper query ([] on failure)"""
+        headers = {
+            'X-API-KEY': self.serper_api_key,
+            'Content-Type': 'application/json'
+        }
+
+        data = {
+            'q': query,
+            'gl': self.serper_settings.get('GL', 'ca'),
+            'hl': self.serper_settings.get('HL', 'en'),
+            'num': self.serper_settings.get('NUM_RESULTS', 10),
+        }
+
+        try:
+            response = http_client.post('https://google.serper.dev/search', headers=headers, json=data)
+            if response.status_code == 200:
+                return response.json().get('organic', [])[:3]  # Top 3 results per query
+            logger.warning(f"Serper query failed with status {response.status_code}")
+        except Exception as e:
+            logger.error(f"Serper API error: {str(e)}")
+        return []
+
+    def _get_snapshot(self, company_key: str, role_key: str) -> Optional[CompanyResearchSnapshot]:
+        """Fresh research for this company and role, or None"""
+        if not company_key:
+            return None
+        snapshot = CompanyResearchSnapshot.objects.filter(
+            company_key=company_key,
+            role_key=role_key,
+            researched_at__gte=timezone.now() - self.cache_ttl
+        ).first()
+        if snapshot:
+            CompanyResearchSnapshot.objects.filter(pk=snapshot.pk).update(hit_count=F('hit_count') + 1)
+            logger.info(f"Reusing company research for {snapshot.company_name}")
+        return snapshot
+
+    def _store_snapshot(self, company_key: str, role_key: str, company_name: str, research_data: Dict):
+        if not company_key:
+            return
+        try:
+            CompanyResearchSnapshot.objects.update_or_create(
+                company_key=company_key,
+                role_key=role_key,
+                defaults={
+                    'company_name': company_name,
+                    'company_overview': research_data.get('company_overview', ''),
+                    'recent_news': research_data.get('recent_news', ''),
+                    'interview_talking_points': research_data.get('interview_talking_points', ''),
+                    'questions_to_ask': research_data.get('questions_to_ask', ''),
+                    'industry_context': research_data.get('industry_context', ''),
+                    'research_source': 'serper_ai',
+                    'researched_at': timezone.now()
+                }
+            )
+        except Exception as e:
+            logger.error(f"Failed to store company research snapshot: {e}")
+
+    @staticmethod
+    def _snapshot_data(snapshot: CompanyResearchSnapshot) -> Dict[str, Any]:
+        return {
+            'company_overview': snapshot.company_overview,
+            'recent_news': snapshot.recent_news,
+            'interview_talking_points': snapshot.interview_talking_points,
+            'questions_to_ask': snapshot.questions_to_ask,
+            'industry_context': snapshot.industry_context,
+        }
+
     def _analyze_search_results(self, company_name: str, job_title: str, search_data: Dict) -> Dict[str, Any]:
         """Use AI to analyze search results and create structured research"""
 
@@ -298,7 +367,7 @@ Be honest about limitations of knowledge and provide general but useful guidance
             logger.error(f"Section extraction error: {e}")
             return "Information not available"
 
-    def _save_research(self, application_id: int, research_data: Dict) -> Dict[str, Any]:
+    def _save_research(self, application_id: int, research_data: Dict, source: str = 'serper_ai') -> Dict[str, Any]:
         """Save research data to database"""
         try:
             from jobs.models import JobApplication
@@ -314,7 +383,7 @@ Be honest about limitations of knowledge and provide general but useful guidance
                     'interview_talking_points': research_data.get('interview_talking_points', ''),
                     'questions_to_ask': research_data.get('questions_to_ask', ''),
                     'industry_context': research_data.get('industry_context', ''),
-                    'research_source': 'serper_ai'
+                    'research_source': source
                 }
             )
 
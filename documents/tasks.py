@@ -5,12 +5,13 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict
 
-from celery import shared_task
+from celery import chord, shared_task
 from django.conf import settings
 from django.utils import timezone
 
 from accounts.models import UserProfile
 from jobs.models import JobApplication
+from .ai_cache import ai_response_cache
 from .ai_services import ai_service
 from .models import GeneratedDocument, DocumentGenerationJob
 from .prompts import prompts, optimizer
@@ -19,11 +20,53 @@ from .research import research_service
 logger = logging.getLogger(__name__)
 
 
+# Document types produced by the LLM (company research runs alongside them)
+DOCUMENT_TYPES = [
+    'resume',
+    'cover_letter',
+    'email_templates',
+    'linkedin_messages',
+    'video_script',
+    'followup_schedule',
+    'skills_analysis'
+]
+
+
+def _build_generation_data(application, user_profile):
+    """User and job data passed to every document prompt"""
+    skills = user_profile.key_skills or []
+    user_data = {
+        'name': f"{application.user.first_name} {application.user.last_name}",
+        'email': application.user.email,
+        'phone': user_profile.phone or 'Not provided',
+        'location': user_profile.location or 'Not provided',
+        'experience': (
+            f"{user_profile.current_job_title} with {user_profile.years_experience} years experience"
+            if user_profile.current_job_title and user_profile.years_experience
+            else user_profile.current_job_title or 'Professional background'
+        ),
+        'skills': ', '.join(skills) if isinstance(skills, list) else skills or 'Relevant skills',
+        'education': user_profile.education or 'Educational background'
+    }
+
+    job_data = {
+        'title': application.job_title,
+        'company': application.company_name,
+        'requirements': getattr(application, 'job_requirements', '') or 'Not specified',
+        'description': application.job_description or 'Not specified'
+    }
+    return user_data, job_data
+
+
 @shared_task(bind=True)
-def generate_all_documents(self, application_id):
-    """Generate all documents for a job application using dual AI system"""
+def generate_all_documents(self, application_id, specific_types=None, custom_instructions=None, priority=None):
+    """
+    Generate all documents for a job application using dual AI system.
+    Every document and the company research run in parallel as one chord;
+    finalize_document_generation aggregates the job totals when they are all done.
+    """
     try:
-        application = JobApplication.objects.get(id=application_id)
+        application = JobApplication.objects.select_related('user').get(id=application_id)
         user_profile = UserProfile.objects.get(user=application.user)
 
         # Create document generation job
@@ -35,86 +78,33 @@ def generate_all_documents(self, application_id):
         logger.info(f"Starting dual AI document generation for {application.job_title} at {application.company_name}")
 
         # Prepare user and job data for prompts
-        user_data = {
-            'name': f"{application.user.first_name} {application.user.last_name}",
-            'email': application.user.email,
-            'phone': user_profile.phone_number or 'Not provided',
-            'location': f"{user_profile.city}, {user_profile.country}" if user_profile.city else 'Not provided',
-            'experience': user_profile.experience_summary or 'Professional background',
-            'skills': user_profile.key_skills or 'Relevant skills',
-            'education': user_profile.education_background or 'Educational background'
-        }
+        user_data, job_data = _build_generation_data(application, user_profile)
 
-        job_data = {
-            'title': application.job_title,
-            'company': application.company_name,
-            'requirements': application.job_requirements or 'Not specified',
-            'description': application.job_description or 'Not specified'
-        }
+        requested_types = specific_types or DOCUMENT_TYPES + ['company_research']
+        document_types = [t for t in DOCUMENT_TYPES if t in requested_types]
 
-        # Track generation stats
-        total_tokens = 0
-        total_cost = Decimal('0.0')
-        documents_generated = 0
-        provider_used = 'unknown'
-
-        # Generate each document type using dual AI system
-        document_types = [
-            'resume',
-            'cover_letter',
-            'email_templates',
-            'linkedin_messages',
-            'video_script',
-            'followup_schedule',
-            'skills_analysis'
+        header = [
+            generate_single_document.s(
+                application_id, user_profile.id, doc_type, user_data, job_data, custom_instructions
+            )
+            for doc_type in document_types
         ]
+        if 'company_research' in requested_types:
+            header.append(generate_company_research.s(application_id))
+
+        if not header:
+            job.status = 'completed'
+            job.completed_at = timezone.now()
+            job.save(update_fields=['status', 'completed_at'])
+            return {'success': True, 'job_id': job.id, 'documents_queued': 0}
 
-        for doc_type in document_types:
-            try:
-                result = generate_single_document.delay(
-                    application_id, user_profile.id, doc_type, user_data, job_data
-                ).get()
-
-                if result['success']:
-                    documents_generated += 1
-                    total_tokens += result.get('tokens_used', 0)
-                    total_cost += Decimal(str(result.get('cost', 0)))
-                    provider_used = result.get('provider', provider_used)
-                    logger.info(f"Generated {doc_type} using {result.get('provider')}")
-                else:
-                    logger.error(f"Failed to generate {doc_type}: {result.get('error')}")
-
-            except Exception as e:
-                logger.error(f"Error generating {doc_type}: {str(e)}")
-
-        # Generate company research separately
-        try:
-            research_result = generate_company_research.delay(application_id).get()
-            if research_result['success']:
-                logger.info("Generated company research")
-            else:
-                logger.error(f"Company research failed: {research_result.get('error')}")
-        except Exception as e:
-            logger.error(f"Company research error: {str(e)}")
-
-        # Update job status
-        job.status = 'completed'
-        job.completed_at = timezone.now()
-        job.ai_provider_used = provider_used
-        job.total_tokens = total_tokens
-        job.total_cost = total_cost
-        job.documents_generated = documents_generated
-        job.save()
-
-        logger.info(
-            f"Document generation completed. Generated {documents_generated} documents using {total_tokens} tokens, cost: ${total_cost}")
+        options = {'priority': priority} if isinstance(priority, int) else {}
+        chord(header)(finalize_document_generation.s(job.id).set(**options), **options)
 
         return {
             'success': True,
-            'documents_generated': documents_generated,
-            'total_tokens': total_tokens,
-            'total_cost': float(total_cost),
-            'provider_used': provider_used
+            'job_id': job.id,
+            'documents_queued': len(header)
         }
 
     except Exception as e:
@@ -127,34 +117,75 @@ def generate_all_documents(self, application_id):
 
 
 @shared_task
-def generate_single_document(application_id, user_profile_id, document_type, user_data=None, job_data=None):
+def finalize_document_generation(results, job_id):
+    """Chord callback - aggregate the per-document results into the DocumentGenerationJob"""
+    total_tokens = 0
+    total_cost = Decimal('0.0')
+    documents_generated = 0
+    provider_used = 'unknown'
+    errors = []
+
+    for result in results or []:
+        if not result:
+            continue
+        doc_type = result.get('document_type', 'unknown')
+
+        if not result.get('success'):
+            errors.append(f"{doc_type}: {result.get('error', 'Generation failed')}")
+            continue
+
+        if doc_type == 'company_research':
+            logger.info("Generated company research")
+            continue
+
+        documents_generated += 1
+        total_tokens += result.get('tokens_used', 0)
+        total_cost += Decimal(str(result.get('cost', 0)))
+        provider_used = result.get('provider', provider_used)
+
+    try:
+        job = DocumentGenerationJob.objects.get(id=job_id)
+    except DocumentGenerationJob.DoesNotExist:
+        logger.error(f"Document generation job {job_id} not found")
+        return {'success': False, 'error': 'Job not found'}
+
+    job.status = 'completed' if documents_generated or not errors else 'failed'
+    job.completed_at = timezone.now()
+    job.ai_provider_used = provider_used
+    job.total_tokens = total_tokens
+    job.total_cost = total_cost
+    job.documents_generated = documents_generated
+    job.error_message = '\n'.join(errors)
+    job.save()
+
+    logger.info(
+        f"Document generation completed. Generated {documents_generated} documents using {total_tokens} tokens, cost: ${total_cost}")
+
+    return {
+        'success': job.status == 'completed',
+        'documents_generated': documents_generated,
+        'total_tokens': total_tokens,
+        'total_cost': float(total_cost),
+        'provider_used': provider_used
+    }
+
+
+@shared_task
+def generate_single_document(application_id, user_profile_id, document_type, user_data=None, job_data=None,
+                             custom_instructions=None):
     """Generate a single document using dual AI system"""
     try:
         application = JobApplication.objects.get(id=application_id)
         user_profile = UserProfile.objects.get(id=user_profile_id)
 
         # Prepare data if not provided
-        if not user_data:
-            user_data = {
-                'name': f"{application.user.first_name} {application.user.last_name}",
-                'email': application.user.email,
-                'phone': user_profile.phone_number or 'Not provided',
-                'location': f"{user_profile.city}, {user_profile.country}" if user_profile.city else 'Not provided',
-                'experience': user_profile.experience_summary or 'Professional background',
-                'skills': user_profile.key_skills or 'Relevant skills',
-                'education': user_profile.education_background or 'Educational background'
-            }
-
-        if not job_data:
-            job_data = {
-                'title': application.job_title,
-                'company': application.company_name,
-                'requirements': application.job_requirements or 'Not specified',
-                'description': application.job_description or 'Not specified'
-            }
+        if not user_data or not job_data:
+            user_data, job_data = _build_generation_data(application, user_profile)
 
         # Get optimized prompt for document type
         prompt = _get_optimized_prompt(document_type, user_data, job_data)
+        if custom_instructions:
+            prompt = f"{prompt}\n\nAdditional instructions: {custom_instructions}"
 
         # Generate content using dual AI system
         result = ai_service.generate_content(
@@ -187,6 +218,7 @@ def generate_single_document(application_id, user_profile_id, document_type, use
 
             return {
                 'success': True,
+                'document_type': document_type,
                 'document_id': document.id,
                 'provider': result['provider'],
                 'tokens_used': result.get('tokens_used', 0),
@@ -198,6 +230,7 @@ def generate_single_document(application_id, user_profile_id, document_type, use
             logger.error(f"Failed to generate {document_type}: {result.get('error')}")
             return {
                 'success': False,
+                'document_type': document_type,
                 'error': result.get('error', 'Generation failed')
             }
 
@@ -205,6 +238,7 @@ def generate_single_document(application_id, user_profile_id, document_type, use
         logger.error(f"Single document generation error: {str(e)}")
         return {
             'success': False,
+            'document_type': document_type,
             'error': str(e)
         }
 
@@ -247,6 +281,7 @@ def generate_company_research(application_id):
 
             return {
                 'success': True,
+                'document_type': 'company_research',
                 'document_id': document.id,
                 'research_source': research_result.get('source', 'unknown'),
                 'file_path': file_path
@@ -255,6 +290,7 @@ def generate_company_research(application_id):
             logger.error(f"Company research failed: {research_result.get('error')}")
             return {
                 'success': False,
+                'document_type': 'company_research',
                 'error': research_result.get('error', 'Research failed')
             }
 
@@ -262,6 +298,7 @@ def generate_company_research(application_id):
         logger.error(f"Company research error: {str(e)}")
         return {
             'success': False,
+            'document_type': 'company_research',
             'error': str(e)
         }
 
@@ -340,6 +377,17 @@ INDUSTRY CONTEXT
     return content
 
 
+@shared_task
+def evict_ai_response_cache():
+    """Periodic: trim the AI response cache of expired entries and back under MAX_ENTRIES"""
+    try:
+        return ai_response_cache.evict()
+
+    except Exception as e:
+        logger.error(f"Error evicting AI response cache: {str(e)}")
+        return 0
+
+
 # Legacy compatibility functions (update existing calls)
 @shared_task
 def generate_resume(application_id, user_profile_id):
@@ -0,0 +1,271 @@
+# followups/dispatcher.py - BATCHED FOLLOW-UP EMAIL DISPATCH
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from jobs.models import JobApplication
+from .models import FollowUpHistory, FollowUpTemplate
+from .templating import template_engine
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """
+    Rate limits kept in the Django cache so every worker draws from the same budget.
+    Each bucket is a fixed-window counter: capacity sends per capacity / rate window,
+    which keeps the burst and the average rate of a token bucket. Counters are taken with
+    cache.add + cache.incr (an atomic INCR on Redis), so concurrent workers can't both
+    spend the last token. Callers are told how long to wait instead of being put to sleep.
+    """
+
+    def __init__(self, prefix='followup_rate'):
+        self.prefix = prefix
+
+    def _window(self, scope, identifier, capacity, per_minute, now):
+        """(counter key, window length, seconds left in the window) for the window holding now"""
+        length = capacity * 60.0 / per_minute
+        index = math.floor(now / length)
+        return f'{self.prefix}:{scope}:{identifier}:{index}', length, (index + 1) * length - now
+
+    def _take(self, key, timeout):
+        if cache.add(key, 1, timeout):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:  # The window expired between add and incr
+            return self._take(key, timeout)
+
+    def acquire(self, buckets, now=None):
+        """
+        Take one token from every bucket in buckets [(scope, identifier, capacity, per_minute)].
+        Returns 0 when all buckets had a token, otherwise the seconds until they will (nothing is taken).
+        """
+        now = now if now is not None else time.time()
+        taken = []
+        wait = 0.0
+        for scope, identifier, capacity, per_minute in buckets:
+            key, length, remaining = self._window(scope, identifier, capacity, per_minute, now)
+            taken.append(key)
+            # A cache outage returns None - fail open, as a cache miss would
+            if (self._take(key, math.ceil(length) + 1) or 0) > capacity:
+                wait = max(wait, remaining)
+
+        if wait:
+            # Hand back what this call took so a refused send doesn't spend the other buckets
+            for key in taken:
+                try:
+                    cache.decr(key)
+                except ValueError:
+                    pass
+            return wait
+        return 0
+
+
+class FollowUpDispatcher:
+    """
+    Sends a batch of follow-ups in one pass: messages are rendered up front (template_engine), sent over a
+    single SMTP connection and recorded with bulk writes. Messages over the per-user or
+    per-recipient-domain rate limit are handed back for a delayed retry rather than slept on.
+    """
+
+    def __init__(self):
+        dispatch_settings = getattr(settings, 'FOLLOWUP_DISPATCH_SETTINGS', {})
+        self.user_per_minute = dispatch_settings.get('USER_RATE_PER_MINUTE', 20)
+        self.user_burst = dispatch_settings.get('USER_BURST', 10)
+        self.domain_per_minute = dispatch_settings.get('DOMAIN_RATE_PER_MINUTE', 30)
+        self.domain_burst = dispatch_settings.get('DOMAIN_BURST', 15)
+        self.next_follow_up_days = dispatch_settings.get('NEXT_FOLLOW_UP_DAYS', 14)
+        self.shard_size = dispatch_settings.get('SHARD_SIZE', 25)
+        self.max_per_user_per_run = dispatch_settings.get('MAX_PER_USER_PER_RUN', 10)
+        self.limiter = TokenBucketLimiter()
+
+    @staticmethod
+    def recipient_for(application):
+        # In real implementation, this would be the company email
+        return application.user.email
+
+    @staticmethod
+    def company_contact_for(application):
+        """The employer address the follow-up is about, or '' when none is known"""
+        return application.hiring_manager_email or application.recruiter_email or ''
+
+    def _buckets(self, application):
+        buckets = [('user', application.user_id, self.user_burst, self.user_per_minute)]
+        # The domain budget protects employer mail servers, so it is keyed on the company contact.
+        # recipient_for() is still the user's own address, and keying on it would make every
+        # user of one mail provider share a single budget.
+        contact = self.company_contact_for(application)
+        if contact:
+            domain = contact.rsplit('@', 1)[-1].lower()
+            buckets.append(('domain', domain, self.domain_burst, self.domain_per_minute))
+        return buckets
+
+    def dispatch(self, application_ids, template_id, custom_message=None):
+        """
+        Send follow-ups for application_ids using one template.
+        Returns {'sent': [...ids], 'failed': [...ids], 'deferred': [...ids], 'retry_after': seconds}.
+        """
+        template = FollowUpTemplate.objects.get(id=template_id)
+        applications = list(JobApplication.objects.filter(id__in=application_ids).select_related('user'))
+        rendered, unrenderable = template_engine.render_many(template, applications, custom_message)
+        for application in unrenderable:
+            logger.error(f"Follow-up for application {application.id} not sent: user has no profile")
+
+        ready, deferred, retry_after = [], [], 0.0
+        for application, subject, body in rendered:
+            recipient = self.recipient_for(application)
+            wait = self.limiter.acquire(self._buckets(application))
+            if wait:
+                deferred.append(application.id)
+                retry_after = max(retry_after, wait)
+                continue
+            ready.append((application, EmailMessage(
+                subject=subject,
+                body=body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[recipient],
+            )))
+
+        sent, failed = self._send(ready)
+        if sent:
+            self._record(sent, template)
+
+        return {
+            'sent': [application.id for application, _ in sent],
+            'failed': failed + [application.id for application in unrenderable],
+            'deferred': deferred,
+            'retry_after': math.ceil(retry_after),
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduled follow-ups
+    # ------------------------------------------------------------------
+
+    def due_shards(self, today=None):
+        """
+        Due applications joined to each user's default template in one query, split into
+        (template_id, [application ids]) shards of at most SHARD_SIZE.
+        Each user contributes at most MAX_PER_USER_PER_RUN applications; the rest wait for the next run.
+        """
+        today = today or date.today()
+        default_template = FollowUpTemplate.objects.filter(
+            user=OuterRef('user'),
+            is_default=True,
+            is_active=True
+        ).order_by('id').values('id')[:1]
+
+        due = JobApplication.objects.filter(
+            next_follow_up_date__lte=today,
+            follow_up_sequence_active=True,
+            application_status__in=['applied', 'responded']
+        ).annotate(
+            default_template_id=Subquery(default_template)
+        ).filter(
+            default_template_id__isnull=False
+        ).order_by('user_id', 'next_follow_up_date', 'id').values_list('id', 'user_id', 'default_template_id')
+
+        per_user = defaultdict(list)
+        templates = {}
+        for application_id, user_id, template_id in due.iterator():
+            if len(per_user[user_id]) < self.max_per_user_per_run:
+                per_user[user_id].append(application_id)
+                templates[user_id] = template_id
+
+        shards = []
+        for user_id, application_ids in per_user.items():
+            for start in range(0, len(application_ids), self.shard_size):
+                shards.append((templates[user_id], application_ids[start:start + self.shard_size]))
+        return shards
+
+    def claim(self, application_ids, today=None):
+        """
+        Keep only the applications this worker is first to claim and that are still due.
+        Claiming moves next_follow_up_date past today with a conditional UPDATE before
+        anything is sent, so neither an overlapping run nor a retry after a crash between
+        sending and recording can send the same follow-up again.
+        """
+        today = today or date.today()
+        next_date = today + timedelta(days=self.next_follow_up_days)
+        still_due = JobApplication.objects.filter(
+            id__in=application_ids,
+            next_follow_up_date__lte=today
+        ).values_list('id', flat=True)
+        return [
+            application_id for application_id in still_due
+            if JobApplication.objects.filter(id=application_id, next_follow_up_date__lte=today).update(
+                next_follow_up_date=next_date
+            )
+        ]
+
+    def release(self, application_ids, today=None):
+        """Make follow-ups that were claimed but not sent due again so a later run retries them"""
+        today = today or date.today()
+        JobApplication.objects.filter(
+            id__in=application_ids,
+            next_follow_up_date=today + timedelta(days=self.next_follow_up_days)
+        ).update(next_follow_up_date=today)
+
+    def _send(self, ready):
+        """Send every message over one SMTP connection; one bad address doesn't stop the batch"""
+        sent, failed = [], []
+        if not ready:
+            return sent, failed
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for application, message in ready:
+                message.connection = connection
+                try:
+                    message.send()
+                    sent.append((application, message))
+                except Exception as e:
+                    logger.error(f"Error sending follow-up for application {application.id}: {str(e)}")
+                    failed.append(application.id)
+        finally:
+            connection.close()
+        return sent, failed
+
+    def _record(self, sent, template):
+        """History rows, application tracking fields and counters in a handful of queries"""
+        from dashboard.counters import pipeline_counters
+        from dashboard.fragments import dashboard_fragments
+        from dashboard.stats import dashboard_stats
+
+        now = timezone.now()
+        next_date = date.today() + timedelta(days=self.next_follow_up_days)
+
+        FollowUpHistory.objects.bulk_create([
+            FollowUpHistory(application=application, template=template, subject=message.subject, body=message.body)
+            for application, message in sent
+        ])
+
+        applications = [application for application, _ in sent]
+        for application in applications:
+            application.last_follow_up_date = now
+            application.follow_up_count += 1
+            application.next_follow_up_date = next_date
+        JobApplication.objects.bulk_update(
+            applications, ['last_follow_up_date', 'follow_up_count', 'next_follow_up_date']
+        )
+
+        FollowUpTemplate.objects.filter(pk=template.pk).update(times_used=F('times_used') + len(sent))
+
+        # bulk_create/bulk_update skip signals, so keep the dashboard counters in step here
+        for user_id, count in Counter(application.user_id for application in applications).items():
+            pipeline_counters.increment(user_id, 'follow_ups_sent', count)
+            dashboard_stats.invalidate(user_id)
+            dashboard_fragments.bump(user_id)
+
+
+# Singleton instance
+followup_dispatcher = FollowUpDispatcher()
@@ -150,7 +150,7 @@ class FollowUpTemplateForm(forms.ModelForm):
             HTML('<h5>Email Template</h5>'),
             'subject_template',
             HTML(
-                '<small class="form-text text-muted">Available variables: {{user_name}}, {{company_name}}, {{job_title}}, {{hiring_manager}}, {{days_since_application}}</small>'),
+                '<small class="form-text text-muted">Available variables: {{user_name}}, {{first_name}}, {{company_name}}, {{job_title}}, {{hiring_manager}}, {{days_since_application}}, {{current_title}}, {{years_experience}}, {{custom_message}}</small>'),
             'body_template',
             Submit('submit', 'Save Template', css_class='btn btn-primary')
         )
@@ -3,6 +3,7 @@ from django.db import models
 # Create your models here.
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from jobs.models import JobApplication
 
 
@@ -32,10 +33,22 @@ class FollowUpTemplate(models.Model):
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Part of the compiled-template cache key
 
     def __str__(self):
         return f"{self.template_name} ({self.template_type})"
 
+    def clean(self):
+        from .templating import template_engine
+
+        errors = {}
+        for field in ('subject_template', 'body_template'):
+            unknown = template_engine.unknown_placeholders(getattr(self, field))
+            if unknown:
+                errors[field] = f"Unknown placeholders: {', '.join('{{%s}}' % name for name in unknown)}"
+        if errors:
+            raise ValidationError(errors)
+
     def calculate_success_rate(self):
         if self.times_used > 0:
             self.success_rate = (self.responses_received / self.times_used) * 100
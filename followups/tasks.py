@@ -1,12 +1,14 @@
 # followups/tasks.py
-from celery import shared_task
+from celery import group, shared_task
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from datetime import date, timedelta
 import logging
 
+from .dispatcher import followup_dispatcher
 from .models import FollowUpTemplate, FollowUpHistory
+from .templating import CompiledText, template_engine
 from jobs.models import JobApplication
 from accounts.models import UserProfile
 
@@ -22,11 +24,7 @@ def send_followup_email(application_id, template_id, custom_message=None):
         user_profile = UserProfile.objects.get(user=application.user)
 
         # Generate personalized content
-        subject = personalize_template(template.subject_template, application, user_profile)
-        body = personalize_template(template.body_template, application, user_profile)
-
-        if custom_message:
-            body += f"\n\n{custom_message}"
+        subject, body = template_engine.render(template, application, user_profile, custom_message=custom_message)
 
         # Send email
         send_mail(
@@ -64,23 +62,25 @@ def send_followup_email(application_id, template_id, custom_message=None):
 
 
 @shared_task
-def send_bulk_followup_emails(application_ids, template_id):
-    """Send bulk follow-up emails"""
+def send_bulk_followup_emails(application_ids, template_id, custom_message=None):
+    """
+    Send bulk follow-up emails in one batch over a single SMTP connection.
+    Messages held back by the rate limits are re-queued with a countdown instead of sleeping here.
+    """
     try:
-        template = FollowUpTemplate.objects.get(id=template_id)
-        sent_count = 0
+        result = followup_dispatcher.dispatch(application_ids, template_id, custom_message)
 
-        for app_id in application_ids:
-            success = send_followup_email.delay(app_id, template_id).get()
-            if success:
-                sent_count += 1
+        if result['deferred']:
+            send_bulk_followup_emails.apply_async(
+                (result['deferred'], template_id, custom_message),
+                countdown=max(1, result['retry_after'])
+            )
 
-            # Add delay between emails to avoid spam detection
-            import time
-            time.sleep(2)
-
-        logger.info(f"Bulk follow-up completed: {sent_count}/{len(application_ids)} emails sent")
-        return sent_count
+        logger.info(
+            f"Bulk follow-up completed: {len(result['sent'])}/{len(application_ids)} emails sent, "
+            f"{len(result['failed'])} failed, {len(result['deferred'])} deferred"
+        )
+        return len(result['sent'])
 
     except Exception as e:
         logger.error(f"Error sending bulk follow-up emails: {str(e)}")
@@ -89,53 +89,48 @@ def send_bulk_followup_emails(application_ids, template_id):
 
 @shared_task
 def process_scheduled_followups():
-    """Daily task to process scheduled follow-ups"""
+    """
+    Periodic task (several times a day) to process scheduled follow-ups.
+    Due applications and their default templates are read in one query and fanned out
+    to per-user shards that run in parallel.
+    """
     try:
-        # Get applications with due follow-ups
-        due_applications = JobApplication.objects.filter(
-            next_follow_up_date__lte=date.today(),
-            follow_up_sequence_active=True,
-            application_status__in=['applied', 'responded']
-        )
+        shards = followup_dispatcher.due_shards()
+        if shards:
+            group(
+                send_scheduled_followup_shard.s(application_ids, template_id)
+                for template_id, application_ids in shards
+            ).apply_async()
+
+        queued = sum(len(application_ids) for _, application_ids in shards)
+        logger.info(f"Scheduled follow-ups queued: {queued} applications in {len(shards)} shards")
+        return queued
 
-        sent_count = 0
-        for application in due_applications:
-            # Get default template for user
-            template = FollowUpTemplate.objects.filter(
-                user=application.user,
-                is_default=True,
-                is_active=True
-            ).first()
+    except Exception as e:
+        logger.error(f"Error processing scheduled follow-ups: {str(e)}")
+        return 0
 
-            if template:
-                success = send_followup_email.delay(application.id, template.id).get()
-                if success:
-                    sent_count += 1
 
-        logger.info(f"Scheduled follow-ups processed: {sent_count} emails sent")
-        return sent_count
+@shared_task
+def send_scheduled_followup_shard(application_ids, template_id):
+    """Send one shard of scheduled follow-ups - each due follow-up at most once"""
+    today = date.today()
+    claimed = followup_dispatcher.claim(application_ids, today)
+    if not claimed:
+        return 0
 
+    try:
+        result = followup_dispatcher.dispatch(claimed, template_id)
     except Exception as e:
-        logger.error(f"Error processing scheduled follow-ups: {str(e)}")
+        # Some of the shard may already be sent, so the claims stand rather than risk a resend
+        logger.error(f"Error sending scheduled follow-up shard {claimed}: {str(e)}")
         return 0
 
+    # Failed or rate-limited follow-ups stay due and are picked up by the next run
+    followup_dispatcher.release(result['failed'] + result['deferred'], today)
+    return len(result['sent'])
+
 
 def personalize_template(template_text, application, user_profile):
     """Replace template variables with actual values"""
-    replacements = {
-        '{{user_name}}': user_profile.user.get_full_name(),
-        '{{first_name}}': user_profile.user.first_name,
-        '{{company_name}}': application.company_name,
-        '{{job_title}}': application.job_title,
-        '{{hiring_manager}}': 'Hiring Manager',  # Could be enhanced with actual names
-        '{{days_since_application}}': str(
-            (timezone.now().date() - application.applied_date.date()).days) if application.applied_date else '0',
-        '{{current_title}}': user_profile.current_job_title or 'Professional',
-        '{{years_experience}}': str(user_profile.years_experience) if user_profile.years_experience else 'several',
-    }
-
-    personalized = template_text
-    for placeholder, value in replacements.items():
-        personalized = personalized.replace(placeholder, value)
-
-    return personalized
\ No newline at end of file
+    return CompiledText(template_text).render(template_engine.context_for(application, user_profile))
@@ -0,0 +1,139 @@
+# followups/templating.py - COMPILED FOLLOW-UP TEMPLATE ENGINE
+import re
+import threading
+from collections import OrderedDict
+
+from django.utils import timezone
+
+# {{name}} with optional inner whitespace
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+PLACEHOLDERS = (
+    'user_name', 'first_name', 'company_name', 'job_title', 'hiring_manager',
+    'days_since_application', 'current_title', 'years_experience', 'custom_message',
+)
+
+
+class CompiledText:
+    """
+    A template string split once into literal text and placeholder names.
+    Rendering is a single join - no repeated passes over the text per variable.
+    """
+
+    __slots__ = ('parts', 'names')
+
+    def __init__(self, text):
+        self.parts = []
+        self.names = set()
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text or ''):
+            self.parts.append(text[position:match.start()])
+            self.parts.append((match.group(1), match.group(0)))
+            self.names.add(match.group(1))
+            position = match.end()
+        self.parts.append((text or '')[position:])
+
+    def render(self, context):
+        # Unknown placeholders are left in the text as written
+        return ''.join(
+            part if isinstance(part, str) else str(context.get(part[0], part[1]))
+            for part in self.parts
+        )
+
+
+class TemplateEngine:
+    """
+    Compiles FollowUpTemplate subject/body once and keeps the compiled form keyed by
+    (template id, updated_at), so an edited template is recompiled and an unchanged one never is.
+    """
+
+    def __init__(self, max_templates=512):
+        self.max_templates = max_templates
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def unknown_placeholders(text):
+        """Placeholder names in text that the engine has no value for"""
+        return sorted({name for name in PLACEHOLDER_RE.findall(text or '') if name not in PLACEHOLDERS})
+
+    def compile(self, template):
+        """(subject, body) CompiledText pair for a FollowUpTemplate"""
+        if template.pk is None:
+            return CompiledText(template.subject_template), CompiledText(template.body_template)
+
+        key = (template.pk, getattr(template, 'updated_at', None))
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                return compiled
+
+        compiled = (CompiledText(template.subject_template), CompiledText(template.body_template))
+        with self._lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.max_templates:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    @staticmethod
+    def context_for(application, profile=None, user=None, custom_message=None):
+        """Placeholder values for one application"""
+        user = user or (profile.user if profile else application.user)
+        days = (timezone.now().date() - application.applied_date.date()).days if application.applied_date else 0
+        years = profile.years_experience if profile else None
+        return {
+            'user_name': user.get_full_name() or user.username,
+            'first_name': user.first_name,
+            'company_name': application.company_name,
+            'job_title': application.job_title,
+            'hiring_manager': 'Hiring Manager',  # Could be enhanced with actual names
+            'days_since_application': days,
+            'current_title': (profile.current_job_title if profile else '') or 'Professional',
+            'years_experience': years if years else 'several',
+            'custom_message': custom_message or '',
+        }
+
+    def render_context(self, template, context):
+        """(subject, body) for a template and a ready-made context (previews, tests)"""
+        subject, body = self.compile(template)
+        return subject.render(context), body.render(context)
+
+    def render(self, template, application, profile=None, user=None, custom_message=None):
+        """(subject, body) for one application; custom_message is appended to the body"""
+        subject, body = self.render_context(
+            template, self.context_for(application, profile, user, custom_message)
+        )
+        if custom_message and 'custom_message' not in self.compile(template)[1].names:
+            body += f"\n\n{custom_message}"
+        return subject, body
+
+    def render_many(self, template, applications, custom_message=None):
+        """
+        ([(application, subject, body)], [skipped applications]) for a batch, loading every
+        user profile in one query. Applications whose user has no profile can't be rendered
+        and are returned as skipped so the caller can report them.
+        """
+        from accounts.models import UserProfile
+
+        applications = list(applications)
+        profiles = {
+            profile.user_id: profile
+            for profile in UserProfile.objects.filter(
+                user_id__in={application.user_id for application in applications}
+            ).select_related('user')
+        }
+
+        rendered, skipped = [], []
+        for application in applications:
+            profile = profiles.get(application.user_id)
+            if profile is None:
+                skipped.append(application)
+                continue
+            subject, body = self.render(template, application, profile, custom_message=custom_message)
+            rendered.append((application, subject, body))
+        return rendered, skipped
+
+
+# Singleton instance
+template_engine = TemplateEngine()
@@ -13,13 +13,15 @@ from django.urls import reverse_lazy
 from django.http import JsonResponse
 from django.utils import timezone
 from datetime import date, timedelta
-import requests
 
 from django.db import models
 
+from dashboard.fragments import CachedContextMixin
 from dashboard.views import generate_company_questions, generate_technical_questions
 from job_automation import settings
+from job_automation.http_client import http_client
 from .models import FollowUpTemplate, FollowUpHistory
+from .templating import template_engine
 from .forms import FollowUpTemplateForm, ScheduleFollowUpForm, QuickFollowUpForm, BulkFollowUpForm
 from jobs.models import JobApplication
 
@@ -88,7 +90,7 @@ class SendFollowUpView(LoginRequiredMixin, View):
             }
 
             from django.conf import settings
-            response = requests.post(
+            response = http_client.post(
                 f"{settings.N8N_WEBHOOK_URL}/followup",
                 json=webhook_data,
                 headers={'Authorization': f'Bearer {settings.N8N_API_TOKEN}'}
@@ -165,7 +167,7 @@ class BulkFollowUpView(LoginRequiredMixin, FormView):
                         }
 
                         # Send to n8n webhook
-                        response = requests.post(
+                        response = http_client.post(
                             f"{settings.N8N_WEBHOOK_URL}/followup",
                             json=webhook_data,
                             headers={'Authorization': f'Bearer {settings.N8N_API_TOKEN}'}
@@ -350,12 +352,7 @@ class TemplatePreviewView(LoginRequiredMixin, View):
         }
 
         # Process template
-        subject = template.subject_template
-        body = template.body_template
-
-        for key, value in sample_data.items():
-            subject = subject.replace(f'{{{{{key}}}}}', str(value))
-            body = body.replace(f'{{{{{key}}}}}', str(value))
+        subject, body = template_engine.render_context(template, sample_data)
 
         return JsonResponse({
             'success': True,
@@ -398,12 +395,9 @@ class TestTemplateView(LoginRequiredMixin, View):
             }
 
             # Process template
-            subject = f"[TEST] {template.subject_template}"
-            body = f"This is a test email.\n\n{template.body_template}\n\n---\nThis was a test of your follow-up template."
-
-            for key, value in sample_data.items():
-                subject = subject.replace(f'{{{{{key}}}}}', str(value))
-                body = body.replace(f'{{{{{key}}}}}', str(value))
+            subject, body = template_engine.render_context(template, sample_data)
+            subject = f"[TEST] {subject}"
+            body = f"This is a test email.\n\n{body}\n\n---\nThis was a test of your follow-up template."
 
             # Send test email (this would integrate with your email service)
             # For now, we'll just simulate it
@@ -536,13 +530,16 @@ class UpdateFollowUpResponseView(LoginRequiredMixin, View):
             })
 
 
-class FollowUpAnalyticsView(LoginRequiredMixin, TemplateView):
+class FollowUpAnalyticsView(LoginRequiredMixin, CachedContextMixin, TemplateView):
     """Analytics dashboard for follow-ups"""
     template_name = 'followups/analytics.html'
+    cached_context_name = 'followup_analytics'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
+    def cached_context_parts(self):
+        return (date.today().isoformat(),)
+
+    def build_cached_context(self, user):
+        context = {}
 
         # Basic stats
         total_followups = FollowUpHistory.objects.filter(
@@ -0,0 +1,133 @@
+# job_automation/caching.py - CACHE-ASIDE HELPERS FOR THE SHARED CACHE TIER
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = ':refresh-lock'
+
+
+class CacheMetrics:
+    """Hit/miss counters per cache alias for this process"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, alias, hit):
+        with self._lock:
+            counts = self._counts.setdefault(alias, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                alias: {
+                    'hits': counts['hits'],
+                    'misses': counts['misses'],
+                    'hit_ratio': round(counts['hits'] / (counts['hits'] + counts['misses']), 3)
+                    if counts['hits'] + counts['misses'] else 0.0,
+                }
+                for alias, counts in self._counts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+cache_metrics = CacheMetrics()
+
+
+def _cache_settings():
+    return getattr(settings, 'CACHE_ASIDE_SETTINGS', {})
+
+
+def _store(cache, key, producer, timeout, refresh_ahead):
+    value = producer()
+    # Entries carry their own refresh time so one caller can rebuild them shortly before they expire
+    refresh_at = time.time() + timeout * (1 - refresh_ahead) if timeout else float('inf')
+    cache.set(key, (value, refresh_at), timeout)
+    return value
+
+
+def get_or_set(key, producer, timeout=None, alias='default', refresh_ahead=None):
+    """
+    Cache-aside read with stampede protection.
+    On a miss only the caller holding the refresh lock runs producer(); the others wait briefly
+    for its result. In the last refresh_ahead fraction of the TTL, one caller rebuilds the entry
+    while everyone else keeps getting the current value.
+    """
+    cache = caches[alias]
+    options = _cache_settings()
+    timeout = cache.default_timeout if timeout is None else timeout
+    refresh_ahead = options.get('REFRESH_AHEAD', 0.1) if refresh_ahead is None else refresh_ahead
+    lock_timeout = options.get('LOCK_TIMEOUT', 10)
+    lock_key = key + LOCK_SUFFIX
+
+    envelope = cache.get(key)
+    if envelope is not None:
+        cache_metrics.record(alias, hit=True)
+        value, refresh_at = envelope
+        if time.time() < refresh_at or not cache.add(lock_key, True, lock_timeout):
+            return value
+        try:
+            return _store(cache, key, producer, timeout, refresh_ahead)
+        finally:
+            cache.delete(lock_key)
+
+    cache_metrics.record(alias, hit=False)
+    if cache.add(lock_key, True, lock_timeout):
+        try:
+            return _store(cache, key, producer, timeout, refresh_ahead)
+        finally:
+            cache.delete(lock_key)
+
+    # Another worker is building this entry - wait for it rather than repeat the work
+    deadline = time.time() + options.get('LOCK_WAIT', 2)
+    while time.time() < deadline:
+        time.sleep(0.05)
+        envelope = cache.get(key)
+        if envelope is not None:
+            return envelope[0]
+    return _store(cache, key, producer, timeout, refresh_ahead)
+
+
+def invalidate(*keys, alias='default'):
+    caches[alias].delete_many(list(keys))
+
+
+def cached_queryset(key, queryset, timeout=None, alias='default'):
+    """Evaluated queryset (a list) through the cache"""
+    return get_or_set(key, lambda: list(queryset), timeout=timeout, alias=alias)
+
+
+def cached_fragment(key, render, timeout=None, alias='default'):
+    """Rendered HTML/text fragment through the cache; render is called only on a miss"""
+    return get_or_set(key, render, timeout=timeout, alias=alias)
+
+
+def cache_aside(key, timeout=None, alias='default'):
+    """
+    Decorator form of get_or_set.
+    key is a format string filled from the call's keyword/positional arguments
+    (e.g. 'skills:{user_id}') or a callable taking the same arguments.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if callable(key):
+                cache_key = key(*args, **kwargs)
+            else:
+                cache_key = key.format(*args, **kwargs)
+            return get_or_set(cache_key, lambda: func(*args, **kwargs), timeout=timeout, alias=alias)
+        wrapper.invalidate = lambda *args, **kwargs: invalidate(
+            key(*args, **kwargs) if callable(key) else key.format(*args, **kwargs), alias=alias
+        )
+        return wrapper
+    return decorator
@@ -7,3 +7,7 @@ from celery import Celery
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_automation.settings')
 
 app = Celery('job_automation')
+
+# Read CELERY_* settings from Django settings and pick up tasks.py in every app
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,189 @@
+# job_automation/http_client.py - SHARED OUTBOUND HTTP CLIENT
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Methods that are safe to resend after the server may already have seen them
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# Statuses that say the server turned a request away without acting on it - only with a Retry-After
+REJECTED_STATUSES = {429, 503}
+
+
+class OutboundHTTPClient:
+    """
+    Keep-alive HTTP client for every outbound provider call (Groq, OpenRouter, Serper, n8n).
+    One pooled requests.Session per host, per-host timeouts, retry with jittered
+    exponential backoff, and latency/error counters per host.
+
+    Idempotent methods are retried on connection errors, timeouts and RETRY_STATUSES.
+    POSTs (n8n follow-up webhooks, paid LLM calls) are only resent when the server cannot
+    have acted on them: the connection was never established, or a 429/503 came back with
+    a Retry-After. Callers whose POST is safe to repeat can pass idempotent=True.
+    """
+
+    def __init__(self):
+        http_settings = getattr(settings, 'OUTBOUND_HTTP_SETTINGS', {})
+        self.pool_maxsize = http_settings.get('POOL_MAXSIZE', 20)
+        self.default_timeout = tuple(http_settings.get('DEFAULT_TIMEOUT', (5, 30)))
+        self.host_timeouts = {
+            host: tuple(timeout) for host, timeout in http_settings.get('HOST_TIMEOUTS', {}).items()
+        }
+        self.max_retries = http_settings.get('MAX_RETRIES', 2)
+        self.backoff_base = http_settings.get('BACKOFF_BASE', 0.5)
+        self.backoff_max = http_settings.get('BACKOFF_MAX', 8.0)
+        self.retry_statuses = set(http_settings.get('RETRY_STATUSES', [429, 502, 503, 504]))
+
+        self._sessions = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def _session_for(self, host):
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    # Retries are handled in request() so they can be jittered and counted
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._sessions[host] = session
+        return session
+
+    def timeout_for(self, host):
+        return self.host_timeouts.get(host, self.default_timeout)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def request(self, method, url, timeout=None, retries=None, idempotent=None, **kwargs):
+        """
+        Send a request over the pooled session for the URL's host.
+        Returns the requests.Response; raises requests.RequestException once retries are used up.
+        idempotent defaults to True for GET/HEAD/OPTIONS/PUT/DELETE and False otherwise.
+        """
+        method = method.upper()
+        host = urlsplit(url).netloc.lower()
+        session = self._session_for(host)
+        timeout = timeout or self.timeout_for(host)
+        retries = self.max_retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self._record(host, started, error=True)
+                if attempt < retries and self._should_retry_exception(idempotent, e):
+                    attempt += 1
+                    self._sleep(host, attempt)
+                    continue
+                logger.error(f"Outbound {method} {host} failed after {attempt + 1} attempts: {str(e)}")
+                raise
+
+            self._record(host, started, error=response.status_code >= 500)
+            if attempt < retries and self._should_retry_status(idempotent, response):
+                attempt += 1
+                self._sleep(host, attempt, response.headers.get('Retry-After'))
+                continue
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    @staticmethod
+    def _connect_failed(error):
+        """True when the request never reached the server (refused, DNS failure, connect timeout)"""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if not isinstance(error, requests.ConnectionError):
+            return False
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, 'reason', reason)  # urllib3's MaxRetryError wraps the cause
+        # NewConnectionError (and NameResolutionError) subclass ConnectTimeoutError
+        return isinstance(reason, ConnectTimeoutError)
+
+    def _should_retry_exception(self, idempotent, error):
+        # A dropped connection or read timeout may come after the server acted on the request
+        if idempotent:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return self._connect_failed(error)
+
+    def _should_retry_status(self, idempotent, response):
+        if idempotent:
+            return response.status_code in self.retry_statuses
+        return response.status_code in REJECTED_STATUSES and bool(response.headers.get('Retry-After'))
+
+    def _sleep(self, host, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring Retry-After when the provider sends one"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        with self._lock:
+            self._host_metrics(host)['retries'] += 1
+        time.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _host_metrics(self, host):
+        return self._metrics.setdefault(host, {
+            'requests': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0
+        })
+
+    def _record(self, host, started, error=False):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            metrics = self._host_metrics(host)
+            metrics['requests'] += 1
+            metrics['errors'] += int(error)
+            metrics['total_ms'] += elapsed_ms
+            metrics['max_ms'] = max(metrics['max_ms'], elapsed_ms)
+
+    def get_metrics(self):
+        """Per-host request, error and latency counters for this process"""
+        with self._lock:
+            return {
+                host: {
+                    'requests': m['requests'],
+                    'errors': m['errors'],
+                    'retries': m['retries'],
+                    'error_rate': round(m['errors'] / m['requests'], 3) if m['requests'] else 0.0,
+                    'avg_ms': round(m['total_ms'] / m['requests'], 1) if m['requests'] else 0.0,
+                    'max_ms': round(m['max_ms'], 1),
+                }
+                for host, m in self._metrics.items()
+            }
+
+    def reset_metrics(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+# Singleton instance
+http_client = OutboundHTTPClient()
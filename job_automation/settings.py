@@ -13,8 +13,10 @@ for dubug just change the comments for db and debug
 """
 import dj_database_url
 import os
+import sys
 from pathlib import Path
 import os
+from celery.schedules import crontab
 from decouple import config
 
 from dotenv import load_dotenv
@@ -234,6 +236,22 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'America/Toronto'
 CELERY_ENABLE_UTC = True
+CELERY_BEAT_SCHEDULE = {
+    # Hourly through the working day so due follow-ups don't all go out in one morning batch
+    'process-scheduled-followups': {
+        'task': 'followups.tasks.process_scheduled_followups',
+        'schedule': crontab(minute=0, hour='8-18'),
+    },
+    'purge-expired-email-logs': {
+        'task': 'jobs.tasks.purge_expired_email_logs',
+        'schedule': crontab(minute=30, hour=3),
+    },
+    # Cache writes don't trim the table themselves, so it can overshoot MAX_ENTRIES until this runs
+    'evict-ai-response-cache': {
+        'task': 'documents.tasks.evict_ai_response_cache',
+        'schedule': crontab(minute='*/15'),
+    },
+}
 
 # RSS Configuration
 RSS_DISCOVERY_SETTINGS = {
@@ -449,36 +467,77 @@ LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'TIMEOUT': 300,  # 5 minutes default
-    },
-    'extension': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'extension-cache',
-        'TIMEOUT': 60,  # 1 minute for extension data
+# Shared cache tier - every web worker, Celery worker and the Discord bot see the same entries.
+# CACHE_BACKEND: redis (default when REDIS_CACHE_URL or REDIS_URL is set), locmem (default otherwise,
+# e.g. local development without Redis) or fakeredis (tests, from requirements-test.txt)
+REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL') or os.getenv('REDIS_URL') or ''
+if 'test' in sys.argv:
+    CACHE_BACKEND = os.getenv('TEST_CACHE_BACKEND', 'fakeredis')
+else:
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis' if REDIS_CACHE_URL else 'locmem')
+if CACHE_BACKEND == 'fakeredis':
+    try:
+        from fakeredis import FakeConnection
+    except ImportError:
+        CACHE_BACKEND = 'locmem'
+
+# Per-user dashboard statistics (dropped whenever an application or follow-up is saved)
+DASHBOARD_STATS_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_STATS_CACHE_TIMEOUT', '300'))
+
+# Per-user dashboard page context (dropped whenever the user's pipeline data changes)
+DASHBOARD_FRAGMENT_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_FRAGMENT_CACHE_TIMEOUT', '600'))
+
+# Days shown on the email settings processing chart
+EMAIL_ANALYTICS_CHART_DAYS = int(os.getenv('EMAIL_ANALYTICS_CHART_DAYS', '30'))
+
+# Cards rendered per pipeline column before the board lazy-loads the rest
+PIPELINE_BOARD_PAGE_SIZE = int(os.getenv('PIPELINE_BOARD_PAGE_SIZE', '50'))
+
+CACHE_ALIASES = {
+    'default': {'TIMEOUT': 300},  # 5 minutes default
+    'sessions': {'TIMEOUT': 86400},
+    'extension': {'TIMEOUT': 60},  # 1 minute for extension data
+    'stats': {'TIMEOUT': DASHBOARD_STATS_CACHE_TIMEOUT},
+    'ai': {'TIMEOUT': 7 * 24 * 3600},  # Provider circuit state, spend and research
+}
+
+
+def _cache_config(alias, timeout):
+    if CACHE_BACKEND == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'{alias}-cache',
+            'TIMEOUT': timeout,
+        }
+    options = {
+        'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        # A Redis outage degrades to cache misses; sessions fall back to the DB copy cached_db keeps
+        'IGNORE_EXCEPTIONS': True,
+        'SOCKET_CONNECT_TIMEOUT': 2,
+        'SOCKET_TIMEOUT': 2,
+    }
+    if CACHE_BACKEND == 'fakeredis':
+        options['CONNECTION_POOL_KWARGS'] = {'connection_class': FakeConnection}
+    return {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_CACHE_URL or 'redis://localhost:6379/1',
+        'KEY_PREFIX': f'ja:{alias}',
+        'TIMEOUT': timeout,
+        'OPTIONS': options,
     }
+
+
+CACHES = {alias: _cache_config(alias, config['TIMEOUT']) for alias, config in CACHE_ALIASES.items()}
+
+# job_automation/caching.py - cache-aside helpers
+CACHE_ASIDE_SETTINGS = {
+    'REFRESH_AHEAD': 0.1,  # Fraction of the TTL in which one caller rebuilds an entry early
+    'LOCK_TIMEOUT': 10,  # Seconds a rebuild lock is held at most
+    'LOCK_WAIT': 2,  # Seconds other callers wait for a rebuild before computing themselves
 }
-# ADD THESE NEW CACHE SETTINGS FOR PERFORMANCE
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': os.getenv('REDIS_URL', 'redis://localhost:6379/1'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         }
-#     },
-#     'skills': {  # Dedicated cache for skills data
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': os.getenv('REDIS_URL', 'redis://localhost:6379/2'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         },
-#         'TIMEOUT': 3600,  # 1 hour
-#     }
-# }
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
 
 
 SECURE_CROSS_ORIGIN_OPENER_POLICY = None  # Allow extension popups
@@ -701,6 +760,65 @@ AI_SETTINGS = {
     'OPENROUTER_MONTHLY_LIMIT': 10,  # Monthly limit for OpenRouter
 }
 
+# AI response cache (identical prompts are served from the database instead of the provider)
+AI_CACHE_SETTINGS = {
+    'ENABLED': os.getenv('AI_CACHE_ENABLED', 'True').lower() == 'true',
+    'TTL_SECONDS': int(os.getenv('AI_CACHE_TTL_SECONDS', str(7 * 24 * 3600))),  # 1 week
+    'MAX_ENTRIES': int(os.getenv('AI_CACHE_MAX_ENTRIES', '5000')),  # LRU eviction beyond this (every 15 minutes)
+}
+
+# AI provider routing (documents/provider_router.py) - circuit breaker and latency-weighted ordering
+AI_ROUTER_SETTINGS = {
+    'FAILURE_THRESHOLD': 3,  # Consecutive failures that open a circuit
+    'FAILURE_RATE_THRESHOLD': 0.5,  # Error rate over the window that opens a circuit
+    'MIN_CALLS': 10,  # Calls needed before the error rate is considered
+    'WINDOW_SIZE': 50,  # Recent calls kept per provider for latency/error figures
+    'OPEN_SECONDS': int(os.getenv('AI_CIRCUIT_OPEN_SECONDS', '30')),  # Cool-down before a probe request
+    'SLOW_CALL_SECONDS': 20,  # Successful calls slower than this count as failures
+    'MIN_SAMPLES': 5,  # Latency samples needed before a provider can be re-ordered
+    'SWITCH_MARGIN': 1.5,  # A later provider must score this much better to go first
+    'ERROR_PENALTY': 4,  # Latency score multiplier per unit of error rate
+    'STATE_CACHE_SECONDS': 300,  # How long the is_active flag is cached
+    'SHARED_REFRESH_SECONDS': 2,  # How often a closed circuit re-checks the shared cache
+}
+
+# Bulk AI job scoring
+AI_SCORING_SETTINGS = {
+    'PROVIDER': 'groq',
+    'QUEUE': os.getenv('AI_SCORING_QUEUE', 'celery'),  # Celery queue for scoring workers (scale out with -Q)
+    'TASK_RATE_LIMIT': os.getenv('AI_SCORING_TASK_RATE_LIMIT', '30/m'),  # Per-worker Celery rate limit
+    'MAX_CONCURRENCY': int(os.getenv('AI_SCORING_MAX_CONCURRENCY', '4')),  # Parallel AI calls per bulk request
+    'RATE_LIMITS': {  # Requests per minute per provider (0 = unlimited)
+        'groq': int(os.getenv('GROQ_REQUESTS_PER_MINUTE', '30')),
+        'openrouter': int(os.getenv('OPENROUTER_REQUESTS_PER_MINUTE', '20')),
+    },
+}
+
+# Duplicate job detection (jobs/dedup.py)
+JOB_DEDUP_SETTINGS = {
+    'NEAR_DUPLICATE_MATCHING': os.getenv('JOB_DEDUP_NEAR_DUPLICATES', 'False').lower() == 'true',  # MinHash title matching
+    'SIMILARITY_THRESHOLD': float(os.getenv('JOB_DEDUP_SIMILARITY_THRESHOLD', '0.7')),  # Estimated Jaccard similarity
+    'NUM_PERMUTATIONS': 64,
+    'SHINGLE_SIZE': 3,
+    'MAX_CANDIDATES': 200,  # Jobs at the same company compared per check
+}
+
+# Outbound HTTP client (job_automation/http_client.py) - pooled keep-alive sessions per provider host
+OUTBOUND_HTTP_SETTINGS = {
+    'POOL_MAXSIZE': int(os.getenv('OUTBOUND_HTTP_POOL_MAXSIZE', '20')),  # Keep-alive connections per host
+    'DEFAULT_TIMEOUT': (5, 30),  # (connect, read) seconds
+    'HOST_TIMEOUTS': {
+        'api.groq.com': (5, 30),
+        'openrouter.ai': (5, 60),
+        'google.serper.dev': (5, 15),
+        'n8n.jobautomation.me': (5, 30),
+    },
+    'MAX_RETRIES': 2,
+    'BACKOFF_BASE': 0.5,  # Seconds, doubled per attempt with full jitter
+    'BACKOFF_MAX': 8.0,
+    'RETRY_STATUSES': [429, 502, 503, 504],
+}
+
 # Groq Configuration
 GROQ_SETTINGS = {
     'MODEL': 'llama3-70b-8192',  # Llama 3.1 70B
@@ -727,6 +845,43 @@ SERPER_SETTINGS = {
     'TYPE': 'search',  # search, images, videos, news
 }
 
+# Bulk follow-up sending (followups/dispatcher.py) - token buckets shared through the cache
+FOLLOWUP_DISPATCH_SETTINGS = {
+    'USER_RATE_PER_MINUTE': int(os.getenv('FOLLOWUP_USER_RATE_PER_MINUTE', '20')),
+    'USER_BURST': 10,  # Messages a user can send back to back before the rate applies
+    'DOMAIN_RATE_PER_MINUTE': int(os.getenv('FOLLOWUP_DOMAIN_RATE_PER_MINUTE', '30')),  # Per recipient domain
+    'DOMAIN_BURST': 15,
+    'NEXT_FOLLOW_UP_DAYS': 14,
+    'SHARD_SIZE': 25,  # Scheduled follow-ups per Celery task
+    'MAX_PER_USER_PER_RUN': 10,  # Remaining due follow-ups wait for the next scheduled run
+}
+
+# Company research (documents/research.py) - shared per company and role across users and applications
+COMPANY_RESEARCH_SETTINGS = {
+    'CACHE_TTL_DAYS': int(os.getenv('COMPANY_RESEARCH_TTL_DAYS', '14')),  # Reuse research younger than this
+    'MAX_PARALLEL_QUERIES': 4,  # Serper queries in flight per company
+}
+
+# EmailQueue consumers (jobs/email_queue.py) - lanes are drained in this order
+EMAIL_QUEUE_SETTINGS = {
+    'LANES': {'interview': [1], 'standard': [2], 'bulk': [3]},  # Lane -> EmailQueue priorities
+    'BATCH_SIZES': {'interview': 10, 'standard': 25, 'bulk': 50},  # Rows claimed per lane per pass
+    'VISIBILITY_TIMEOUT': 300,  # Seconds before a row held by a dead worker can be claimed again
+    'BACKOFF_BASE': 30,  # Seconds; retry windows double per attempt
+    'BACKOFF_MAX': 3600,
+    'IDLE_SLEEP': 1.0,  # Seconds a consumer waits when every lane is empty
+}
+
+# EmailProcessingLog retention (jobs/email_retention.py) - per-user windows come from EmailSettings
+EMAIL_LOG_RETENTION = {
+    'BATCH_SIZE': 1000,  # Rows per delete transaction
+    'BATCH_PAUSE': 0.0,  # Seconds between batches, to leave room for other writers
+    'DEFAULT_KEEP_DAYS': 90,  # Users without EmailSettings
+    'FAILED_KEEP_DAYS': 7,  # Failed rows, for users with auto_delete_failed_processing
+    'ARCHIVE': False,  # Append purged rows to gzipped JSONL before deleting
+    'ARCHIVE_DIR': os.path.join(BASE_DIR, 'archives', 'email_logs'),
+}
+
 DIRECTORIES_TO_CREATE = [
     os.path.join(BASE_DIR, 'logs'),
     os.path.join(BASE_DIR, 'media', 'documents'),
@@ -78,7 +78,9 @@ class JobApplicationAdmin(admin.ModelAdmin):
 
     def mark_as_applied(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(
+        from dashboard.counters import pipeline_counters
+        updated = pipeline_counters.bulk_update_applications(
+            queryset,
             application_status='applied',
             applied_date=timezone.now()
         )
@@ -87,7 +89,8 @@ class JobApplicationAdmin(admin.ModelAdmin):
     mark_as_applied.short_description = "Mark selected applications as applied"
 
     def enable_follow_up_sequence(self, request, queryset):
-        updated = queryset.update(follow_up_sequence_active=True)
+        from dashboard.counters import pipeline_counters
+        updated = pipeline_counters.bulk_update_applications(queryset, follow_up_sequence_active=True)
         self.message_user(request, f'Follow-up sequence enabled for {updated} applications.')
 
     enable_follow_up_sequence.short_description = "Enable follow-up sequence"
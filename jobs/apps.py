@@ -1,4 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    """Create the full-text index once the applications table exists"""
+    from jobs.search import application_search
+
+    application_search.ensure_index(using)
 
 
 class JobsConfig(AppConfig):
@@ -8,3 +16,5 @@ class JobsConfig(AppConfig):
     def ready(self):
         """Import signals when the app is ready"""
         import jobs.signals
+
+        post_migrate.connect(ensure_search_index, sender=self)
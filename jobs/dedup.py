@@ -0,0 +1,213 @@
+# jobs/dedup.py - DUPLICATE JOB DETECTION
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Lower, Trim
+
+DEDUP_SETTINGS = getattr(settings, 'JOB_DEDUP_SETTINGS', {})
+
+# Legal suffixes and filler words that differ between boards for the same employer
+COMPANY_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'plc', 'gmbh', 'ag', 'sa', 'srl', 'bv', 'pty', 'lp', 'llp', 'ulc', 'the',
+}
+
+# Words boards add to titles without changing the role
+TITLE_NOISE = {
+    'a', 'an', 'and', 'the', 'of', 'for', 'in', 'at', 'to', 'with', 'on',
+    'job', 'jobs', 'position', 'role', 'opening', 'hiring', 'urgent', 'urgently', 'new',
+    'remote', 'hybrid', 'onsite', 'fulltime', 'parttime', 'contract', 'permanent', 'temporary',
+}
+
+TITLE_ABBREVIATIONS = {
+    'sr': 'senior', 'jr': 'junior', 'snr': 'senior', 'mgr': 'manager', 'eng': 'engineer',
+    'engr': 'engineer', 'dev': 'developer', 'swe': 'software engineer', 'ops': 'operations',
+}
+
+# Query parameters that only track where the click came from
+TRACKING_PARAMS = {
+    'ref', 'refid', 'referer', 'referrer', 'source', 'src', 'from', 'trk', 'trkinfo', 'tracking',
+    'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'sid', 'sessionid', 'campaign', 'cmp',
+    'origin', 'pagenum', 'searchid', 'lipi', 'currentjobid', 'alertid',
+}
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def canonical_company(company_name):
+    """Lower-case company name without punctuation or legal suffixes ('Acme, Inc.' -> 'acme')"""
+    words = _WORD_RE.findall(str(company_name or '').lower().replace('&', ' and '))
+    core = [word for word in words if word not in COMPANY_SUFFIXES]
+    return ' '.join(core or words)
+
+
+def title_tokens(job_title):
+    """Sorted, de-noised title tokens so word order and board decoration don't matter"""
+    text = re.sub(r'\(.*?\)|\[.*?\]', ' ', str(job_title or '').lower())
+    text = text.replace('full-time', 'fulltime').replace('full time', 'fulltime')
+    text = text.replace('part-time', 'parttime').replace('part time', 'parttime')
+
+    tokens = set()
+    for word in _WORD_RE.findall(text):
+        for expanded in TITLE_ABBREVIATIONS.get(word, word).split():
+            if expanded not in TITLE_NOISE:
+                tokens.add(expanded)
+    return sorted(tokens)
+
+
+def canonical_job_url(job_url):
+    """Job URL without scheme, www, fragment, trailing slash or tracking parameters"""
+    job_url = str(job_url or '').strip()
+    if not job_url:
+        return ''
+
+    parts = urlsplit(job_url if '://' in job_url else f'https://{job_url}')
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    )
+    canonical = f"{host}{parts.path.rstrip('/')}"
+    return f"{canonical}?{urlencode(query)}" if query else canonical
+
+
+def _digest(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+def job_fingerprint(job_title, company_name):
+    """Fingerprint shared by reposts of the same role at the same company"""
+    return _digest(f"{canonical_company(company_name)}|{' '.join(title_tokens(job_title))}")
+
+
+def url_fingerprint(job_url):
+    canonical = canonical_job_url(job_url)
+    return _digest(canonical) if canonical else ''
+
+
+def dedup_fields(job_title, company_name, job_url=''):
+    """Values for the indexed dedup columns on JobApplication"""
+    return {
+        'dedup_fingerprint': job_fingerprint(job_title, company_name),
+        'dedup_url_hash': url_fingerprint(job_url),
+        'dedup_company_key': canonical_company(company_name)[:255],
+    }
+
+
+def legacy_fingerprints(queryset, company_names):
+    """
+    {fingerprint: job} for rows saved before the dedup columns existed, whose fingerprint
+    stays blank until backfill_job_fingerprints runs. Candidates are narrowed on the
+    trimmed, lower-cased company name and fingerprinted here from title and company.
+    """
+    names = {str(name or '').strip().lower() for name in company_names}
+    candidates = queryset.filter(dedup_fingerprint='').alias(
+        company_lookup=Lower(Trim('company_name'))
+    ).filter(company_lookup__in=names).only('id', 'job_title', 'company_name', 'job_url')
+    return {job_fingerprint(job.job_title, job.company_name): job for job in candidates}
+
+
+# =============================================================================
+# NEAR-DUPLICATE MATCHING (MinHash over title shingles)
+# =============================================================================
+
+def shingles(text, size=None):
+    """Character shingles of the normalised title"""
+    size = size or DEDUP_SETTINGS.get('SHINGLE_SIZE', 3)
+    text = ' '.join(title_tokens(text))
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _hash_params(num_perm):
+    # Deterministic coefficients so signatures are comparable across processes
+    params = []
+    for i in range(num_perm):
+        seed = hashlib.sha1(f'minhash-{i}'.encode('utf-8')).digest()
+        params.append((int.from_bytes(seed[:8], 'big') % _MERSENNE_PRIME or 1,
+                       int.from_bytes(seed[8:16], 'big') % _MERSENNE_PRIME))
+    return params
+
+
+_HASH_PARAMS = {}
+
+
+def minhash_signature(text, num_perm=None):
+    num_perm = num_perm or DEDUP_SETTINGS.get('NUM_PERMUTATIONS', 64)
+    if num_perm not in _HASH_PARAMS:
+        _HASH_PARAMS[num_perm] = _hash_params(num_perm)
+
+    values = [int.from_bytes(hashlib.md5(s.encode('utf-8')).digest()[:8], 'big') for s in shingles(text)]
+    if not values:
+        return []
+    return [
+        min((a * value + b) % _MERSENNE_PRIME for value in values)
+        for a, b in _HASH_PARAMS[num_perm]
+    ]
+
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+
+def find_near_duplicate(queryset, job_title, company_name):
+    """
+    Return the first job at the same canonical company whose title is a near-duplicate.
+    Candidates come from the indexed company key, so this never scans other companies.
+    """
+    company_key = canonical_company(company_name)
+    if not company_key:
+        return None
+
+    threshold = DEDUP_SETTINGS.get('SIMILARITY_THRESHOLD', 0.7)
+    candidate_limit = DEDUP_SETTINGS.get('MAX_CANDIDATES', 200)
+    signature = minhash_signature(job_title)
+
+    candidates = queryset.filter(dedup_company_key=company_key[:255]).only(
+        'id', 'job_title', 'company_name', 'job_url'
+    )[:candidate_limit]
+
+    for candidate in candidates:
+        if estimated_similarity(signature, minhash_signature(candidate.job_title)) >= threshold:
+            return candidate
+    return None
+
+
+def find_duplicate_job(user, job_title, company_name, job_url='', near_duplicates=None):
+    """
+    Return an existing job for this user that matches the fingerprint or canonical URL,
+    then legacy rows without a fingerprint, then MinHash near-duplicates when enabled.
+    None when the job is new.
+    """
+    from .models import JobApplication
+
+    fields = dedup_fields(job_title, company_name, job_url)
+    match = Q(dedup_fingerprint=fields['dedup_fingerprint'])
+    if fields['dedup_url_hash']:
+        match |= Q(dedup_url_hash=fields['dedup_url_hash'])
+
+    user_jobs = JobApplication.objects.filter(user=user)
+    existing = user_jobs.filter(match).first()
+    if existing:
+        return existing
+
+    existing = legacy_fingerprints(user_jobs, [company_name]).get(fields['dedup_fingerprint'])
+    if existing:
+        return existing
+
+    if near_duplicates is None:
+        near_duplicates = DEDUP_SETTINGS.get('NEAR_DUPLICATE_MATCHING', False)
+    if near_duplicates:
+        return find_near_duplicate(user_jobs, job_title, company_name)
+    return None
@@ -0,0 +1,111 @@
+# jobs/email_filters.py - PRECOMPILED EMAILSETTINGS FILTERS
+import re
+import threading
+from collections import OrderedDict
+from email.utils import parseaddr
+
+
+def _keyword_pattern(keywords):
+    """One alternation over every keyword (lowercased, escaped), or None when there are none"""
+    keywords = {str(keyword).lower() for keyword in keywords or []}
+    if not keywords:
+        return None
+    return re.compile('|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)))
+
+
+class CompiledEmailFilter:
+    """
+    An EmailSettings' blacklist and keyword rules compiled once: exact senders and
+    blacklisted domains in sets, required and excluded keywords as one regex each,
+    so every email costs one pass over its text per rule list.
+
+    Blacklist entries of the form '*@example.com' or '@example.com' block the whole
+    domain, and '*.example.com' also blocks its subdomains.
+    """
+
+    __slots__ = ('senders', 'domains', 'domain_suffixes', 'required', 'excluded')
+
+    def __init__(self, blacklisted_senders=None, required_keywords=None, keyword_filters=None):
+        self.senders = set()
+        self.domains = set()
+        suffixes = []
+        for entry in blacklisted_senders or []:
+            entry = str(entry).strip().lower()
+            if entry.startswith('*@') or entry.startswith('@'):
+                self.domains.add(entry.split('@', 1)[1])
+            elif entry.startswith('*.'):
+                self.domains.add(entry[2:])
+                suffixes.append(entry[1:])
+            else:
+                self.senders.add(entry)
+        self.domain_suffixes = tuple(suffixes)
+        self.required = _keyword_pattern(required_keywords)
+        self.excluded = _keyword_pattern(keyword_filters)
+
+    @classmethod
+    def from_settings(cls, email_settings):
+        return cls(email_settings.blacklisted_senders, email_settings.required_keywords,
+                   email_settings.keyword_filters)
+
+    def is_sender_blacklisted(self, sender):
+        sender = (sender or '').lower()
+        if sender in self.senders:
+            return True
+        address = parseaddr(sender)[1] or sender
+        if address in self.senders:
+            return True
+        if not (self.domains or self.domain_suffixes) or '@' not in address:
+            return False
+        domain = address.rsplit('@', 1)[1]
+        return domain in self.domains or domain.endswith(self.domain_suffixes)
+
+    def matches(self, email_data):
+        """True if the email passes the blacklist and keyword rules"""
+        if self.is_sender_blacklisted(email_data.get('sender', '')):
+            return False
+        if self.required is None and self.excluded is None:
+            return True
+
+        text = (email_data.get('subject', '') + ' ' + email_data.get('body', '')).lower()
+        if self.required is not None and self.required.search(text) is None:
+            return False
+        return self.excluded is None or self.excluded.search(text) is None
+
+    def filter_many(self, emails):
+        """The emails that should be processed, in their original order"""
+        return [email_data for email_data in emails if self.matches(email_data)]
+
+
+class EmailFilterCache:
+    """Compiled filters keyed by (EmailSettings id, updated_at); an edit recompiles, nothing else does"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email_settings):
+        if email_settings.pk is None:
+            return CompiledEmailFilter.from_settings(email_settings)
+
+        key = (email_settings.pk, email_settings.updated_at)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                return compiled
+
+        compiled = CompiledEmailFilter.from_settings(email_settings)
+        with self._lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.max_entries:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+
+# Singleton instance
+email_filters = EmailFilterCache()
@@ -0,0 +1,243 @@
+# jobs/email_queue.py - EMAIL QUEUE CONSUMER
+import logging
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import EmailProcessingLog, EmailQueue, EmailSettings
+
+logger = logging.getLogger(__name__)
+
+# Queue priority for each classified email type (1=high, 2=medium, 3=low)
+PRIORITY_BY_EMAIL_TYPE = {
+    'interview_invite': 1,
+    'application_response': 2,
+    'rejection': 2,
+    'follow_up': 2,
+    'other': 2,
+    'job_alert': 3,
+}
+
+EMAIL_TYPES = {email_type for email_type, _ in EmailProcessingLog.EMAIL_TYPES}
+
+
+def process_queued_email(item):
+    """
+    Default handler: apply the user's EmailSettings filters and record the email in
+    EmailProcessingLog. Returns the log entry.
+    """
+    started = time.perf_counter()
+    email = item.email_data or {}
+    email_type = email.get('email_type', 'other')
+    email_settings = EmailSettings.objects.filter(user_id=item.user_id).first()
+    wanted = email_settings.should_process_email(email) if email_settings else True
+    received = email.get('date')
+
+    return EmailProcessingLog.objects.create(
+        user_id=item.user_id,
+        email_subject=email.get('subject', '')[:500],
+        email_sender=email.get('sender') or email.get('from', ''),
+        email_received_date=(parse_datetime(received) if isinstance(received, str) else None) or item.created_at,
+        email_body_preview=email.get('body', '')[:1000],
+        email_type=email_type if email_type in EMAIL_TYPES else 'other',
+        processing_result='success' if wanted else 'ignored',
+        confidence_score=email.get('confidence_score', 0.0),
+        extracted_data=email,
+        processing_time=time.perf_counter() - started,
+        retry_count=item.processing_attempts - 1,
+    )
+
+
+class ClaimLost(Exception):
+    """The row was reclaimed by another worker while this one was processing it"""
+
+
+class EmailQueueConsumer:
+    """
+    Drains EmailQueue in priority lanes. Workers claim a batch per lane atomically:
+    SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, and on SQLite
+    (which serialises writers) a conditional UPDATE that stamps the rows with the
+    worker's claim token. Lanes are drained highest priority first, so an interview
+    invite never waits behind a flood of job alerts. Failures back off exponentially
+    with full jitter; rows held by a crashed worker become claimable again after
+    VISIBILITY_TIMEOUT.
+    """
+
+    def __init__(self):
+        queue_settings = getattr(settings, 'EMAIL_QUEUE_SETTINGS', {})
+        self.lanes = queue_settings.get('LANES', {'interview': [1], 'standard': [2], 'bulk': [3]})
+        self.batch_sizes = queue_settings.get('BATCH_SIZES', {'interview': 10, 'standard': 25, 'bulk': 50})
+        self.visibility_timeout = queue_settings.get('VISIBILITY_TIMEOUT', 300)
+        self.backoff_base = queue_settings.get('BACKOFF_BASE', 30)
+        self.backoff_max = queue_settings.get('BACKOFF_MAX', 3600)
+
+    def lane_for(self, priority):
+        for lane, priorities in self.lanes.items():
+            if priority in priorities:
+                return lane
+        return None
+
+    def enqueue(self, user, email_data, email_type=None):
+        email_type = email_type or email_data.get('email_type', 'other')
+        return EmailQueue.objects.create(
+            user=user,
+            email_data={**email_data, 'email_type': email_type},
+            priority=PRIORITY_BY_EMAIL_TYPE.get(email_type, 2)
+        )
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+
+    def _stale(self, now):
+        """Rows held past VISIBILITY_TIMEOUT by a worker that has presumably died"""
+        return Q(status='processing', updated_at__lt=now - timedelta(seconds=self.visibility_timeout))
+
+    def _ready(self, now):
+        return (
+            Q(status='pending')
+            | Q(status='retry', next_attempt_at__lte=now)
+            | self._stale(now) & Q(processing_attempts__lt=F('max_attempts'))
+        )
+
+    def _fail_exhausted(self, lane, now):
+        """Give up on stale rows whose last allowed attempt was the one that died"""
+        failed = EmailQueue.objects.filter(
+            self._stale(now), priority__in=self.lanes[lane], processing_attempts__gte=F('max_attempts')
+        ).update(status='failed', error_message='Processing timed out on the final attempt', updated_at=now)
+        if failed:
+            logger.warning(f"Marked {failed} timed-out queued emails in lane {lane} as failed")
+
+    def claim(self, lane, limit=None):
+        """Atomically take up to limit ready rows from a lane; returns the claimed EmailQueue rows"""
+        limit = limit or self.batch_sizes.get(lane, 25)
+        token = uuid.uuid4().hex
+        now = timezone.now()
+        self._fail_exhausted(lane, now)
+        candidates = EmailQueue.objects.filter(
+            self._ready(now), priority__in=self.lanes[lane]
+        ).order_by('priority', 'created_at', 'id')
+
+        with transaction.atomic():
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            ids = list(candidates.values_list('id', flat=True)[:limit])
+            if not ids:
+                return []
+            # Re-checking readiness makes this a compare-and-set where rows can't be locked
+            EmailQueue.objects.filter(self._ready(now), id__in=ids).update(
+                status='processing',
+                claim_token=token,
+                processing_attempts=F('processing_attempts') + 1,
+                updated_at=now
+            )
+
+        return list(EmailQueue.objects.filter(claim_token=token, status='processing').order_by('priority', 'created_at'))
+
+    def retry_delay(self, attempts):
+        """Seconds before the next attempt - full jitter over an exponentially growing window"""
+        window = min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0)))
+        return max(1.0, random.uniform(0, window))
+
+    # ------------------------------------------------------------------
+    # Processing
+    # ------------------------------------------------------------------
+
+    def _owned(self, item):
+        """The row, only while this worker's claim on it still stands"""
+        return EmailQueue.objects.filter(id=item.id, claim_token=item.claim_token, status='processing')
+
+    def process(self, item, handler=None):
+        """
+        Run the handler for one claimed row and record the outcome; True on success.
+        The outcome is only written while the claim is still ours: if the row was reclaimed
+        after VISIBILITY_TIMEOUT the new owner's state wins, and the handler's writes (the
+        processing log) are rolled back so the email is not logged twice.
+        """
+        handler = handler or process_queued_email
+        try:
+            with transaction.atomic():
+                processing_log = handler(item)
+                completed = self._owned(item).update(
+                    status='completed', processing_log=processing_log, error_message='', updated_at=timezone.now()
+                )
+                if not completed:
+                    raise ClaimLost(item.id)
+        except ClaimLost:
+            logger.warning(f"Queued email {item.id} was reclaimed by another worker; discarding this result")
+            return False
+        except Exception as e:
+            logger.error(f"Queued email {item.id} failed (attempt {item.processing_attempts}): {str(e)}")
+            self._record_failure(item, str(e)[:1000])
+            return False
+        return True
+
+    def _record_failure(self, item, error_message):
+        """EmailQueue.mark_failed, conditional on the claim: retry with backoff while attempts remain"""
+        now = timezone.now()
+        if item.processing_attempts < item.max_attempts:
+            delay = self.retry_delay(item.processing_attempts)
+            fields = {'status': 'retry', 'next_attempt_at': now + timedelta(seconds=delay)}
+        else:
+            fields = {'status': 'failed'}
+        self._owned(item).update(error_message=error_message, updated_at=now, **fields)
+
+    def run_once(self, lanes=None, handler=None):
+        """
+        One pass over the lanes in priority order, one batch each.
+        Returns {lane: {'processed': n, 'failed': n}}.
+        """
+        results = {}
+        for lane in lanes or self.lanes:
+            processed = failed = 0
+            for item in self.claim(lane):
+                if self.process(item, handler):
+                    processed += 1
+                else:
+                    failed += 1
+            results[lane] = {'processed': processed, 'failed': failed}
+        return results
+
+    def drain(self, lanes=None, handler=None, max_batches=None):
+        """Run passes until the lanes are empty (or max_batches passes); returns the summed results"""
+        totals = {lane: {'processed': 0, 'failed': 0} for lane in lanes or self.lanes}
+        passes = 0
+        while max_batches is None or passes < max_batches:
+            results = self.run_once(lanes, handler)
+            passes += 1
+            for lane, counts in results.items():
+                totals[lane]['processed'] += counts['processed']
+                totals[lane]['failed'] += counts['failed']
+            if not any(counts['processed'] + counts['failed'] for counts in results.values()):
+                break
+        return totals
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def lane_stats(self):
+        """Ready depth and lag (age of the oldest ready row, seconds) per lane"""
+        now = timezone.now()
+        rows = EmailQueue.objects.filter(self._ready(now)).values('priority').annotate(
+            depth=Count('id'), oldest=Min('created_at')
+        )
+        stats = {lane: {'depth': 0, 'lag_seconds': 0.0} for lane in self.lanes}
+        for row in rows:
+            lane = self.lane_for(row['priority'])
+            if lane is None:
+                continue
+            stats[lane]['depth'] += row['depth']
+            stats[lane]['lag_seconds'] = max(stats[lane]['lag_seconds'], (now - row['oldest']).total_seconds())
+        return stats
+
+
+# Singleton instance
+email_queue_consumer = EmailQueueConsumer()
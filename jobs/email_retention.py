@@ -0,0 +1,184 @@
+# jobs/email_retention.py - EMAILPROCESSINGLOG RETENTION AND ARCHIVAL
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from dashboard.fragments import dashboard_fragments
+from .models import EmailProcessingDailyRollup, EmailProcessingLog, EmailQueue, EmailSettings
+
+logger = logging.getLogger(__name__)
+
+
+class EmailLogRetention:
+    """
+    Enforces EmailSettings.keep_email_logs_days and auto_delete_failed_processing.
+    Expired rows are removed in primary-key ranges of BATCH_SIZE, one short transaction
+    per range: the range is folded into EmailProcessingDailyRollup (so the processing
+    chart keeps its history) and deleted with a single DELETE. With archiving on, the
+    range's rows are appended to a gzipped JSONL archive once that transaction commits,
+    so a batch that rolls back is never archived. Users without EmailSettings get
+    DEFAULT_KEEP_DAYS.
+    """
+
+    def __init__(self):
+        retention_settings = getattr(settings, 'EMAIL_LOG_RETENTION', {})
+        self.batch_size = retention_settings.get('BATCH_SIZE', 1000)
+        self.batch_pause = retention_settings.get('BATCH_PAUSE', 0.0)
+        self.default_keep_days = retention_settings.get('DEFAULT_KEEP_DAYS', 90)
+        self.failed_keep_days = retention_settings.get('FAILED_KEEP_DAYS', 7)
+        self.archive = retention_settings.get('ARCHIVE', False)
+        self.archive_dir = retention_settings.get(
+            'ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archives', 'email_logs')
+        )
+
+    # ------------------------------------------------------------------
+    # Policy
+    # ------------------------------------------------------------------
+
+    def expired(self, now=None):
+        """Q matching every log past its owner's retention window (keep days <= 0 keeps forever)"""
+        now = now or timezone.now()
+        condition = Q(pk__in=[])
+        if self.default_keep_days > 0:
+            condition |= Q(created_at__lt=now - timedelta(days=self.default_keep_days)) & ~Q(
+                user_id__in=EmailSettings.objects.values('user_id')
+            )
+
+        policies = EmailSettings.objects.order_by().values_list(
+            'keep_email_logs_days', 'auto_delete_failed_processing'
+        ).distinct()
+        for keep_days, delete_failed in policies:
+            users = EmailSettings.objects.filter(
+                keep_email_logs_days=keep_days, auto_delete_failed_processing=delete_failed
+            ).values('user_id')
+            if keep_days > 0:
+                condition |= Q(user_id__in=users, created_at__lt=now - timedelta(days=keep_days))
+            if delete_failed:
+                condition |= Q(
+                    user_id__in=users, processing_result='failed',
+                    created_at__lt=now - timedelta(days=self.failed_keep_days)
+                )
+        return condition
+
+    def expired_logs(self, now=None):
+        return EmailProcessingLog.objects.filter(self.expired(now))
+
+    # ------------------------------------------------------------------
+    # Purging
+    # ------------------------------------------------------------------
+
+    def purge(self, archive=None, batch_size=None, dry_run=False, now=None):
+        """
+        Delete every expired log. Returns {'expired', 'deleted', 'batches', 'archive_path'};
+        with dry_run nothing is touched and only 'expired' is filled in.
+        """
+        archive = self.archive if archive is None else archive
+        batch_size = batch_size or self.batch_size
+        expired = self.expired_logs(now)
+        result = {'expired': 0, 'deleted': 0, 'batches': 0, 'archive_path': None}
+        if dry_run:
+            result['expired'] = expired.count()
+            return result
+
+        if archive:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            result['archive_path'] = os.path.join(
+                self.archive_dir, f"email_logs-{timezone.now():%Y%m%d-%H%M%S}.jsonl.gz"
+            )
+
+        users = set()
+        last_id = 0
+        while True:
+            ids = list(expired.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            # The range is re-filtered by expiry, so live rows that fall inside it are left alone
+            batch = expired.filter(id__gte=ids[0], id__lte=last_id)
+            with transaction.atomic():
+                deleted, batch_users = self._purge_batch(batch, result['archive_path'])
+            users.update(batch_users)
+            result['deleted'] += deleted
+            result['batches'] += 1
+            if self.batch_pause:
+                time.sleep(self.batch_pause)
+
+        result['expired'] = result['deleted']
+        for user_id in users:
+            dashboard_fragments.bump(user_id)
+        if result['deleted']:
+            logger.info(f"Purged {result['deleted']} email processing logs in {result['batches']} batches")
+        return result
+
+    def _purge_batch(self, batch, archive_path=None):
+        """Roll up and delete one range, archiving it on commit; returns (deleted, user ids)"""
+        ids = list(batch.values_list('id', flat=True))
+        if not ids:
+            return 0, set()
+        logs = EmailProcessingLog.objects.using(batch.db).filter(id__in=ids)
+        users = self.rollup(logs)
+        if archive_path:
+            rows = list(logs.order_by('id').values())
+            transaction.on_commit(lambda: self._archive(rows, archive_path), using=batch.db)
+        EmailQueue.objects.using(batch.db).filter(processing_log_id__in=ids).update(processing_log=None)
+        return self._delete(ids, batch.db), users
+
+    def _delete(self, ids, using):
+        # One DELETE without per-row signals: the rollup keeps the history, so the lifetime
+        # emails_processed counter must not be decremented
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {EmailProcessingLog._meta.db_table} WHERE id IN ({placeholders})", ids)
+            return cursor.rowcount
+
+    def rollup(self, logs):
+        """Add logs to the daily rollup table; returns the user ids touched"""
+        buckets = (
+            logs.annotate(day=TruncDate('created_at'))
+            .values('user_id', 'day', 'email_type', 'processing_result')
+            .annotate(
+                total=Count('id'),
+                confidence=Sum('confidence_score'),
+                processing_time=Sum('processing_time'),
+            )
+            .order_by()
+        )
+
+        users = set()
+        for bucket in buckets:
+            users.add(bucket['user_id'])
+            key = {field: bucket[field] for field in ('user_id', 'day', 'email_type', 'processing_result')}
+            updated = EmailProcessingDailyRollup.objects.filter(**key).update(
+                count=F('count') + bucket['total'],
+                confidence_total=F('confidence_total') + (bucket['confidence'] or 0),
+                processing_time_total=F('processing_time_total') + (bucket['processing_time'] or 0),
+                updated_at=timezone.now()
+            )
+            if not updated:
+                EmailProcessingDailyRollup.objects.create(
+                    count=bucket['total'],
+                    confidence_total=bucket['confidence'] or 0,
+                    processing_time_total=bucket['processing_time'] or 0,
+                    **key
+                )
+        return users
+
+    def _archive(self, rows, path):
+        # Each batch is appended as its own gzip member; gzip readers and zcat read them as one stream
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for row in rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+# Singleton instance
+email_log_retention = EmailLogRetention()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from jobs.dedup import dedup_fields
+from jobs.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = 'Compute duplicate-detection fingerprints for existing job applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Specific user ID')
+        parser.add_argument('--all', action='store_true', help='Recompute jobs that already have a fingerprint')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        jobs = JobApplication.objects.all()
+        if options['user_id']:
+            jobs = jobs.filter(user_id=options['user_id'])
+        if not options['all']:
+            jobs = jobs.filter(dedup_fingerprint='')
+
+        fields = ['dedup_fingerprint', 'dedup_url_hash', 'dedup_company_key']
+        batch = []
+        updated = 0
+        for job in jobs.only('id', 'job_title', 'company_name', 'job_url').iterator(chunk_size=options['batch_size']):
+            for field, value in dedup_fields(job.job_title, job.company_name, job.job_url).items():
+                setattr(job, field, value)
+            batch.append(job)
+            if len(batch) >= options['batch_size']:
+                JobApplication.objects.bulk_update(batch, fields)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            JobApplication.objects.bulk_update(batch, fields)
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Fingerprinted {updated} job applications'))
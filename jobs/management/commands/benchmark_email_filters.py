@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.email_filters import CompiledEmailFilter
+
+
+def legacy_should_process(blacklisted_senders, required_keywords, keyword_filters, email_data):
+    """EmailSettings.should_process_email as it was before the filters were compiled"""
+    if email_data.get('sender', '').lower() in [s.lower() for s in blacklisted_senders]:
+        return False
+
+    if required_keywords:
+        email_text = (email_data.get('subject', '') + ' ' + email_data.get('body', '')).lower()
+        if not any(keyword.lower() in email_text for keyword in required_keywords):
+            return False
+
+    if keyword_filters:
+        email_text = (email_data.get('subject', '') + ' ' + email_data.get('body', '')).lower()
+        if any(keyword.lower() in email_text for keyword in keyword_filters):
+            return False
+
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Compare the compiled EmailSettings filter with the original per-keyword implementation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=5000, help='Synthetic emails per run')
+        parser.add_argument('--keywords', type=int, default=50, help='Required and excluded keywords each')
+        parser.add_argument('--senders', type=int, default=200, help='Blacklisted senders')
+        parser.add_argument('--body-words', type=int, default=300, help='Words per email body')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [f'word{i}' for i in range(5000)]
+        required = [f'Role{i}' for i in range(options['keywords'])]
+        excluded = [f'Promo{i}' for i in range(options['keywords'])]
+        senders = [f'Spammer{i}@Example.com' for i in range(options['senders'])]
+
+        emails = []
+        for i in range(options['emails']):
+            words = rng.choices(vocabulary, k=options['body_words'])
+            if rng.random() < 0.6:
+                words.insert(rng.randrange(len(words)), rng.choice(required).lower())
+            if rng.random() < 0.1:
+                words.insert(rng.randrange(len(words)), rng.choice(excluded))
+            emails.append({
+                'sender': rng.choice(senders) if rng.random() < 0.05 else f'alerts{i}@jobs.example',
+                'subject': f'Job alert {i}',
+                'body': ' '.join(words),
+            })
+
+        started = time.perf_counter()
+        legacy = [legacy_should_process(senders, required, excluded, email) for email in emails]
+        legacy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        compiled_filter = CompiledEmailFilter(senders, required, excluded)
+        compile_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        kept = compiled_filter.filter_many(emails)
+        compiled_seconds = time.perf_counter() - started
+
+        compiled = [compiled_filter.matches(email) for email in emails]
+        if compiled != legacy or len(kept) != sum(legacy):
+            self.stderr.write(self.style.ERROR('Compiled filter disagrees with the original implementation'))
+            return
+
+        count = len(emails)
+        self.stdout.write(f"{count} emails, {len(required)} required / {len(excluded)} excluded keywords, "
+                          f"{len(senders)} blacklisted senders, {len(kept)} kept")
+        self.stdout.write(f"original   {legacy_seconds * 1000:9.1f} ms  {legacy_seconds / count * 1e6:8.1f} us/email")
+        self.stdout.write(f"compiled   {compiled_seconds * 1000:9.1f} ms  {compiled_seconds / count * 1e6:8.1f} us/email"
+                          f"  (+{compile_seconds * 1000:.2f} ms to compile)")
+        self.stdout.write(self.style.SUCCESS(f"speed-up   {legacy_seconds / max(compiled_seconds, 1e-9):.1f}x"))
@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+
+from jobs.email_queue import email_queue_consumer
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent EmailQueue consumers and report per-lane lag and throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Concurrent consumers')
+        parser.add_argument('--lanes', nargs='+', help='Lanes to consume (default: all, highest priority first)')
+        parser.add_argument('--duration', type=int, help='Stop after this many seconds')
+        parser.add_argument('--drain', action='store_true', help='Stop once every lane is empty')
+        parser.add_argument('--report-interval', type=int, default=30, help='Seconds between lane reports')
+
+    def handle(self, *args, **options):
+        lanes = options['lanes'] or list(email_queue_consumer.lanes)
+        unknown = set(lanes) - set(email_queue_consumer.lanes)
+        if unknown:
+            raise CommandError(f"Unknown lanes: {', '.join(sorted(unknown))}")
+
+        idle_sleep = getattr(settings, 'EMAIL_QUEUE_SETTINGS', {}).get('IDLE_SLEEP', 1.0)
+        deadline = time.monotonic() + options['duration'] if options['duration'] else None
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {lane: {'processed': 0, 'failed': 0} for lane in lanes}
+
+        def consume():
+            try:
+                while not stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                    try:
+                        results = email_queue_consumer.run_once(lanes)
+                    except DatabaseError as e:
+                        # e.g. "database is locked" under contention - back off and keep consuming
+                        logger.error(f"Email queue worker hit a database error: {str(e)}")
+                        close_old_connections()
+                        stop.wait(idle_sleep)
+                        continue
+                    with lock:
+                        for lane, counts in results.items():
+                            totals[lane]['processed'] += counts['processed']
+                            totals[lane]['failed'] += counts['failed']
+                    if not any(counts['processed'] + counts['failed'] for counts in results.values()):
+                        if options['drain']:
+                            return
+                        stop.wait(idle_sleep)
+            finally:
+                close_old_connections()
+
+        started = time.monotonic()
+        workers = [threading.Thread(target=consume, daemon=True) for _ in range(max(1, options['workers']))]
+        for worker in workers:
+            worker.start()
+
+        try:
+            last_report = time.monotonic()
+            while any(worker.is_alive() for worker in workers):
+                time.sleep(0.5)
+                if time.monotonic() - last_report >= options['report_interval']:
+                    self._report(lanes, totals, lock, started)
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        self._report(lanes, totals, lock, started)
+
+    def _report(self, lanes, totals, lock, started):
+        elapsed = max(time.monotonic() - started, 0.001)
+        stats = email_queue_consumer.lane_stats()
+        with lock:
+            for lane in lanes:
+                counts = totals[lane]
+                self.stdout.write(
+                    f"{lane:<10} processed={counts['processed']} failed={counts['failed']} "
+                    f"throughput={counts['processed'] / elapsed:.1f}/s "
+                    f"depth={stats[lane]['depth']} lag={stats[lane]['lag_seconds']:.1f}s"
+                )
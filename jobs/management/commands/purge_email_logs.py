@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from jobs.email_retention import email_log_retention
+
+
+class Command(BaseCommand):
+    help = 'Delete EmailProcessingLog rows past their retention window, rolling them up by day first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Rows deleted per transaction')
+        parser.add_argument('--archive', action='store_true', help='Append purged rows to a gzipped JSONL file')
+        parser.add_argument('--archive-dir', help='Directory for archive files')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired rows')
+
+    def handle(self, *args, **options):
+        if options['archive_dir']:
+            email_log_retention.archive_dir = options['archive_dir']
+
+        result = email_log_retention.purge(
+            archive=options['archive'] or None,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{result['expired']} email processing logs past retention")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {result['deleted']} email processing logs in {result['batches']} batches"
+        ))
+        if result['archive_path']:
+            self.stdout.write(f"Archived to {result['archive_path']}")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search import application_search
+
+
+class Command(BaseCommand):
+    help = 'Create the full-text search index for job applications and re-index every row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias')
+
+    def handle(self, *args, **options):
+        application_search.using = options['database']
+        application_search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Search index rebuilt ({application_search.vendor})'
+        ))
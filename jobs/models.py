@@ -465,6 +465,20 @@ class JobApplication(models.Model):
     )
     approved_at = models.DateTimeField(null=True, blank=True)
 
+    # Duplicate detection (see jobs/dedup.py) - filled in on save and by bulk ingestion
+    dedup_fingerprint = models.CharField(max_length=40, blank=True, help_text="Hash of canonical company + title tokens")
+    dedup_url_hash = models.CharField(max_length=40, blank=True, help_text="Hash of job URL without tracking params")
+    dedup_company_key = models.CharField(max_length=255, blank=True, help_text="Canonical company name")
+
+    def save(self, *args, **kwargs):
+        from .dedup import dedup_fields
+        for field, value in dedup_fields(self.job_title, self.company_name, self.job_url).items():
+            setattr(self, field, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'job_title', 'company_name', 'job_url'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'dedup_fingerprint', 'dedup_url_hash', 'dedup_company_key'}
+        super().save(*args, **kwargs)
+
     # Add this method to your JobApplication model
     def calculate_ai_score(self):
         """Calculate overall score from individual dimension scores"""
@@ -595,6 +609,7 @@ class JobApplication(models.Model):
         unique_together = ['user', 'job_title', 'company_name']
         indexes = [
             models.Index(fields=['user', 'application_status']),
+            models.Index(fields=['user', 'application_status', 'created_at']),
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['urgency_level']),
             models.Index(fields=['next_follow_up_date']),
@@ -606,6 +621,9 @@ class JobApplication(models.Model):
             models.Index(fields=['remote_type']),
             models.Index(fields=['employment_type', 'experience_level']),
             models.Index(fields=['remote_type', 'employment_type']),
+            models.Index(fields=['user', 'dedup_fingerprint']),
+            models.Index(fields=['user', 'dedup_url_hash']),
+            models.Index(fields=['user', 'dedup_company_key']),
         ]
 
     def get_status_display_color(self):
@@ -830,6 +848,27 @@ class EmailProcessingLog(models.Model):
         return self.created_at >= timezone.now() - timezone.timedelta(hours=24)
 
 
+class EmailProcessingDailyRollup(models.Model):
+    """Per-day counts of processed emails, kept after the raw EmailProcessingLog rows expire"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    day = models.DateField()
+    email_type = models.CharField(max_length=50, choices=EmailProcessingLog.EMAIL_TYPES)
+    processing_result = models.CharField(max_length=50, choices=EmailProcessingLog.PROCESSING_RESULTS)
+
+    count = models.IntegerField(default=0)
+    confidence_total = models.FloatField(default=0.0)
+    processing_time_total = models.FloatField(default=0.0)  # seconds
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-day']
+        unique_together = ['user', 'day', 'email_type', 'processing_result']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.day} - {self.email_type}/{self.processing_result}: {self.count}"
+
+
 class EmailSettings(models.Model):
     """User-specific email processing settings"""
 
@@ -873,43 +912,37 @@ class EmailSettings(models.Model):
     def __str__(self):
         return f"Email Settings - {self.user.username}"
 
+    @property
+    def compiled_filter(self):
+        """Blacklist and keyword rules compiled once per (id, updated_at)"""
+        from .email_filters import email_filters
+
+        return email_filters.get(self)
+
     def is_sender_blacklisted(self, sender_email):
-        """Check if sender is blacklisted"""
-        return sender_email.lower() in [s.lower() for s in self.blacklisted_senders]
+        """Check if sender is blacklisted (supports *@domain and *.domain entries)"""
+        return self.compiled_filter.is_sender_blacklisted(sender_email)
 
     def should_process_email(self, email_data):
         """Determine if email should be processed based on settings"""
-        # Check blacklist
-        if self.is_sender_blacklisted(email_data.get('sender', '')):
-            return False
-
-        # Check required keywords
-        if self.required_keywords:
-            email_text = (email_data.get('subject', '') + ' ' + email_data.get('body', '')).lower()
-            has_required_keyword = any(keyword.lower() in email_text for keyword in self.required_keywords)
-            if not has_required_keyword:
-                return False
-
-        # Check filter keywords (exclusions)
-        if self.keyword_filters:
-            email_text = (email_data.get('subject', '') + ' ' + email_data.get('body', '')).lower()
-            has_filter_keyword = any(keyword.lower() in email_text for keyword in self.keyword_filters)
-            if has_filter_keyword:
-                return False
-
-        return True
+        return self.compiled_filter.matches(email_data)
+
+    def filter_many(self, emails):
+        """The emails from a batch that should be processed"""
+        return self.compiled_filter.filter_many(emails)
 
     def get_processing_stats(self):
         """Get processing statistics for this user"""
-        logs = EmailProcessingLog.objects.filter(user=self.user)
+        from dashboard.email_stats import email_analytics
 
+        summary = email_analytics.get_summary(self.user)
         return {
-            'total_processed': logs.count(),
-            'success_rate': self.calculate_success_rate(logs),
-            'jobs_found': logs.filter(email_type='job_alert', processing_result='success').count(),
-            'interviews_detected': logs.filter(email_type='interview_invite', processing_result='success').count(),
-            'avg_confidence': logs.aggregate(avg_confidence=models.Avg('confidence_score'))['avg_confidence'] or 0,
-            'recent_activity': logs.filter(created_at__gte=timezone.now() - timezone.timedelta(hours=24)).count()
+            'total_processed': summary['total'],
+            'success_rate': summary['success_rate'],
+            'jobs_found': summary['jobs_found'],
+            'interviews_detected': summary['interviews_detected'],
+            'avg_confidence': summary['avg_confidence'],
+            'recent_activity': summary['recent']
         }
 
     def calculate_success_rate(self, logs):
@@ -943,6 +976,7 @@ class EmailQueue(models.Model):
     processing_attempts = models.IntegerField(default=0)
     max_attempts = models.IntegerField(default=3)
     next_attempt_at = models.DateTimeField(null=True, blank=True)
+    claim_token = models.CharField(max_length=32, blank=True, db_index=True)  # Set by the worker holding the row
 
     # Results
     processing_log = models.ForeignKey(EmailProcessingLog, null=True, blank=True,
@@ -956,6 +990,7 @@ class EmailQueue(models.Model):
         ordering = ['priority', 'created_at']
         indexes = [
             models.Index(fields=['status', 'priority', 'created_at']),
+            models.Index(fields=['priority', 'status', 'next_attempt_at']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['next_attempt_at'])
         ]
@@ -973,30 +1008,33 @@ class EmailQueue(models.Model):
         if self.can_retry():
             self.status = 'retry'
             self.next_attempt_at = timezone.now() + timezone.timedelta(minutes=delay_minutes)
-            self.save()
+            self.save(update_fields=['status', 'next_attempt_at', 'updated_at'])
 
     def mark_processing(self):
         """Mark email as being processed"""
         self.status = 'processing'
-        self.processing_attempts += 1
-        self.save()
+        self.processing_attempts = models.F('processing_attempts') + 1
+        self.save(update_fields=['status', 'processing_attempts', 'updated_at'])
+        self.refresh_from_db(fields=['processing_attempts'])
 
     def mark_completed(self, processing_log):
         """Mark email as completed"""
         self.status = 'completed'
         self.processing_log = processing_log
-        self.save()
+        self.error_message = ''
+        self.save(update_fields=['status', 'processing_log', 'error_message', 'updated_at'])
 
-    def mark_failed(self, error_message):
-        """Mark email as failed"""
+    def mark_failed(self, error_message, delay_minutes=5):
+        """Mark email as failed, scheduling a retry if attempts remain"""
         self.status = 'failed'
         self.error_message = error_message
 
         # Schedule retry if possible
         if self.can_retry():
-            self.schedule_retry()
+            self.status = 'retry'
+            self.next_attempt_at = timezone.now() + timezone.timedelta(minutes=delay_minutes)
 
-        self.save()
+        self.save(update_fields=['status', 'error_message', 'next_attempt_at', 'updated_at'])
 
     @property
     def is_ready_for_processing(self):
@@ -0,0 +1,141 @@
+# jobs/pipeline.py - PIPELINE BOARD LOADER
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+# Board columns and the model statuses each one shows
+PIPELINE_COLUMNS = {
+    'found': ['discovered', 'saved'],
+    'applied': ['applied'],
+    'responded': ['application_viewed', 'phone_screening'],
+    'interview': ['first_interview', 'second_interview', 'final_interview', 'technical_assessment', 'reference_check'],
+    'offer': ['offer_pending', 'offer_received', 'offer_accepted'],
+    'closed': ['hired', 'rejected_automated', 'rejected_screening', 'rejected_interview',
+               'rejected_offer', 'withdrawn', 'ghosted'],
+}
+
+STATUS_COLUMNS = {status: column for column, statuses in PIPELINE_COLUMNS.items() for status in statuses}
+
+SUCCESS_STATUSES = ('hired', 'offer_accepted')
+
+# Everything an application card renders - nothing else is loaded for the board
+BOARD_FIELDS = (
+    'id', 'user_id', 'company_name', 'job_title', 'location', 'salary_range', 'urgency_level',
+    'application_status', 'created_at', 'applied_date', 'next_follow_up_date', 'last_follow_up_date',
+    'follow_up_count', 'interview_scheduled_date', 'offer_amount', 'match_percentage', 'documents_generated',
+)
+
+
+class PipelineColumn:
+    """One board column: the first page of cards plus the column's full count"""
+
+    def __init__(self, name):
+        self.name = name
+        self.cards = []
+        self.count = 0
+        self.next_cursor = None
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __bool__(self):
+        return bool(self.cards)
+
+
+class PipelineBoard:
+    """Columns and analytics built from a single pass over the user's applications"""
+
+    def __init__(self):
+        self.columns = {name: PipelineColumn(name) for name in PIPELINE_COLUMNS}
+        self.count = 0
+        self.analytics = {}
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __len__(self):
+        return self.count
+
+
+def encode_cursor(application):
+    return f"{application.created_at.isoformat()}|{application.id}"
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor string; ValueError if it was tampered with"""
+    created_at, application_id = cursor.rsplit('|', 1)
+    return datetime.fromisoformat(created_at), int(application_id)
+
+
+class PipelineLoader:
+    """
+    Loads the applications board. The user's applications are read once with only the card
+    fields, partitioned into columns by status in Python, and every count and analytic is
+    taken from that same pass. Each column keeps its first PAGE_SIZE cards; the rest are
+    fetched per column with a (created_at, id) cursor.
+    """
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'PIPELINE_BOARD_PAGE_SIZE', 50)
+
+    @staticmethod
+    def board_queryset(queryset):
+        return queryset.select_related(None).only(*BOARD_FIELDS).order_by('-created_at', '-id')
+
+    def load(self, queryset):
+        """PipelineBoard for an already-filtered JobApplication queryset"""
+        board = PipelineBoard()
+        successes = match_total = match_count = 0
+
+        for application in self.board_queryset(queryset).iterator(chunk_size=2000):
+            board.count += 1
+            if application.match_percentage is not None:
+                match_total += application.match_percentage
+                match_count += 1
+
+            name = STATUS_COLUMNS.get(application.application_status)
+            if name is None:
+                continue  # Legacy statuses count towards the total but have no column
+            column = board.columns[name]
+            column.count += 1
+            if name == 'closed' and application.application_status in SUCCESS_STATUSES:
+                successes += 1
+            if len(column.cards) < self.page_size:
+                column.cards.append(application)
+            elif column.next_cursor is None:
+                column.next_cursor = encode_cursor(column.cards[-1])
+
+        total = board.count
+        columns = board.columns
+        responses = columns['responded'].count + columns['interview'].count + columns['offer'].count
+        board.analytics = {
+            'total_applications': total,
+            'success_rate': round(successes / total * 100, 1) if total > 0 else 0,
+            'response_rate': round(responses / total * 100, 1) if total > 0 else 0,
+            'avg_match_score': match_total / match_count if match_count else 0,
+        }
+        return board
+
+    def load_column(self, queryset, column, cursor=None, limit=None):
+        """(cards, next_cursor) for one column, starting after cursor"""
+        limit = limit or self.page_size
+        cards = self.board_queryset(queryset.filter(application_status__in=PIPELINE_COLUMNS[column]))
+        if cursor:
+            created_at, application_id = decode_cursor(cursor)
+            cards = cards.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=application_id))
+
+        cards = list(cards[:limit + 1])
+        next_cursor = encode_cursor(cards[limit - 1]) if len(cards) > limit else None
+        return cards[:limit], next_cursor
+
+
+# Singleton instance
+pipeline_loader = PipelineLoader()
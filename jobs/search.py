@@ -0,0 +1,227 @@
+# jobs/search.py - FULL-TEXT SEARCH OVER JOB APPLICATIONS
+import logging
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+# Indexed columns, most important first (bm25 / setweight order)
+SEARCH_FIELDS = ('job_title', 'company_name', 'location', 'job_description', 'notes')
+
+APPLICATION_TABLE = 'jobs_jobapplication'
+FTS_TABLE = 'jobs_application_fts'
+PG_VECTOR_COLUMN = 'search_vector'
+PG_INDEX = 'jobs_application_search_idx'
+
+SQLITE_WEIGHTS = (10.0, 8.0, 4.0, 1.0, 2.0)
+PG_WEIGHTS = ('A', 'A', 'B', 'C', 'D')
+
+# Snippet delimiters that cannot appear in user text; swapped for <mark> after escaping
+MARK_START, MARK_END = '\x02', '\x03'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class ApplicationSearchIndex:
+    """
+    Ranked full-text search over an application's title, company, location, description and notes.
+    SQLite uses an external-content FTS5 table kept in sync by triggers; PostgreSQL uses a
+    generated tsvector column with a GIN index. Both are kept current by the database itself,
+    so bulk_create and queryset.update() stay indexed. Other backends fall back to icontains.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    @property
+    def vendor(self):
+        return connections[self.using].vendor
+
+    @staticmethod
+    def tokens(query):
+        return TOKEN_RE.findall(query or '')[:16]
+
+    # ------------------------------------------------------------------
+    # Index management
+    # ------------------------------------------------------------------
+
+    def ensure_index(self, using=None):
+        """Create the index structures if missing; returns True when a new index was built"""
+        connection = connections[using or self.using]
+        if APPLICATION_TABLE not in connection.introspection.table_names():
+            return False
+        if connection.vendor == 'sqlite':
+            return self._ensure_sqlite(connection)
+        if connection.vendor == 'postgresql':
+            return self._ensure_postgresql(connection)
+        return False
+
+    def _ensure_sqlite(self, connection):
+        columns = ', '.join(SEARCH_FIELDS)
+        new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+        old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            if cursor.fetchone():
+                return False
+
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, "
+                f"content='{APPLICATION_TABLE}', content_rowid='id', tokenize='porter unicode61')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {APPLICATION_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {APPLICATION_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {columns} ON {APPLICATION_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        logger.info(f"Created FTS5 search index {FTS_TABLE}")
+        return True
+
+    def _ensure_postgresql(self, connection):
+        vector = ' || '.join(
+            f"setweight(to_tsvector('english', coalesce({field}, '')), '{weight}')"
+            for field, weight in zip(SEARCH_FIELDS, PG_WEIGHTS)
+        )
+        with connection.cursor() as cursor:
+            columns = [
+                column.name for column in connection.introspection.get_table_description(cursor, APPLICATION_TABLE)
+            ]
+            created = PG_VECTOR_COLUMN not in columns
+            if created:
+                cursor.execute(
+                    f"ALTER TABLE {APPLICATION_TABLE} ADD COLUMN {PG_VECTOR_COLUMN} tsvector "
+                    f"GENERATED ALWAYS AS ({vector}) STORED"
+                )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {APPLICATION_TABLE} USING GIN ({PG_VECTOR_COLUMN})"
+            )
+        if created:
+            logger.info(f"Added {PG_VECTOR_COLUMN} column and GIN index to {APPLICATION_TABLE}")
+        return created
+
+    def rebuild(self):
+        """Re-index every application (SQLite only; the PostgreSQL column is generated)"""
+        connection = connections[self.using]
+        self.ensure_index()
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _sqlite_match(self, tokens):
+        # Every token must appear; each is a quoted prefix term so user input can't inject FTS syntax
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def _pg_tsquery(self, tokens):
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+    def search(self, queryset, query, rank=True):
+        """
+        queryset narrowed to applications matching query. With rank, each row is annotated
+        with search_rank (higher is better) - order by '-search_rank' for relevance order.
+        """
+        tokens = self.tokens(query)
+        if not tokens:
+            return queryset
+
+        vendor = self.vendor
+        if vendor == 'sqlite':
+            match = self._sqlite_match(tokens)
+            queryset = queryset.filter(RawSQL(
+                f"{APPLICATION_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+                [match], output_field=BooleanField()
+            ))
+            if rank:
+                # MATERIALIZED (SQLite 3.35+) makes SQLite run MATCH and bm25 once and look each
+                # row up in an automatic index; a plain derived table gets flattened into the
+                # correlated subquery and re-runs the MATCH for every candidate row
+                weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+                queryset = queryset.annotate(search_rank=RawSQL(
+                    f"(WITH ranked AS MATERIALIZED (SELECT rowid AS id, -bm25({FTS_TABLE}, {weights}) AS score "
+                    f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) "
+                    f"SELECT score FROM ranked WHERE ranked.id = {APPLICATION_TABLE}.id)",
+                    [match], output_field=FloatField()
+                ))
+            return queryset
+
+        if vendor == 'postgresql':
+            tsquery = self._pg_tsquery(tokens)
+            queryset = queryset.filter(RawSQL(
+                f"{APPLICATION_TABLE}.{PG_VECTOR_COLUMN} @@ to_tsquery('english', %s)",
+                [tsquery], output_field=BooleanField()
+            ))
+            if rank:
+                queryset = queryset.annotate(search_rank=RawSQL(
+                    f"ts_rank_cd({APPLICATION_TABLE}.{PG_VECTOR_COLUMN}, to_tsquery('english', %s))",
+                    [tsquery], output_field=FloatField()
+                ))
+            return queryset
+
+        condition = Q()
+        for token in tokens:
+            condition &= Q(*(Q(**{f'{field}__icontains': token}) for field in SEARCH_FIELDS), _connector=Q.OR)
+        queryset = queryset.filter(condition)
+        if rank:
+            # No relevance score without an index; a constant keeps order_by('-search_rank') valid
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+
+    def highlight(self, applications, query, words=16):
+        """
+        Set search_snippet (safe HTML with <mark> around matches) on each application.
+        One query for the whole page of results.
+        """
+        applications = list(applications)
+        tokens = self.tokens(query)
+        if not applications or not tokens:
+            return applications
+
+        ids = [application.id for application in applications]
+        placeholders = ', '.join(['%s'] * len(ids))
+        vendor = self.vendor
+        snippets = {}
+        with connections[self.using].cursor() as cursor:
+            if vendor == 'sqlite':
+                cursor.execute(
+                    f"SELECT rowid, snippet({FTS_TABLE}, -1, %s, %s, '…', %s) FROM {FTS_TABLE} "
+                    f"WHERE {FTS_TABLE} MATCH %s AND rowid IN ({placeholders})",
+                    [MARK_START, MARK_END, words, self._sqlite_match(tokens), *ids]
+                )
+                snippets = dict(cursor.fetchall())
+            elif vendor == 'postgresql':
+                document = " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS[2:])
+                cursor.execute(
+                    f"SELECT id, ts_headline('english', {document}, to_tsquery('english', %s), %s) "
+                    f"FROM {APPLICATION_TABLE} WHERE id IN ({placeholders})",
+                    [self._pg_tsquery(tokens),
+                     f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords={words}, MinWords=5', *ids]
+                )
+                snippets = dict(cursor.fetchall())
+
+        for application in applications:
+            snippet = snippets.get(application.id, '')
+            application.search_snippet = mark_safe(
+                escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+            )
+        return applications
+
+
+# Singleton instance
+application_search = ApplicationSearchIndex()
@@ -0,0 +1,20 @@
+# jobs/tasks.py
+import logging
+
+from celery import shared_task
+
+from .email_retention import email_log_retention
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def purge_expired_email_logs():
+    """Nightly: enforce each user's email log retention, rolling purged rows up by day"""
+    try:
+        result = email_log_retention.purge()
+        return result['deleted']
+
+    except Exception as e:
+        logger.error(f"Error purging email processing logs: {str(e)}")
+        return 0
@@ -9,6 +9,7 @@ urlpatterns = [
     path('applications/', views.ApplicationListView.as_view(), name='applications'),
     path('applications/<int:pk>/', views.ApplicationDetailView.as_view(), name='application_detail'),
     path('applications/<int:pk>/update-status/', views.UpdateApplicationStatusView.as_view(), name='update_status'),
+    path('applications/pipeline/<str:column>/', views.PipelineColumnView.as_view(), name='pipeline_column'),
 
     # Universal search configuration management
     path('search-config/', views.JobSearchConfigView.as_view(), name='search_config'),
@@ -37,5 +38,6 @@ urlpatterns = [
     path('api/email-stats/', views.EmailProcessingStatsView.as_view(), name='email_processing_stats'),
 
     path('<int:job_id>/score/', views.score_job_with_ai, name='score_job_ai'),
+    path('scoring/<uuid:batch_id>/', views.scoring_batch_progress, name='scoring_batch_progress'),
     path('<int:job_id>/approve/', views.approve_job, name='approve_job'),
 ]
\ No newline at end of file
@@ -9,15 +9,21 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Q, Count, Avg
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView, View
 from django.db.models import F
 from django.core.paginator import Paginator
 from django.conf import settings
+from dashboard.counters import pipeline_counters
+from dashboard.email_stats import email_analytics, success_rate
+from job_automation.http_client import http_client
 from .forms import UniversalJobSearchConfigForm, JobApplicationUpdateForm, BulkApplicationForm
 from .models import JobApplication, JobSearchConfig
+from .dedup import find_duplicate_job
+from .pipeline import PIPELINE_COLUMNS, pipeline_loader
+from .search import application_search
 
 
 class JobSearchConfigView(LoginRequiredMixin, ListView):
@@ -119,7 +125,7 @@ class CreateSearchConfigView(LoginRequiredMixin, CreateView):
 
             # Send to n8n webhook
             if hasattr(settings, 'N8N_WEBHOOK_URL'):
-                response = requests.post(
+                response = http_client.post(
                     f"{settings.N8N_WEBHOOK_URL}/universal-job-search",
                     json=webhook_data,
                     headers={'Authorization': f'Bearer {getattr(settings, "N8N_API_TOKEN", "")}'},
@@ -279,7 +285,7 @@ class ExecuteSearchView(LoginRequiredMixin, View):
 
             # Send to n8n universal job search webhook
             if hasattr(settings, 'N8N_WEBHOOK_URL'):
-                response = requests.post(
+                response = http_client.post(
                     f"{settings.N8N_WEBHOOK_URL}/universal-job-search",
                     json=webhook_data,
                     headers={
@@ -402,7 +408,7 @@ class BulkActionView(LoginRequiredMixin, View):
 
             # Send to n8n webhook for follow-up processing
             if hasattr(settings, 'N8N_WEBHOOK_URL'):
-                response = requests.post(
+                response = http_client.post(
                     f"{settings.N8N_WEBHOOK_URL}/bulk-followup",
                     json={
                         'user_id': request.user.id,
@@ -416,7 +422,8 @@ class BulkActionView(LoginRequiredMixin, View):
 
                 if response.status_code == 200:
                     # Update follow-up tracking
-                    followup_ready.update(
+                    pipeline_counters.bulk_update_applications(
+                        followup_ready,
                         last_follow_up_date=timezone.now(),
                         follow_up_count=F('follow_up_count') + 1,
                         next_follow_up_date=timezone.now().date() + timezone.timedelta(days=14)
@@ -441,7 +448,8 @@ class BulkActionView(LoginRequiredMixin, View):
             return redirect('jobs:applications')
 
         # Update status and applied date
-        updated_count = applicable_apps.update(
+        updated_count = pipeline_counters.bulk_update_applications(
+            applicable_apps,
             application_status='applied',
             applied_date=timezone.now()
         )
@@ -470,7 +478,7 @@ class BulkActionView(LoginRequiredMixin, View):
         if new_status == 'applied':
             update_data['applied_date'] = timezone.now()
 
-        updated_count = applications.update(**update_data)
+        updated_count = pipeline_counters.bulk_update_applications(applications, **update_data)
         status_display = dict(JobApplication.STATUS_CHOICES)[new_status]
 
         messages.success(request, f'{updated_count} applications updated to "{status_display}" status.')
@@ -542,7 +550,8 @@ class BulkActionView(LoginRequiredMixin, View):
 
         # This would integrate with calendar systems
         # For now, just update the applications
-        updated_count = interview_apps.update(
+        updated_count = pipeline_counters.bulk_update_applications(
+            interview_apps,
             next_follow_up_date=timezone.now().date() + timezone.timedelta(days=1)
         )
 
@@ -585,11 +594,7 @@ class JobListView(LoginRequiredMixin, ListView):
 
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(job_title__icontains=search) |
-                Q(company_name__icontains=search) |
-                Q(location__icontains=search)
-            )
+            queryset = application_search.search(queryset, search)
 
         # Date range filtering
         date_from = self.request.GET.get('date_from')
@@ -609,8 +614,10 @@ class JobListView(LoginRequiredMixin, ListView):
 
         # Sort options
         sort_by = self.request.GET.get('sort', '-created_at')
-        if sort_by in ['-created_at', 'created_at', 'job_title', 'company_name',
-                       'application_status', 'urgency_level', '-match_percentage']:
+        if search and 'sort' not in self.request.GET and application_search.tokens(search):
+            queryset = queryset.order_by('-search_rank', '-created_at')  # Most relevant first
+        elif sort_by in ['-created_at', 'created_at', 'job_title', 'company_name',
+                         'application_status', 'urgency_level', '-match_percentage']:
             queryset = queryset.order_by(sort_by)
 
         return queryset
@@ -619,6 +626,10 @@ class JobListView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         context['bulk_form'] = BulkApplicationForm(user=self.request.user)
 
+        search = self.request.GET.get('search')
+        if search:
+            context['jobs'] = context['object_list'] = application_search.highlight(context['object_list'], search)
+
         # Add filter choices for the template
         applications = JobApplication.objects.filter(user=self.request.user)
         context.update({
@@ -633,6 +644,23 @@ class JobListView(LoginRequiredMixin, ListView):
 
 # jobs/views.py - Replace your ApplicationListView.get_context_data method with this:
 
+def filter_board_applications(queryset, params):
+    """Apply the pipeline board's status, urgency and search filters from query parameters"""
+    status_filter = params.get('status')
+    if status_filter:
+        queryset = queryset.filter(application_status=status_filter)
+
+    urgency_filter = params.get('urgency')
+    if urgency_filter:
+        queryset = queryset.filter(urgency_level=urgency_filter)
+
+    search_query = params.get('search')
+    if search_query:
+        queryset = application_search.search(queryset, search_query, rank=False)  # The board orders by date
+
+    return queryset
+
+
 class ApplicationListView(LoginRequiredMixin, ListView):
     """Enhanced pipeline view for job applications"""
     model = JobApplication
@@ -641,81 +669,58 @@ class ApplicationListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         queryset = JobApplication.objects.filter(user=self.request.user).select_related('search_config')
+        return filter_board_applications(queryset, self.request.GET)
 
-        # Apply filters from query parameters
-        status_filter = self.request.GET.get('status')
-        if status_filter:
-            queryset = queryset.filter(application_status=status_filter)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
 
-        urgency_filter = self.request.GET.get('urgency')
-        if urgency_filter:
-            queryset = queryset.filter(urgency_level=urgency_filter)
+        # One pass over the filtered applications fills every column and the analytics
+        board = pipeline_loader.load(self.object_list)
+        context['applications'] = context['object_list'] = board
+        context['pipeline'] = board.columns
+        context['analytics'] = board.analytics
 
-        search_query = self.request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(job_title__icontains=search_query) |
-                Q(company_name__icontains=search_query) |
-                Q(location__icontains=search_query)
-            )
+        return context
 
-        return queryset
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        applications = self.get_queryset()
-
-        # CORRECTED: Map model statuses to template pipeline statuses
-        context['pipeline'] = {
-            # Template expects 'found' - map from 'discovered' and 'saved'
-            'found': applications.filter(application_status__in=['discovered', 'saved']),
-
-            # Template expects 'applied' - direct match
-            'applied': applications.filter(application_status='applied'),
-
-            # Template expects 'responded' - map from response-related statuses
-            'responded': applications.filter(application_status__in=[
-                'application_viewed', 'phone_screening'
-            ]),
-
-            # Template expects 'interview' - map from all interview statuses
-            'interview': applications.filter(application_status__in=[
-                'first_interview', 'second_interview', 'final_interview',
-                'technical_assessment', 'reference_check'
-            ]),
-
-            # Template expects 'offer' - map from offer-related statuses
-            'offer': applications.filter(application_status__in=[
-                'offer_pending', 'offer_received', 'offer_accepted'
-            ]),
-
-            # Template expects 'closed' - map from final statuses
-            'closed': applications.filter(application_status__in=[
-                'hired', 'rejected_automated', 'rejected_screening',
-                'rejected_interview', 'rejected_offer', 'withdrawn', 'ghosted'
-            ])
-        }
+class PipelineColumnView(LoginRequiredMixin, View):
+    """Next page of cards for one pipeline column (lazy loading on large boards)"""
 
-        # Add analytics
-        total_apps = applications.count()
-        context['analytics'] = {
-            'total_applications': total_apps,
-            'success_rate': round(
-                (context['pipeline']['closed'].filter(
-                    application_status__in=['hired', 'offer_accepted']
-                ).count() / total_apps * 100), 1
-            ) if total_apps > 0 else 0,
-            'response_rate': round(
-                ((context['pipeline']['responded'].count() +
-                  context['pipeline']['interview'].count() +
-                  context['pipeline']['offer'].count()) / total_apps * 100), 1
-            ) if total_apps > 0 else 0,
-            'avg_match_score': applications.aggregate(
-                avg_match=Avg('match_percentage')
-            )['avg_match'] or 0,
-        }
+    def get(self, request, column):
+        if column not in PIPELINE_COLUMNS:
+            return JsonResponse({'error': 'Unknown pipeline column'}, status=404)
 
-        return context
+        try:
+            # Same filters as the board, so later pages match the cards already shown
+            cards, next_cursor = pipeline_loader.load_column(
+                filter_board_applications(JobApplication.objects.filter(user=request.user), request.GET),
+                column,
+                cursor=request.GET.get('cursor'),
+                limit=max(1, min(int(request.GET.get('limit', pipeline_loader.page_size)), 200))
+            )
+        except ValueError:
+            return JsonResponse({'error': 'Invalid cursor or limit'}, status=400)
+
+        return JsonResponse({
+            'column': column,
+            'cards': [{
+                'id': app.id,
+                'company_name': app.company_name,
+                'job_title': app.job_title,
+                'location': app.location,
+                'salary_range': app.salary_range,
+                'urgency_level': app.urgency_level,
+                'application_status': app.application_status,
+                'status_display': app.get_application_status_display(),
+                'created_at': app.created_at.isoformat(),
+                'applied_date': app.applied_date.isoformat() if app.applied_date else None,
+                'next_follow_up_date': app.next_follow_up_date.isoformat() if app.next_follow_up_date else None,
+                'follow_up_count': app.follow_up_count,
+                'match_percentage': app.match_percentage,
+                'documents_generated': app.documents_generated,
+            } for app in cards],
+            'next_cursor': next_cursor,
+        })
 
 # JavaScript mapping function (add to your template)
 def get_pipeline_status_mapping():
@@ -942,27 +947,31 @@ class N8NWebhookView(View):
             updated_count = 0
 
             for job_data in jobs:
-                # Create or update job application
-                application, created = JobApplication.objects.get_or_create(
-                    user=user,
-                    job_url=job_data.get('job_url', ''),
-                    defaults={
-                        'search_config': config,
-                        'job_title': job_data.get('job_title', ''),
-                        'company_name': job_data.get('company_name', ''),
-                        'job_description': job_data.get('job_description', ''),
-                        'salary_range': job_data.get('salary_range', ''),
-                        'location': job_data.get('location', ''),
-                        'remote_option': job_data.get('remote_option', ''),
-                        'application_source': job_data.get('source', 'other'),
-                        'match_percentage': job_data.get('match_percentage', 0),
-                        'company_rating': job_data.get('company_rating'),
-                        'application_status': 'discovered',
-                        'urgency_level': job_data.get('urgency_level', 'medium'),
-                    }
+                # Create or update job application (reposts match on fingerprint or canonical URL)
+                application = find_duplicate_job(
+                    user,
+                    job_data.get('job_title', ''),
+                    job_data.get('company_name', ''),
+                    job_data.get('job_url', '')
                 )
 
-                if created:
+                if application is None:
+                    JobApplication.objects.create(
+                        user=user,
+                        search_config=config,
+                        job_title=job_data.get('job_title', ''),
+                        company_name=job_data.get('company_name', ''),
+                        job_url=job_data.get('job_url', ''),
+                        job_description=job_data.get('job_description', ''),
+                        salary_range=job_data.get('salary_range', ''),
+                        location=job_data.get('location', ''),
+                        remote_option=job_data.get('remote_option', ''),
+                        application_source=job_data.get('source', 'other'),
+                        match_percentage=job_data.get('match_percentage', 0),
+                        company_rating=job_data.get('company_rating'),
+                        application_status='discovered',
+                        urgency_level=job_data.get('urgency_level', 'medium'),
+                    )
                     created_count += 1
                 else:
                     # Update existing application with new data
@@ -1322,7 +1331,7 @@ class ScheduleSearchView(LoginRequiredMixin, View):
             # Send to N8N for scheduling (optional)
             try:
                 if hasattr(settings, 'N8N_WEBHOOK_URL'):
-                    response = requests.post(
+                    response = http_client.post(
                         f"{settings.N8N_WEBHOOK_URL}/schedule-search",
                         json=schedule_data,
                         headers={'Authorization': f'Bearer {getattr(settings, "N8N_API_TOKEN", "")}'},
@@ -1363,6 +1372,8 @@ from datetime import datetime, timedelta
 
 from .models import JobApplication, EmailProcessingLog, EmailSettings
 from accounts.models import UserProfile
+from api.models import ScoringBatch
+from api.tasks import queue_scoring_batch
 
 logger = logging.getLogger(__name__)
 
@@ -1418,13 +1429,8 @@ class EnhancedN8NWebhookView(View):
             job_title = email_data.get('job_title', 'Job from Email')
             company_name = email_data.get('company_name', 'Unknown Company')
 
-            # Check for duplicates
-            existing_job = JobApplication.objects.filter(
-                user=user,
-                job_title__icontains=job_title,
-                company_name__icontains=company_name,
-                created_at__gte=timezone.now() - timedelta(days=7)
-            ).first()
+            # Check for duplicates (indexed fingerprint / canonical URL lookup)
+            existing_job = find_duplicate_job(user, job_title, company_name, email_data.get('job_url', ''))
 
             if existing_job:
                 return JsonResponse({
@@ -1678,31 +1684,7 @@ class EmailProcessingStatsView(View):
 
         user = request.user
 
-        # Get email processing statistics
-        total_emails = EmailProcessingLog.objects.filter(user=user).count()
-        successful_processing = EmailProcessingLog.objects.filter(
-            user=user,
-            processing_result='success'
-        ).count()
-
-        job_alerts = EmailProcessingLog.objects.filter(
-            user=user,
-            email_type='job_alert',
-            processing_result='success'
-        ).count()
-
-        interviews = EmailProcessingLog.objects.filter(
-            user=user,
-            email_type='interview_invite',
-            processing_result='success'
-        ).count()
-
-        # Recent activity (last 7 days)
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_emails = EmailProcessingLog.objects.filter(
-            user=user,
-            processing_date__gte=week_ago
-        ).count()
+        summary = email_analytics.get_summary(user)
 
         # Jobs discovered via email
         email_jobs = JobApplication.objects.filter(
@@ -1710,171 +1692,65 @@ class EmailProcessingStatsView(View):
             source_platform__in=['email_auto', 'email_forward']
         ).count()
 
-        # Success rate
-        success_rate = (successful_processing / total_emails * 100) if total_emails > 0 else 0
-
         return JsonResponse({
-            'total_emails_processed': total_emails,
-            'successful_processing': successful_processing,
-            'job_alerts_found': job_alerts,
-            'interviews_detected': interviews,
-            'recent_activity': recent_emails,
+            'total_emails_processed': summary['total'],
+            'successful_processing': summary['successful'],
+            'job_alerts_found': summary['jobs_found'],
+            'interviews_detected': summary['interviews_detected'],
+            'recent_activity': summary['this_week'],
             'jobs_discovered': email_jobs,
-            'success_rate': round(success_rate, 1),
+            'success_rate': success_rate(summary['successful'], summary['total'], empty=0),
             'processing_enabled': user.userprofile.email_processing_enabled,
             'last_processed': user.userprofile.last_email_processed.isoformat() if user.userprofile.last_email_processed else None
         })
 
 
-@login_required
-@csrf_exempt
-@require_http_methods(["POST"])
 @login_required
 @csrf_exempt
 @require_http_methods(["POST"])
 def score_job_with_ai(request, job_id):
-    """Score job using Groq AI with fallback"""
+    """Queue AI scoring for a job - the page polls scoring_batch_progress for the result"""
     try:
         job = JobApplication.objects.get(id=job_id, user=request.user)
+        batch = queue_scoring_batch(request.user, [job.id])
 
-        # Get user profile for scoring context
-        try:
-            profile = request.user.userprofile
-            user_context = {
-                'skills': profile.skills or [],
-                'experience_years': profile.experience_years or 0,
-                'current_position': profile.current_position or '',
-                'target_positions': profile.target_positions or [],
-                'preferred_locations': profile.preferred_locations or [],
-                'salary_expectations': getattr(profile, 'salary_expectations', '')
-            }
-        except:
-            user_context = {}
-
-        # Prepare prompt for Groq AI
-        prompt = f"""
-Analyze this job posting and score it for the user profile:
-
-JOB DETAILS:
-Title: {job.job_title}
-Company: {job.company_name}
-Location: {job.location}
-Salary: {job.salary_range}
-Employment Type: {job.employment_type}
-Experience Level: {job.experience_level}
-Remote Type: {job.remote_type}
-Description: {job.job_description[:1000]}...
-
-USER PROFILE:
-Current Position: {user_context.get('current_position', '')}
-Experience Years: {user_context.get('experience_years', 0)}
-Skills: {', '.join(user_context.get('skills', []))}
-Target Positions: {', '.join(user_context.get('target_positions', []))}
-Preferred Locations: {', '.join(user_context.get('preferred_locations', []))}
-
-Provide detailed scoring (0-100) for each dimension:
-1. Skill Match Score
-2. Experience Match Score  
-3. Location Match Score
-4. Salary Match Score
-5. Culture Match Score
-6. Growth Potential Score
-7. Risk Assessment Score
-
-Also provide:
-- Matched Skills (list)
-- Missing Skills (list)
-- Green Flags (positive indicators, list)
-- Red Flags (concerns, list)
-- AI Reasoning (explanation)
-- Confidence Score (0-1)
-
-Return JSON format only:
-{{
-  "skill_match_score": 85,
-  "experience_match_score": 90,
-  "location_match_score": 75,
-  "salary_match_score": 80,
-  "culture_match_score": 70,
-  "growth_potential_score": 85,
-  "risk_assessment_score": 90,
-  "matched_skills": ["Python", "Django"],
-  "missing_skills": ["React", "AWS"],
-  "green_flags": ["Good company culture", "Growth opportunities"],
-  "red_flags": ["High turnover mentioned"],
-  "ai_reasoning": "Strong technical match with good growth potential...",
-  "confidence_score": 0.85
-}}
-"""
-
-        print(f"Scoring job {job_id} for user {request.user.username}")  # Debug log
-
-        # Try Groq API first
-        groq_response = call_groq_api(prompt)
-
-        # If Groq fails, use fallback scoring
-        if not groq_response:
-            print("Using fallback scoring...")
-            groq_response = {
-                'skill_match_score': 75,
-                'experience_match_score': 80,
-                'location_match_score': 85,
-                'salary_match_score': 70,
-                'culture_match_score': 75,
-                'growth_potential_score': 80,
-                'risk_assessment_score': 85,
-                'matched_skills': ['General skills match', 'Relevant experience'],
-                'missing_skills': ['Some advanced skills may be needed'],
-                'green_flags': ['Good opportunity', 'Company growth potential'],
-                'red_flags': ['Standard requirements', 'Competitive field'],
-                'ai_reasoning': 'Fallback scoring applied - good overall match based on job title and company',
-                'confidence_score': 0.7
-            }
+        return JsonResponse({
+            'success': True,
+            'batch_id': str(batch.id),
+            'progress_url': reverse('jobs:scoring_batch_progress', kwargs={'batch_id': batch.id}),
+        }, status=202)
 
-        # Update job with AI scores
-        job.skill_match_score = groq_response.get('skill_match_score', 75)
-        job.experience_match_score = groq_response.get('experience_match_score', 80)
-        job.location_match_score = groq_response.get('location_match_score', 85)
-        job.salary_match_score = groq_response.get('salary_match_score', 70)
-        job.culture_match_score = groq_response.get('culture_match_score', 75)
-        job.growth_potential_score = groq_response.get('growth_potential_score', 80)
-        job.risk_assessment_score = groq_response.get('risk_assessment_score', 85)
-        job.matched_skills = groq_response.get('matched_skills', [])
-        job.missing_skills = groq_response.get('missing_skills', [])
-        job.green_flags = groq_response.get('green_flags', [])
-        job.red_flags = groq_response.get('red_flags', [])
-        job.ai_reasoning = groq_response.get('ai_reasoning', '')
-        job.confidence_score = groq_response.get('confidence_score', 0.7)
-
-        # Calculate overall score
-        job.calculate_ai_score()
-        job.save()
+    except JobApplication.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Job not found'})
+    except Exception as e:
+        logger.error(f"Scoring error for job {job_id}: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)})
 
-        print(f"Job {job_id} scored successfully with {job.overall_match_score}%")  # Debug log
 
-        return JsonResponse({
-            'success': True,
-            'scores': {
+@login_required
+@require_http_methods(["GET"])
+def scoring_batch_progress(request, batch_id):
+    """Scored/failed/pending counts for a scoring batch"""
+    try:
+        batch = ScoringBatch.objects.get(id=batch_id, user=request.user)
+    except ScoringBatch.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Scoring batch not found'}, status=404)
+
+    progress = batch.to_progress_dict()
+
+    # Single-job batches (the approval page) also get the resulting scores
+    if batch.status == 'completed' and len(batch.job_ids) == 1:
+        job = JobApplication.objects.filter(id=batch.job_ids[0], user=request.user).first()
+        if job:
+            progress['scores'] = {
                 'overall_match_score': job.overall_match_score,
                 'skill_match_score': job.skill_match_score,
                 'experience_match_score': job.experience_match_score,
                 'recommendation_level': job.recommendation_level,
                 'confidence_score': job.confidence_score
-            },
-            'analysis': {
-                'matched_skills': job.matched_skills,
-                'missing_skills': job.missing_skills,
-                'green_flags': job.green_flags,
-                'red_flags': job.red_flags,
-                'ai_reasoning': job.ai_reasoning
             }
-        })
 
-    except JobApplication.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Job not found'})
-    except Exception as e:
-        print(f"Scoring error: {e}")  # Debug log
-        return JsonResponse({'success': False, 'error': str(e)})
+    return JsonResponse({'success': True, **progress})
 
 
 @login_required
@@ -1894,77 +1770,3 @@ def approve_job(request, job_id):
         })
     except JobApplication.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Job not found'})
-
-
-def call_groq_api(prompt):
-    """Call Groq API for AI analysis with better error handling"""
-    try:
-        groq_api_key = os.getenv('GROQ_API_KEY')
-        print(f"Groq API Key exists: {bool(groq_api_key)}")  # Debug log
-
-        if not groq_api_key:
-            print("ERROR: GROQ_API_KEY not found in environment")
-            return None
-
-        print("Calling Groq API...")  # Debug log
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {groq_api_key}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'model': 'llama3-8b-8192',
-                'messages': [
-                    {'role': 'user', 'content': prompt}
-                ],
-                'temperature': 0.1,
-                'max_tokens': 1000
-            },
-            timeout=30  # 30 second timeout
-        )
-
-        print(f"Groq API Response Status: {response.status_code}")  # Debug log
-
-        if response.status_code == 200:
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            print(f"Groq API Response: {content[:200]}...")  # Debug log (first 200 chars)
-
-            # Try to parse JSON
-            try:
-                parsed_content = json.loads(content)
-                return parsed_content
-            except json.JSONDecodeError as e:
-                print(f"JSON Parse Error: {e}")
-                print(f"Raw content: {content}")
-                # Return a fallback response if JSON parsing fails
-                return {
-                    'skill_match_score': 75,
-                    'experience_match_score': 70,
-                    'location_match_score': 80,
-                    'salary_match_score': 75,
-                    'culture_match_score': 70,
-                    'growth_potential_score': 75,
-                    'risk_assessment_score': 80,
-                    'matched_skills': ['Python', 'Software Development'],
-                    'missing_skills': ['Advanced skills required'],
-                    'green_flags': ['Good company reputation'],
-                    'red_flags': ['High requirements'],
-                    'ai_reasoning': 'AI analysis completed with fallback scoring due to parsing issue',
-                    'confidence_score': 0.7
-                }
-        else:
-            print(f"Groq API Error: {response.status_code} - {response.text}")
-            return None
-
-    except requests.exceptions.Timeout:
-        print("Groq API Timeout after 30 seconds")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"Groq API Request Error: {e}")
-        return None
-    except Exception as e:
-        print(f"Groq API Unexpected Error: {e}")
-        return None
-
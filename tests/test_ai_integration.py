@@ -3,16 +3,23 @@
 Test module for AI integration with Groq and OpenRouter
 """
 import json
+import requests
+import urllib3
+from datetime import timedelta
 from decimal import Decimal
 from unittest.mock import patch, Mock
+from django.core.cache import caches
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.conf import settings
 
 from accounts.models import UserProfile
 from jobs.models import JobApplication
-from documents.models import GeneratedDocument, AIUsageLog, AIProviderStatus
+from documents.models import GeneratedDocument, AIUsageLog, AIProviderStatus, CompanyResearch, CompanyResearchSnapshot
+from documents.research import CompanyResearchService
 from documents.ai_services import AIServiceManager, ai_service
+from documents.provider_router import ProviderRouter, provider_router
+from job_automation.http_client import OutboundHTTPClient
 
 
 class AIProviderTests(TestCase):
@@ -250,6 +257,308 @@ class AIProviderTests(TestCase):
             self.assertIn('budget', result['error'])
 
 
+class OutboundHTTPClientTests(TestCase):
+    """Test the pooled provider HTTP client"""
+
+    def setUp(self):
+        self.client_under_test = OutboundHTTPClient()
+        self.client_under_test.backoff_base = 0
+        self.client_under_test.backoff_max = 0
+
+    def _response(self, status_code):
+        response = Mock()
+        response.status_code = status_code
+        response.headers = {}
+        return response
+
+    def test_session_reused_per_host(self):
+        """Test each host gets one keep-alive session"""
+        groq = self.client_under_test._session_for('api.groq.com')
+        self.assertIs(groq, self.client_under_test._session_for('api.groq.com'))
+        self.assertIsNot(groq, self.client_under_test._session_for('openrouter.ai'))
+
+    def test_retries_retryable_status_and_records_metrics(self):
+        """Test a 503 is retried and counted against the host"""
+        with patch('requests.Session.request', side_effect=[self._response(503), self._response(200)]) as mock_request:
+            response = self.client_under_test.get('https://api.groq.com/openai/v1/models')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], self.client_under_test.timeout_for('api.groq.com'))
+
+        metrics = self.client_under_test.get_metrics()['api.groq.com']
+        self.assertEqual(metrics['requests'], 2)
+        self.assertEqual(metrics['errors'], 1)
+        self.assertEqual(metrics['retries'], 1)
+
+    def test_post_read_timeout_not_resent(self):
+        """Test a POST that timed out waiting for a response is not sent twice"""
+        with patch('requests.Session.request', side_effect=requests.ReadTimeout()) as mock_request:
+            with self.assertRaises(requests.ReadTimeout):
+                self.client_under_test.post('https://openrouter.ai/api/v1/chat/completions', json={})
+
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_post_only_retried_when_server_did_not_act(self):
+        """Test POSTs are resent after a failed connect or a 503 with Retry-After, and nothing else"""
+        url = 'https://n8n.example.com/webhook/followup'
+        refused = requests.ConnectionError(
+            urllib3.exceptions.MaxRetryError(None, url, urllib3.exceptions.NewConnectionError(None, 'refused'))
+        )
+        dropped = requests.ConnectionError(urllib3.exceptions.ProtocolError('Connection aborted.'))
+        throttled = self._response(503)
+        throttled.headers = {'Retry-After': '0'}
+
+        for side_effect, expected_calls in (
+            ([refused, self._response(200)], 2),
+            ([throttled, self._response(200)], 2),
+            ([self._response(502), self._response(200)], 1),
+            ([self._response(503), self._response(200)], 1),
+            ([dropped, self._response(200)], 1),
+        ):
+            with patch('requests.Session.request', side_effect=side_effect) as mock_request:
+                try:
+                    self.client_under_test.post(url, json={})
+                except requests.ConnectionError:
+                    pass
+            self.assertEqual(mock_request.call_count, expected_calls)
+
+    def test_post_retries_opt_in(self):
+        """Test a caller can mark a POST as safe to resend"""
+        with patch('requests.Session.request', side_effect=[self._response(502), self._response(200)]) as mock_request:
+            response = self.client_under_test.post('https://google.serper.dev/search', json={}, idempotent=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 2)
+
+
+class ProviderRouterTests(TestCase):
+    """Test the circuit breaker and provider routing"""
+
+    def setUp(self):
+        caches['ai'].clear()
+        self.router = ProviderRouter()
+        self.user = User.objects.create_user(
+            username='router_test_user',
+            email='router_test@example.com',
+            password='testpass123'
+        )
+        for provider in ['groq', 'openrouter']:
+            AIProviderStatus.objects.get_or_create(provider=provider, defaults={'is_active': True})
+            provider_router.reset(provider)
+        self.addCleanup(caches['ai'].clear)
+
+    def test_circuit_opens_then_probes(self):
+        """Test repeated failures open the circuit and a probe closes it again"""
+        for _ in range(self.router.failure_threshold):
+            self.assertTrue(self.router.allow_request('groq'))
+            self.router.record_failure('groq')
+
+        self.assertFalse(self.router.allow_request('groq'))
+
+        # Cool-down over: exactly one probe goes through
+        self.router._get_health('groq').opened_until = 0
+        self.assertTrue(self.router.allow_request('groq'))
+        self.assertFalse(self.router.allow_request('groq'))
+
+        self.router.record_success('groq', 0.2)
+        self.assertTrue(self.router.allow_request('groq'))
+        self.assertEqual(self.router.get_health()['groq']['circuit'], 'closed')
+
+    def test_open_circuit_shared_between_workers(self):
+        """Test a circuit opened in one process is honoured by another"""
+        for _ in range(self.router.failure_threshold):
+            self.router.record_failure('openrouter')
+
+        other_worker = ProviderRouter()
+        self.assertFalse(other_worker.allow_request('openrouter'))
+
+    def test_route_prefers_measurably_faster_provider(self):
+        """Test the fallback goes first only once it is clearly healthier"""
+        self.assertEqual(self.router.route(['groq', 'openrouter']), ['groq', 'openrouter'])
+
+        for _ in range(self.router.min_samples):
+            self.router.record_success('groq', 4.0)
+            self.router.record_success('openrouter', 1.0)
+
+        self.assertEqual(self.router.route(['groq', 'openrouter']), ['openrouter', 'groq'])
+
+    def test_open_circuit_skips_provider_without_queries(self):
+        """Test a failing primary is skipped without a network call or provider status read"""
+        for _ in range(provider_router.failure_threshold):
+            provider_router.record_failure('groq')
+        # Warm the cached flags and budgets
+        for provider in ['groq', 'openrouter']:
+            provider_router.is_active(provider)
+            provider_router.is_over_budget(provider)
+
+        with patch('documents.ai_services.AIServiceManager._call_groq') as mock_groq, \
+                patch('documents.ai_services.AIServiceManager._call_openrouter') as mock_openrouter, \
+                patch('documents.ai_services.AIServiceManager._update_provider_success'):
+            mock_openrouter.return_value = {
+                'success': True, 'content': 'Fallback', 'provider': 'openrouter',
+                'tokens_used': 10, 'cost': Decimal('0.001'), 'model': 'test', 'cached': False
+            }
+            with self.assertNumQueries(0):
+                result = ai_service._try_provider('groq', 'Prompt', 'cover_letter', self.user.id)
+                self.assertFalse(result['success'])
+                result = ai_service._try_provider('openrouter', 'Prompt', 'cover_letter', self.user.id)
+
+        self.assertTrue(result['success'])
+        mock_groq.assert_not_called()
+        self.assertEqual(provider_router.monthly_spend('openrouter'), Decimal('0.001'))
+
+
+class AIResponseCacheTests(TestCase):
+    """Test the AI response cache"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.user = User.objects.create_user(
+            username='cache_test_user',
+            email='cache_test@example.com',
+            password='testpass123'
+        )
+
+        for provider in ['groq', 'openrouter']:
+            AIProviderStatus.objects.get_or_create(provider=provider, defaults={'is_active': True})
+
+        self.mock_response = Mock()
+        self.mock_response.status_code = 200
+        self.mock_response.json.return_value = {
+            'choices': [{'message': {'content': 'Cached cover letter'}}],
+            'usage': {'total_tokens': 250}
+        }
+
+    def test_identical_request_served_from_cache(self):
+        """Test a repeated prompt skips the provider and is logged as a cache hit"""
+        with patch('documents.ai_services.http_client.post', return_value=self.mock_response) as mock_post:
+            first = ai_service.generate_content('Same prompt', 'cover_letter', self.user.id)
+            second = ai_service.generate_content('Same prompt', 'cover_letter', self.user.id)
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['content'], 'Cached cover letter')
+        self.assertEqual(second['cost'], Decimal('0'))
+
+        logs = AIUsageLog.objects.filter(user=self.user)
+        self.assertEqual(logs.filter(cache_hit=False).count(), 1)
+        self.assertEqual(logs.filter(cache_hit=True).count(), 1)
+        self.assertEqual(logs.get(cache_hit=True).cost_usd, Decimal('0'))
+
+    def test_cache_bypass(self):
+        """Test use_cache=False always calls the provider"""
+        with patch('documents.ai_services.http_client.post', return_value=self.mock_response) as mock_post:
+            ai_service.generate_content('Bypass prompt', 'resume', self.user.id)
+            result = ai_service.generate_content('Bypass prompt', 'resume', self.user.id, use_cache=False)
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertFalse(result['cached'])
+
+    def test_lru_eviction(self):
+        """Test the periodic eviction drops the least recently used entries beyond the limit"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from documents.ai_cache import AIResponseCacheService
+        from documents.models import AIResponseCache
+
+        cache = AIResponseCacheService()
+        cache.max_entries = 2
+        keys = [cache.make_key('groq', 'model', 'system', f'prompt {i}', 0.7) for i in range(3)]
+
+        cache.set(keys[0], 'groq', 'model', 'first')
+        cache.set(keys[1], 'groq', 'model', 'second')
+        self.assertIsNotNone(cache.get(keys[0]))  # keys[1] is now least recently used
+        with CaptureQueriesContext(connection) as queries:
+            cache.set(keys[2], 'groq', 'model', 'third')
+        # A write is just the upsert - trimming is left to the periodic task
+        self.assertFalse([q for q in queries.captured_queries if 'DELETE' in q['sql'] or 'COUNT(' in q['sql']])
+        self.assertEqual(AIResponseCache.objects.count(), 3)
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertEqual(AIResponseCache.objects.count(), 2)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+
+class CompanyResearchCacheTests(TestCase):
+    """Test parallel Serper search and company-level research reuse"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='research_test_user',
+            email='research_test@example.com',
+            password='testpass123'
+        )
+        self.first = JobApplication.objects.create(
+            user=self.user, job_title='Backend Developer', company_name='Acme, Inc.',
+            job_url='https://example.com/jobs/1', application_status='saved'
+        )
+        self.second = JobApplication.objects.create(
+            user=self.user, job_title='Data Engineer', company_name='ACME',
+            job_url='https://example.com/jobs/2', application_status='saved'
+        )
+        self.service = CompanyResearchService()
+        self.service.serper_api_key = 'test-key'
+
+        self.serper_response = Mock()
+        self.serper_response.status_code = 200
+        self.serper_response.json.return_value = {
+            'organic': [{'title': 'Acme news', 'snippet': 'Acme is hiring', 'link': 'https://acme.test'}]
+        }
+        self.analysis = {
+            'success': True,
+            'content': '1. COMPANY OVERVIEW\nAcme builds rockets.\n2. RECENT DEVELOPMENTS\nHiring.',
+            'provider': 'groq',
+            'tokens_used': 100,
+            'cost': Decimal('0.0001')
+        }
+
+    def test_same_company_reuses_research(self):
+        """Test a second application for the same role skips search and AI analysis"""
+        same_role = JobApplication.objects.create(
+            user=self.user, job_title='Developer - Backend', company_name='Acme Inc',
+            job_url='https://example.com/jobs/3', application_status='saved'
+        )
+        with patch('documents.research.http_client.post', return_value=self.serper_response) as mock_search, \
+                patch('documents.research.ai_service.generate_content', return_value=self.analysis) as mock_ai:
+            first = self.service.research_company(self.first.id, self.first.company_name, self.first.job_title)
+            second = self.service.research_company(same_role.id, same_role.company_name, same_role.job_title)
+
+        self.assertEqual(mock_search.call_count, 4)  # One batch of queries for the first application only
+        self.assertEqual(mock_ai.call_count, 1)
+        self.assertEqual(first['source'], 'web_search_ai_analysis')
+        self.assertEqual(second['source'], 'company_cache')
+        self.assertEqual(
+            CompanyResearch.objects.get(application=same_role).company_overview,
+            CompanyResearch.objects.get(application=self.first).company_overview
+        )
+
+    def test_other_role_at_same_company_is_researched(self):
+        """Test the role-specific analysis isn't reused for a different job title"""
+        with patch('documents.research.http_client.post', return_value=self.serper_response) as mock_search, \
+                patch('documents.research.ai_service.generate_content', return_value=self.analysis) as mock_ai:
+            self.service.research_company(self.first.id, self.first.company_name, self.first.job_title)
+            second = self.service.research_company(self.second.id, self.second.company_name, self.second.job_title)
+
+        self.assertEqual(mock_search.call_count, 8)
+        self.assertEqual(mock_ai.call_count, 2)
+        self.assertEqual(second['source'], 'web_search_ai_analysis')
+        self.assertEqual(CompanyResearchSnapshot.objects.filter(company_key='acme').count(), 2)
+
+    def test_stale_research_is_refreshed(self):
+        """Test research older than the TTL is fetched again"""
+        self.service.cache_ttl = timedelta(0)
+        with patch('documents.research.http_client.post', return_value=self.serper_response) as mock_search, \
+                patch('documents.research.ai_service.generate_content', return_value=self.analysis):
+            self.service.research_company(self.first.id, self.first.company_name)
+            self.service.research_company(self.second.id, self.second.company_name)
+
+        self.assertEqual(mock_search.call_count, 6)
+
+
 class DocumentGenerationTests(TestCase):
     """Test document generation with AI integration"""
 
@@ -349,6 +658,65 @@ class DocumentGenerationTests(TestCase):
             self.assertEqual(doc_count, 0)
 
 
+class DocumentTaskGraphTests(TestCase):
+    """Test the parallel document generation task graph"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.user = User.objects.create_user(
+            username='graph_test_user',
+            email='graph_test@example.com',
+            password='testpass123'
+        )
+        self.profile = UserProfile.objects.create(user=self.user, current_job_title='Software Developer')
+        self.application = JobApplication.objects.create(
+            user=self.user,
+            job_title='Python Developer',
+            company_name='Graph Test Company',
+            job_description='Looking for a Python developer with Django experience.'
+        )
+
+        from job_automation.celery import app as celery_app
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+
+    def test_generate_all_documents_aggregates_job_totals(self):
+        """Test the chord callback aggregates totals from every parallel document"""
+        import tempfile
+        from django.test import override_settings
+        from documents.models import DocumentGenerationJob
+        from documents.tasks import DOCUMENT_TYPES, generate_all_documents
+
+        generated = {
+            'success': True,
+            'content': 'Generated document content',
+            'provider': 'groq',
+            'tokens_used': 200,
+            'cost': Decimal('0.0002'),
+            'model': 'llama3-70b-8192'
+        }
+        research = {'success': True, 'data': {'company_name': 'Graph Test Company'}, 'source': 'ai_knowledge_base'}
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                patch('documents.tasks.ai_service.generate_content', return_value=generated), \
+                patch('documents.tasks.research_service.research_company', return_value=research) as mock_research:
+            result = generate_all_documents.delay(self.application.id).get()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['documents_queued'], len(DOCUMENT_TYPES) + 1)
+        mock_research.assert_called_once()
+
+        job = DocumentGenerationJob.objects.get(id=result['job_id'])
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.documents_generated, len(DOCUMENT_TYPES))
+        self.assertEqual(job.total_tokens, 200 * len(DOCUMENT_TYPES))
+        self.assertEqual(job.ai_provider_used, 'groq')
+        self.assertEqual(
+            GeneratedDocument.objects.filter(application=self.application).count(),
+            len(DOCUMENT_TYPES) + 1
+        )
+
+
 if __name__ == '__main__':
     from django.core.management import execute_from_command_line
 
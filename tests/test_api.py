@@ -1,18 +1,26 @@
 # tests/test_api.py - Complete API Testing Suite
 import json
 import pytest
-from django.test import TestCase
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory, force_authenticate
 from rest_framework.authtoken.models import Token
 from rest_framework import status
 from unittest.mock import patch, Mock
 
 from accounts.models import UserProfile
-from jobs.models import JobApplication, JobSearchConfig
+from dashboard.counters import pipeline_counters
+from dashboard.models import UserPipelineCounters
+from jobs.models import EmailProcessingLog, JobApplication, JobSearchConfig
 from followups.models import FollowUpTemplate, FollowUpHistory
 from documents.models import GeneratedDocument
+from job_automation.caching import LOCK_SUFFIX, cache_aside, cache_metrics, get_or_set
+from job_automation.celery import app as celery_app
 
 
 class AuthenticationAPITest(APITestCase):
@@ -608,6 +616,297 @@ class ErrorHandlingAPITest(APITestCase):
         # but it's here for completeness
 
 
+class BulkScoringAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.jobs = [
+            JobApplication.objects.create(
+                user=self.user,
+                job_title=f"Python Developer {i}",
+                company_name=f"Company {i}"
+            )
+            for i in range(3)
+        ]
+        self.ai_response = {
+            'overall_score': 88,
+            'skill_match': 90,
+            'experience_match': 80,
+            'location_match': 85,
+            'salary_match': 75,
+            'culture_match': 70,
+            'matched_skills': ['Python'],
+            'strengths': ['Remote friendly'],
+            'reasoning': 'Strong match',
+            'confidence': 0.9
+        }
+
+        # Run the Celery scoring pipeline inline
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+
+    @patch('api.tasks.call_groq_api')
+    def test_bulk_score_jobs(self, mock_groq):
+        """Test bulk scoring queues a batch and the workers persist every score"""
+        mock_groq.return_value = self.ai_response
+        url = reverse('api:bulk_score_jobs')
+        data = {'job_ids': [job.id for job in self.jobs]}
+
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn('batch_id', response.data)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(mock_groq.call_count, 3)
+
+        for job in self.jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.overall_match_score, 88)
+            self.assertEqual(job.recommendation_level, 'highly_recommended')
+            self.assertEqual(job.matched_skills, ['Python'])
+
+    @patch('api.tasks.call_groq_api')
+    def test_use_cache_string_flags(self, mock_groq):
+        """Test use_cache sent as a string is parsed as a boolean, not by truthiness"""
+        mock_groq.return_value = self.ai_response
+        url = reverse('api:score_job', args=[self.jobs[0].id])
+
+        response = self.client.post(url, {'use_cache': 'false'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(mock_groq.call_args.kwargs['use_cache'])
+
+        response = self.client.post(
+            reverse('api:bulk_score_jobs'), {'job_ids': [self.jobs[1].id], 'use_cache': '0'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(mock_groq.call_args.kwargs['use_cache'])
+
+        response = self.client.post(url, {'use_cache': 'sometimes'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('api.tasks.call_groq_api')
+    def test_scoring_batch_progress(self, mock_groq):
+        """Test the progress endpoint reports scored/failed/pending counts"""
+        mock_groq.side_effect = [self.ai_response, None]
+        url = reverse('api:bulk_score_jobs')
+        response = self.client.post(url, {'job_ids': [self.jobs[0].id, self.jobs[1].id]}, format='json')
+
+        progress = self.client.get(response.data['progress_url'])
+
+        self.assertEqual(progress.status_code, status.HTTP_200_OK)
+        self.assertEqual(progress.data['status'], 'completed')
+        self.assertEqual(progress.data['scored'], 1)
+        self.assertEqual(progress.data['failed'], 1)
+        self.assertEqual(progress.data['pending'], 0)
+
+    @patch('api.scoring.request_groq_scores')
+    def test_bulk_score_jobs_stream(self, mock_groq):
+        """Test streamed bulk scoring returns one NDJSON line per job plus a summary"""
+        mock_groq.side_effect = [(self.ai_response, 500), (None, 0), (self.ai_response, 500)]
+        url = reverse('api:bulk_score_jobs')
+        data = {'job_ids': [job.id for job in self.jobs], 'stream': True}
+
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[-1]['complete'])
+        self.assertEqual(lines[-1]['scored_count'], 2)
+        self.assertEqual(lines[-1]['failed_count'], 1)
+        self.assertEqual(
+            JobApplication.objects.filter(user=self.user, overall_match_score=88).count(), 2
+        )
+
+    @patch('api.scoring.request_groq_scores')
+    def test_stream_disconnect_keeps_finished_scores(self, mock_groq):
+        """Test scores streamed before the client disconnects are still persisted"""
+        mock_groq.return_value = (self.ai_response, 500)
+        url = reverse('api:bulk_score_jobs')
+        data = {'job_ids': [job.id for job in self.jobs], 'stream': True, 'max_concurrency': 1, 'use_cache': False}
+
+        response = self.client.post(url, data, format='json')
+        first = json.loads(next(iter(response.streaming_content)))
+        response.close()
+
+        self.assertTrue(first['success'])
+        self.assertEqual(
+            JobApplication.objects.get(id=first['job_id']).overall_match_score, 88
+        )
+
+
+class DashboardStatsAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='statsuser',
+            email='stats@example.com',
+            password='testpass123'
+        )
+
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        for i, app_status in enumerate(['applied', 'applied', 'interview', 'offer', 'discovered']):
+            JobApplication.objects.create(
+                user=self.user,
+                job_title=f"Stats Developer {i}",
+                company_name=f"Stats Company {i}",
+                application_status=app_status,
+                saved_from_extension=(i == 0)
+            )
+        caches['stats'].clear()
+
+    def test_dashboard_stats_aggregated_and_cached(self):
+        """Test dashboard stats come from a handful of queries and are cached per user"""
+        url = reverse('api:dashboard_stats')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['stats']
+        self.assertEqual(stats['applications']['total'], 5)
+        self.assertEqual(stats['pipeline']['applied'], 2)
+        self.assertEqual(stats['pipeline']['interview'], 1)
+        self.assertEqual(stats['response_rate'], 100)
+        self.assertEqual(len(stats['activity_trend']), 7)
+        self.assertEqual(stats['activity_trend'][-1]['applications'], 5)
+        self.assertLessEqual(len(queries), 10)
+
+        with CaptureQueriesContext(connection) as cached_queries:
+            self.client.get(url)
+        stats_queries = [q for q in cached_queries.captured_queries if 'jobs_jobapplication' in q['sql']]
+        self.assertEqual(stats_queries, [])
+
+    def test_stats_invalidated_on_save(self):
+        """Test saving an application drops the cached stats"""
+        self.client.get(reverse('api:dashboard_stats'))
+        JobApplication.objects.create(user=self.user, job_title="New Job", company_name="New Co")
+
+        response = self.client.get(reverse('api:extension_job_stats'))
+        stats = response.data['stats']
+        self.assertEqual(stats['total_jobs'], 6)
+        self.assertEqual(stats['extension_jobs'], 1)
+        self.assertEqual(stats['applied'], 4)
+        self.assertEqual(stats['status_breakdown']['discovered'], 2)
+
+    def test_pipeline_counters_follow_changes(self):
+        """Test the per-user counters row tracks creates, status changes and deletes"""
+        job = JobApplication.objects.filter(user=self.user, application_status='applied').first()
+        job.application_status = 'interview'
+        job.approval_status = 'approved'
+        job.save()
+        JobApplication.objects.filter(user=self.user, application_status='offer').first().delete()
+
+        counters = UserPipelineCounters.objects.get(pk=self.user.pk)
+        self.assertEqual(counters.total_applications, 4)
+        self.assertEqual(counters.status_count('applied'), 1)
+        self.assertEqual(counters.status_count('interview'), 2)
+        self.assertEqual(counters.status_count('offer'), 0)
+        self.assertEqual(counters.approval_count('pending'), 3)
+        self.assertEqual(counters.approval_count('approved'), 1)
+
+        # Drift introduced by a queryset update is repaired by reconcile
+        JobApplication.objects.filter(user=self.user).update(application_status='rejected')
+        self.assertEqual(pipeline_counters.reconcile([self.user.id]), [self.user.id])
+        counters.refresh_from_db()
+        self.assertEqual(counters.status_counts, {'rejected': 4})
+
+        from api.views import get_approval_stats
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.user, token=self.token)
+        response = get_approval_stats(request)
+        self.assertEqual(response.data['stats']['pending_review'], 3)
+        self.assertEqual(response.data['stats']['total_jobs'], 4)
+
+
+class PipelineCounterDeleteTest(TransactionTestCase):
+    """Deletes run outside a test transaction so foreign keys are checked on commit"""
+
+    def test_user_with_history_can_be_deleted(self):
+        user = User.objects.create_user(username='leaving', email='leaving@example.com', password='testpass123')
+        UserProfile.objects.get_or_create(user=user)
+        application = JobApplication.objects.create(user=user, job_title='Developer', company_name='Acme')
+        GeneratedDocument.objects.create(application=application, document_type='resume', file_path='resume.pdf')
+        FollowUpHistory.objects.create(application=application, subject='Following up', body='Hello')
+        EmailProcessingLog.objects.create(
+            user=user, email_subject='Job alert', email_sender='alerts@example.com',
+            email_received_date=timezone.now(), email_type='job_alert', processing_result='success'
+        )
+        self.assertTrue(UserPipelineCounters.objects.filter(pk=user.pk).exists())
+
+        user.delete()
+
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(UserPipelineCounters.objects.filter(pk=user.pk).exists())
+
+    def test_delete_without_counters_row_does_not_create_one(self):
+        user = User.objects.create_user(username='nocounters', password='testpass123')
+        application = JobApplication.objects.create(user=user, job_title='Developer', company_name='Acme')
+        UserPipelineCounters.objects.filter(pk=user.pk).delete()
+
+        application.delete()
+
+        self.assertFalse(UserPipelineCounters.objects.filter(pk=user.pk).exists())
+
+
+class CacheAsideTest(TestCase):
+    """Test the shared cache-aside helpers"""
+
+    def setUp(self):
+        caches['default'].clear()
+        cache_metrics.reset()
+
+    def test_get_or_set_computes_once_and_counts_hits(self):
+        producer = Mock(return_value=[1, 2, 3])
+
+        self.assertEqual(get_or_set('aside:test', producer, timeout=60), [1, 2, 3])
+        self.assertEqual(get_or_set('aside:test', producer, timeout=60), [1, 2, 3])
+
+        producer.assert_called_once()
+        self.assertEqual(cache_metrics.snapshot()['default'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_locked_miss_waits_for_other_worker(self):
+        """Test a caller that loses the rebuild lock does not run the producer"""
+        cache = caches['default']
+        cache.add('aside:busy' + LOCK_SUFFIX, True, 10)
+        producer = Mock(return_value='mine')
+
+        def other_worker_finishes(seconds):
+            cache.set('aside:busy', ('theirs', float('inf')), 60)
+
+        with patch('job_automation.caching.time.sleep', side_effect=other_worker_finishes):
+            self.assertEqual(get_or_set('aside:busy', producer, timeout=60), 'theirs')
+        producer.assert_not_called()
+
+    def test_refresh_ahead_rebuilds_before_expiry(self):
+        """Test an entry inside its refresh window is rebuilt by one caller"""
+        caches['default'].set('aside:stale', ('old', 0), 60)  # Refresh time already passed
+        self.assertEqual(get_or_set('aside:stale', lambda: 'new', timeout=60), 'new')
+        self.assertEqual(caches['default'].get('aside:stale')[0], 'new')
+
+    def test_cache_aside_decorator(self):
+        calls = []
+
+        @cache_aside('aside:user:{user_id}', timeout=60)
+        def load(user_id):
+            calls.append(user_id)
+            return user_id * 2
+
+        self.assertEqual(load(user_id=4), 8)
+        self.assertEqual(load(user_id=4), 8)
+        load.invalidate(user_id=4)
+        self.assertEqual(load(user_id=4), 8)
+        self.assertEqual(calls, [4, 4])
+
+
 class PerformanceAPITest(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -0,0 +1,133 @@
+# tests/test_discord_bot.py - Discord Bot Data Layer Testing
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from accounts.models import UserProfile
+from discord_bot.utils import django_integration
+from discord_bot.utils.django_integration import DiscordUserCache, user_cache
+from jobs.models import JobSearchConfig
+
+
+class DiscordUserCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = DiscordUserCache(ttl=60, max_entries=2)
+
+    def test_hit_and_miss(self):
+        user = User(id=1, username='cached')
+        self.cache.set(123, user)
+
+        self.assertIs(self.cache.get('123'), user)  # Discord ids are keyed as strings
+        self.assertIsNone(self.cache.get(456))
+
+    @patch('discord_bot.utils.django_integration.time.monotonic')
+    def test_entries_expire_after_ttl(self, monotonic):
+        monotonic.return_value = 1000.0
+        self.cache.set(123, User(id=1, username='cached'))
+
+        monotonic.return_value = 1059.0
+        self.assertIsNotNone(self.cache.get(123))
+        monotonic.return_value = 1061.0
+        self.assertIsNone(self.cache.get(123))
+        self.assertEqual(len(self.cache._users), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        first, second, third = (User(id=i, username=f'user{i}') for i in range(3))
+        self.cache.set(1, first)
+        self.cache.set(2, second)
+        self.cache.get(1)  # 2 is now the least recently used
+        self.cache.set(3, third)
+
+        self.assertIs(self.cache.get(1), first)
+        self.assertIsNone(self.cache.get(2))
+        self.assertIs(self.cache.get(3), third)
+
+    def test_invalidate(self):
+        self.cache.set(1, User(id=1, username='one'))
+        self.cache.set(2, User(id=2, username='two'))
+
+        self.cache.invalidate(1)
+        self.assertIsNone(self.cache.get(1))
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get(2))
+
+
+# The ORM calls run on the bot's own thread pool, so the data must be committed to be seen there
+class DiscordUserLookupTest(TransactionTestCase):
+    def setUp(self):
+        user_cache.invalidate()
+        self.addCleanup(user_cache.invalidate)
+        self.discord_user = SimpleNamespace(id=987654321, name='ada', display_name='Ada L')
+
+    def test_existing_profile_is_returned_and_cached(self):
+        user = User.objects.create_user(username='linked', password='testpass123')
+        UserProfile.objects.update_or_create(user=user, defaults={'discord_user_id': '987654321'})
+
+        user_id = async_to_sync(django_integration.get_or_create_user)(self.discord_user)
+
+        self.assertEqual(user_id, user.id)
+        self.assertEqual(user_cache.get(self.discord_user.id).id, user.id)
+        self.assertFalse(User.objects.filter(username='discord_987654321').exists())
+
+        with patch.object(django_integration, '_load_user') as load_user:
+            async_to_sync(django_integration.get_or_create_user)(self.discord_user)
+        load_user.assert_not_called()
+
+    def test_new_discord_user_gets_account_and_profile(self):
+        user_id = async_to_sync(django_integration.get_or_create_user)(self.discord_user)
+
+        user = User.objects.get(id=user_id)
+        self.assertEqual(user.username, 'discord_987654321')
+        self.assertEqual(user.first_name, 'Ada L')
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(user.userprofile.discord_user_id, '987654321')
+        self.assertEqual(user_cache.get(self.discord_user.id).userprofile.discord_user_id, '987654321')
+
+        # A second call finds the same account instead of creating another
+        user_cache.invalidate()
+        self.assertEqual(async_to_sync(django_integration.get_or_create_user)(self.discord_user), user_id)
+        self.assertEqual(User.objects.filter(username='discord_987654321').count(), 1)
+
+
+@override_settings(N8N_WEBHOOK_URL='https://n8n.example.com/webhook/', N8N_API_TOKEN='token')
+class DiscordJobSearchTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher', password='testpass123')
+        status_patch = patch.object(django_integration, 'update_search_status', new_callable=AsyncMock)
+        self.update_status = status_patch.start()
+        self.addCleanup(status_patch.stop)
+
+    def _search(self):
+        return async_to_sync(django_integration.start_job_search)(self.user.id, ['python'], None, None)
+
+    @patch.object(django_integration.bot_http, 'post_json', new_callable=AsyncMock, return_value=200)
+    def test_search_posts_to_webhook(self, post_json):
+        self.assertTrue(self._search())
+
+        url, payload = post_json.await_args.args
+        self.assertEqual(url, 'https://n8n.example.com/webhook/universal-job-search')
+        self.assertEqual(payload['job_categories'], ['python'])
+        self.assertEqual(post_json.await_args.kwargs['headers'], {'Authorization': 'Bearer token'})
+
+        config = JobSearchConfig.objects.get(user=self.user, config_name='Discord Bot Search')
+        self.assertEqual(payload['config_id'], config.id)
+        self.assertIsNotNone(config.last_search_date)
+        self.assertEqual(self.update_status.await_count, 2)
+
+    @patch.object(django_integration.bot_http, 'post_json', new_callable=AsyncMock, return_value=502)
+    def test_failed_webhook_call_is_reported(self, post_json):
+        self.assertFalse(self._search())
+
+        post_json.assert_awaited_once()
+        config = JobSearchConfig.objects.get(user=self.user, config_name='Discord Bot Search')
+        self.assertIsNone(config.last_search_date)
+
+    @override_settings(N8N_WEBHOOK_URL='')
+    @patch.object(django_integration.bot_http, 'post_json', new_callable=AsyncMock)
+    def test_missing_webhook_url(self, post_json):
+        self.assertFalse(self._search())
+
+        post_json.assert_not_awaited()
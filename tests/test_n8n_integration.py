@@ -5,16 +5,32 @@ import time
 from unittest.mock import patch, Mock, MagicMock
 from django.test import TestCase, TransactionTestCase
 from django.contrib.auth.models import User
-from django.test.utils import override_settings
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import gzip
+import shutil
+import tempfile
+from datetime import date, timedelta
 
 from accounts.models import UserProfile
-from jobs.models import JobApplication, JobSearchConfig
+from api.serializers import FollowUpTemplateSerializer
+from jobs.dedup import canonical_job_url, find_duplicate_job, job_fingerprint
+from jobs.email_queue import EmailQueueConsumer
+from jobs.email_retention import EmailLogRetention
+from jobs.models import (EmailProcessingDailyRollup, EmailProcessingLog, EmailQueue, EmailSettings,
+                         JobApplication, JobSearchConfig)
+from followups.dispatcher import FollowUpDispatcher, followup_dispatcher
 from followups.models import FollowUpTemplate, FollowUpHistory
+from followups.templating import template_engine
 from documents.models import GeneratedDocument
+from job_automation.celery import app as celery_app
 
 
 class N8NWebhookTest(TestCase):
@@ -195,6 +211,192 @@ class N8NWebhookTest(TestCase):
         self.assertIn('error', response_data)
 
 
+class N8NJobSearchIngestionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='ingestuser',
+            email='ingest@example.com',
+            password='testpass123'
+        )
+        self.config = JobSearchConfig.objects.create(
+            user=self.user,
+            config_name='Python Jobs',
+            auto_follow_up_enabled=True
+        )
+        JobApplication.objects.create(
+            user=self.user,
+            job_title='Existing Developer',
+            company_name='Existing Co'
+        )
+
+    def test_bulk_job_ingestion(self):
+        """Test the job search webhook inserts new jobs in bulk and skips duplicates"""
+        jobs = [
+            {'job_title': f'Python Developer {i}', 'company_name': f'Company {i}', 'company_rating': '4.2'}
+            for i in range(50)
+        ]
+        jobs.append({'job_title': 'Existing Developer', 'company_name': 'Existing Co'})
+        jobs.append({'job_title': 'Python Developer 0', 'company_name': 'Company 0'})
+        jobs.append({'job_title': 'Developer, Existing', 'company_name': 'Existing Co Inc.'})
+        jobs.append({'job_title': '', 'company_name': 'No Title Inc'})
+
+        url = reverse('api:n8n_job_search')
+        payload = {'user_id': self.user.id, 'config_id': self.config.id, 'jobs': jobs}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, json.dumps(payload), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['created_count'], 50)
+        self.assertEqual(data['duplicate_count'], 3)
+        self.assertEqual(data['invalid_count'], 1)
+        self.assertIn('total_ms', data['timing'])
+
+        # user, config, existing keys, legacy rows, inserted keys and the locked counters row
+        selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(selects), 6)
+        self.assertEqual(len(updates), 2)
+
+        created = JobApplication.objects.filter(user=self.user, search_config=self.config)
+        self.assertEqual(created.count(), 50)
+        self.assertFalse(created.filter(follow_up_sequence_active=False).exists())
+        self.assertEqual(created.get(job_title='Python Developer 1').company_rating, 4.2)
+
+        self.config.refresh_from_db()
+        self.assertIsNotNone(self.config.last_search_date)
+
+    def test_ingestion_counts_only_inserted_rows(self):
+        """Test jobs colliding on the unique key are reported as duplicates, not created"""
+        from api.ingestion import bulk_ingest_jobs
+        from dashboard.counters import pipeline_counters
+
+        # A row saved before fingerprints existed still holds the (user, title, company) key
+        JobApplication.objects.filter(user=self.user).update(dedup_fingerprint='')
+        before = pipeline_counters.get(self.user).total_applications
+
+        result = bulk_ingest_jobs(self.user, self.config, [
+            {'job_title': 'Existing Developer', 'company_name': 'Existing Co'},
+            {'job_title': 'Fresh Developer', 'company_name': 'Fresh Co'},
+        ])
+
+        self.assertEqual(result['created_count'], 1)
+        self.assertEqual(result['duplicate_count'], 1)
+        self.assertEqual(JobApplication.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(pipeline_counters.get(self.user).total_applications, before + 1)
+
+    def test_ingestion_matches_rows_without_fingerprint(self):
+        """Test a reworded repost of a job saved before fingerprinting is still a duplicate"""
+        from api.ingestion import bulk_ingest_jobs
+
+        JobApplication.objects.filter(user=self.user).update(dedup_fingerprint='')
+
+        result = bulk_ingest_jobs(self.user, self.config, [
+            {'job_title': 'Developer, Existing', 'company_name': 'EXISTING CO'},
+        ])
+
+        self.assertEqual(result['created_count'], 0)
+        self.assertEqual(result['duplicate_count'], 1)
+
+    def _stream_url(self):
+        url = reverse('api:n8n_job_search_stream')
+        return f'{url}?user_id={self.user.id}&config_id={self.config.id}'
+
+    def test_streaming_ndjson_ingestion(self):
+        """Test the streaming webhook inserts NDJSON jobs in fixed-size chunks"""
+        lines = [
+            json.dumps({'job_title': f'Stream Developer {i}', 'company_name': f'Stream Co {i}'})
+            for i in range(12)
+        ]
+        lines.append(json.dumps({'job_title': 'Existing Developer', 'company_name': 'Existing Co'}))
+        lines.append('{not json')
+        body = '\n'.join(lines) + '\n'
+
+        with patch('api.views.N8NJobSearchStreamWebhook.chunk_size', 5):
+            response = self.client.post(self._stream_url(), body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['received'], 14)
+        self.assertEqual(data['accepted'], 12)
+        self.assertEqual(data['duplicates'], 1)
+        self.assertEqual(data['invalid'], 1)
+        self.assertEqual([chunk['received'] for chunk in data['chunks']], [5, 5, 4])
+        self.assertEqual(JobApplication.objects.filter(search_config=self.config).count(), 12)
+
+        self.config.refresh_from_db()
+        self.assertIsNotNone(self.config.last_search_date)
+
+    def test_streaming_gzip_ingestion(self):
+        """Test the streaming webhook accepts gzip encoded NDJSON"""
+        import gzip
+        body = gzip.compress('\n'.join(
+            json.dumps({'job_title': f'Gzip Developer {i}', 'company_name': 'Gzip Co'})
+            for i in range(3)
+        ).encode('utf-8'))
+
+        response = self.client.post(
+            self._stream_url(), body,
+            content_type='application/x-ndjson',
+            HTTP_CONTENT_ENCODING='gzip'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['accepted'], 3)
+
+    def test_streaming_requires_config(self):
+        url = reverse('api:n8n_job_search_stream')
+        response = self.client.post(f'{url}?user_id={self.user.id}', '', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+
+
+class JobDedupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='dedupuser',
+            email='dedup@example.com',
+            password='testpass123'
+        )
+        self.job = JobApplication.objects.create(
+            user=self.user,
+            job_title='Sr. Python Developer (Remote)',
+            company_name='Acme, Inc.',
+            job_url='https://www.linkedin.com/jobs/view/123/?trk=alert&utm_source=email'
+        )
+
+    def test_fingerprint_set_on_save(self):
+        """Test the dedup columns are filled in when a job is saved"""
+        self.assertEqual(self.job.dedup_company_key, 'acme')
+        self.assertEqual(self.job.dedup_fingerprint, job_fingerprint('Senior Developer Python', 'ACME LLC'))
+        self.assertEqual(canonical_job_url(self.job.job_url), 'linkedin.com/jobs/view/123')
+
+    def test_repost_matches_existing_job(self):
+        """Test reposts from another board and tracking-only URL changes are detected"""
+        self.assertEqual(find_duplicate_job(self.user, 'Python Developer, Senior', 'ACME Corp'), self.job)
+        self.assertEqual(
+            find_duplicate_job(self.user, 'Backend Role', 'Other Co', 'http://linkedin.com/jobs/view/123?refId=9'),
+            self.job
+        )
+        self.assertIsNone(find_duplicate_job(self.user, 'Data Engineer', 'Acme'))
+
+    def test_matches_job_saved_before_fingerprinting(self):
+        """Test rows whose fingerprint has not been backfilled match on title and company"""
+        JobApplication.objects.filter(pk=self.job.pk).update(dedup_fingerprint='', dedup_url_hash='')
+
+        self.assertEqual(find_duplicate_job(self.user, 'Python Developer, Senior', ' ACME, INC. '), self.job)
+        self.assertIsNone(find_duplicate_job(self.user, 'Data Engineer', 'Acme, Inc.'))
+
+    def test_near_duplicate_matching(self):
+        """Test MinHash matching only runs when enabled"""
+        self.assertIsNone(find_duplicate_job(self.user, 'Senior Python Developers', 'Acme', near_duplicates=False))
+        self.assertEqual(
+            find_duplicate_job(self.user, 'Senior Python Developers', 'Acme', near_duplicates=True),
+            self.job
+        )
+        self.assertIsNone(find_duplicate_job(self.user, 'Senior Java Developer', 'Acme', near_duplicates=True))
+
+
 class N8NIntegrationTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -606,6 +808,543 @@ class CeleryTaskTest(TestCase):
         self.assertEqual(result.id, 'search_task_789')
 
 
+class BulkFollowUpDispatchTest(TestCase):
+    """Test batched follow-up sending"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            username='bulkfollowup',
+            email='bulk@example.com',
+            password='testpass123',
+            first_name='Bulk'
+        )
+        UserProfile.objects.get_or_create(user=self.user)
+        self.template = FollowUpTemplate.objects.create(
+            user=self.user,
+            template_name="Bulk Template",
+            template_type="initial",
+            subject_template="Following up: {{job_title}}",
+            body_template="Hello {{company_name}}, this is {{first_name}}."
+        )
+        self.applications = [
+            JobApplication.objects.create(
+                user=self.user,
+                job_title=f"Engineer {i}",
+                company_name=f"Company {i}",
+                application_status='applied'
+            )
+            for i in range(3)
+        ]
+        self.application_ids = [application.id for application in self.applications]
+
+    def test_dispatch_sends_batch_over_one_connection(self):
+        """Test messages are rendered, sent on one connection and recorded in bulk"""
+        from django.core.mail import get_connection
+
+        dispatcher = FollowUpDispatcher()
+        with patch('followups.dispatcher.get_connection', wraps=get_connection) as mock_connection:
+            result = dispatcher.dispatch(self.application_ids, self.template.id)
+
+        self.assertEqual(mock_connection.call_count, 1)
+        self.assertEqual(sorted(result['sent']), sorted(self.application_ids))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertTrue(mail.outbox[0].subject.startswith('Following up: Engineer'))
+        self.assertEqual(FollowUpHistory.objects.filter(template=self.template).count(), 3)
+
+        self.template.refresh_from_db()
+        self.assertEqual(self.template.times_used, 3)
+        for application in JobApplication.objects.filter(id__in=self.application_ids):
+            self.assertEqual(application.follow_up_count, 1)
+            self.assertIsNotNone(application.next_follow_up_date)
+
+    def test_domain_budget_keyed_on_company_contact(self):
+        """Test users sharing a mail provider don't share a domain budget"""
+        other = User.objects.create_user(username='otherbulk', email='other@example.com', password='testpass123')
+        UserProfile.objects.get_or_create(user=other)
+        other_application = JobApplication.objects.create(
+            user=other, job_title="Engineer", company_name="Elsewhere", application_status='applied'
+        )
+        JobApplication.objects.filter(id=self.application_ids[0]).update(hiring_manager_email='jane@acme.example')
+
+        dispatcher = FollowUpDispatcher()
+        dispatcher.domain_burst = 1
+        result = dispatcher.dispatch(self.application_ids + [other_application.id], self.template.id)
+
+        self.assertEqual(len(result['sent']), 4)
+        self.assertEqual(result['deferred'], [])
+        buckets = dispatcher._buckets(JobApplication.objects.get(id=self.application_ids[0]))
+        self.assertEqual([bucket[:2] for bucket in buckets], [('user', self.user.id), ('domain', 'acme.example')])
+
+    def test_applications_without_profile_reported_failed(self):
+        """Test follow-ups that can't be rendered show up as failed instead of vanishing"""
+        no_profile = User.objects.create_user(username='noprofile', email='np@example.com', password='testpass123')
+        UserProfile.objects.filter(user=no_profile).delete()
+        application = JobApplication.objects.create(
+            user=no_profile, job_title="Engineer", company_name="Nowhere", application_status='applied'
+        )
+
+        result = FollowUpDispatcher().dispatch([application.id, self.application_ids[0]], self.template.id)
+
+        self.assertEqual(result['sent'], [self.application_ids[0]])
+        self.assertEqual(result['failed'], [application.id])
+
+    def test_rate_limited_messages_are_requeued(self):
+        """Test messages over the per-user limit are re-queued with a countdown, not slept on"""
+        from followups.tasks import send_bulk_followup_emails
+
+        with patch('followups.tasks.followup_dispatcher.user_burst', 2), \
+                patch('followups.tasks.send_bulk_followup_emails.apply_async') as mock_requeue:
+            sent = send_bulk_followup_emails(self.application_ids, self.template.id)
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(len(mail.outbox), 2)
+        args, kwargs = mock_requeue.call_args
+        self.assertEqual(len(args[0][0]), 1)
+        self.assertGreaterEqual(kwargs['countdown'], 1)
+
+    def test_rate_limiter_is_atomic_across_workers(self):
+        """Test concurrent workers can't spend more than the bucket holds"""
+        from followups.dispatcher import TokenBucketLimiter
+
+        limiter = TokenBucketLimiter(prefix='test_rate')
+        now = time.time()
+        buckets = [('user', self.user.id, 5, 10)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            waits = list(pool.map(lambda _: limiter.acquire(buckets, now=now), range(20)))
+
+        self.assertEqual(waits.count(0), 5)
+        self.assertTrue(all(0 < wait <= 30 for wait in waits if wait))
+
+    def test_refused_send_does_not_spend_other_buckets(self):
+        from followups.dispatcher import TokenBucketLimiter
+
+        limiter = TokenBucketLimiter(prefix='test_rate')
+        now = time.time()
+        user_bucket = ('user', self.user.id, 1, 60)
+        domain_bucket = ('domain', 'example.com', 2, 60)
+
+        self.assertEqual(limiter.acquire([user_bucket, domain_bucket], now=now), 0)
+        self.assertGreater(limiter.acquire([user_bucket, domain_bucket], now=now), 0)
+        # The refused call above handed its domain token back
+        self.assertEqual(limiter.acquire([domain_bucket], now=now), 0)
+        self.assertGreater(limiter.acquire([domain_bucket], now=now), 0)
+
+
+class FollowUpTemplateEngineTest(TestCase):
+    """Test compiled follow-up template rendering"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='templating',
+            email='templating@example.com',
+            password='testpass123',
+            first_name='Ada',
+            last_name='Lovelace'
+        )
+        UserProfile.objects.get_or_create(user=self.user)
+        self.template = FollowUpTemplate.objects.create(
+            user=self.user,
+            template_name="Engine Template",
+            template_type="initial",
+            subject_template="{{job_title}} at {{ company_name }}",
+            body_template="Hi {{hiring_manager}}, {{first_name}} here about {{job_title}}. {{unknown}}"
+        )
+        self.applications = [
+            JobApplication.objects.create(user=self.user, job_title=f"Role {i}", company_name=f"Company {i}")
+            for i in range(3)
+        ]
+
+    def test_render_many_single_pass(self):
+        """Test a batch renders every placeholder with one profile query"""
+        with self.assertNumQueries(1):
+            rendered, skipped = template_engine.render_many(self.template, self.applications)
+
+        self.assertEqual(skipped, [])
+        application, subject, body = rendered[0]
+        self.assertEqual(subject, f"{application.job_title} at {application.company_name}")
+        self.assertEqual(body, f"Hi Hiring Manager, Ada here about {application.job_title}. {{{{unknown}}}}")
+
+    def test_compiled_form_cached_until_template_changes(self):
+        """Test a template is compiled once and recompiled after it is edited"""
+        first = template_engine.compile(self.template)
+        self.assertIs(first, template_engine.compile(self.template))
+
+        self.template.subject_template = "Update on {{job_title}}"
+        self.template.save()
+        subject, _ = template_engine.render(self.template, self.applications[0])
+        self.assertEqual(subject, "Update on Role 0")
+
+    def test_unknown_placeholders_rejected_on_save(self):
+        """Test model validation and the API reject placeholders the engine can't fill"""
+        with self.assertRaises(ValidationError) as raised:
+            self.template.full_clean()
+        self.assertIn('body_template', raised.exception.message_dict)
+
+        serializer = FollowUpTemplateSerializer(data={
+            'template_name': 'Bad',
+            'template_type': 'custom',
+            'subject_template': 'Hello {{recruiter_name}}',
+            'body_template': 'Body'
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('subject_template', serializer.errors)
+
+
+class ScheduledFollowUpTest(TestCase):
+    """Test the set-based scheduled follow-up processor"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+
+        self.users = []
+        for i in range(2):
+            user = User.objects.create_user(
+                username=f'scheduled{i}',
+                email=f'scheduled{i}@example.com',
+                password='testpass123'
+            )
+            UserProfile.objects.get_or_create(user=user)
+            FollowUpTemplate.objects.create(
+                user=user,
+                template_name="Default",
+                template_type="1_week",
+                subject_template="Checking in on {{job_title}}",
+                body_template="Hello {{company_name}}",
+                is_default=True
+            )
+            for j in range(2):
+                JobApplication.objects.create(
+                    user=user,
+                    job_title=f"Role {j}",
+                    company_name=f"Company {i}-{j}",
+                    application_status='applied',
+                    follow_up_sequence_active=True,
+                    next_follow_up_date=date.today() - timedelta(days=1)
+                )
+            self.users.append(user)
+
+        # Due, but the user has no default template
+        JobApplication.objects.create(
+            user=User.objects.create_user(username='notemplate', email='none@example.com', password='x'),
+            job_title="Role", company_name="Nowhere", application_status='applied',
+            follow_up_sequence_active=True, next_follow_up_date=date.today()
+        )
+
+    def test_due_shards_single_query(self):
+        """Test due applications and default templates are read in one query, one shard per user"""
+        with self.assertNumQueries(1):
+            shards = followup_dispatcher.due_shards()
+
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(sorted(len(ids) for _, ids in shards), [2, 2])
+
+    def test_overlapping_runs_send_once(self):
+        """Test a second run on the same day sends nothing"""
+        from followups.tasks import process_scheduled_followups, send_scheduled_followup_shard
+
+        process_scheduled_followups()
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(FollowUpHistory.objects.count(), 4)
+
+        # Replaying a shard that was already claimed today is a no-op
+        template_id, application_ids = followup_dispatcher.due_shards(date.today() + timedelta(days=14))[0]
+        self.assertEqual(send_scheduled_followup_shard(application_ids, template_id), 0)
+        process_scheduled_followups()
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_crash_after_sending_does_not_resend(self):
+        """Test the claim is kept in the database, not only in the cache"""
+        from followups.tasks import process_scheduled_followups
+
+        with patch.object(followup_dispatcher, '_record', side_effect=DatabaseError('connection lost')):
+            process_scheduled_followups()
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertFalse(FollowUpHistory.objects.exists())
+
+        cache.clear()
+        process_scheduled_followups()
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_unsent_follow_ups_stay_due(self):
+        """Test failed sends give their claim back for the next run"""
+        from followups.tasks import send_scheduled_followup_shard
+
+        template_id, application_ids = followup_dispatcher.due_shards()[0]
+        with patch.object(followup_dispatcher, '_send', side_effect=lambda ready: ([], [a.id for a, _ in ready])):
+            self.assertEqual(send_scheduled_followup_shard(application_ids, template_id), 0)
+
+        self.assertEqual(
+            set(JobApplication.objects.filter(id__in=application_ids).values_list('next_follow_up_date', flat=True)),
+            {date.today()}
+        )
+        self.assertEqual(send_scheduled_followup_shard(application_ids, template_id), 2)
+
+
+class EmailQueueConsumerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='queueuser', email='queue@example.com', password='testpass123')
+        UserProfile.objects.get_or_create(user=self.user)
+        self.consumer = EmailQueueConsumer()
+
+    def _alert(self, i):
+        return {'subject': f'Job alert {i}', 'body': 'New python role', 'sender': 'alerts@jobs.example'}
+
+    def test_interview_lane_is_not_stuck_behind_alert_flood(self):
+        for i in range(60):
+            self.consumer.enqueue(self.user, self._alert(i), 'job_alert')
+        invite = self.consumer.enqueue(self.user, {'subject': 'Interview invite', 'body': 'Tuesday?'}, 'interview_invite')
+
+        self.assertEqual(self.consumer.lane_stats()['bulk']['depth'], 60)
+        claimed = self.consumer.claim('interview')
+        self.assertEqual([item.id for item in claimed], [invite.id])
+
+        results = self.consumer.run_once()
+        self.assertEqual(results['bulk']['processed'], 50)
+        self.assertEqual(self.consumer.lane_stats()['bulk']['depth'], 10)
+
+    def test_claims_never_overlap(self):
+        for i in range(5):
+            self.consumer.enqueue(self.user, self._alert(i), 'job_alert')
+
+        first = self.consumer.claim('bulk', limit=3)
+        second = self.consumer.claim('bulk', limit=3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({item.id for item in first} & {item.id for item in second})
+        self.assertEqual(self.consumer.claim('bulk'), [])
+        self.assertTrue(all(item.processing_attempts == 1 for item in first + second))
+
+    def test_failure_backs_off_then_gives_up(self):
+        item = self.consumer.enqueue(self.user, self._alert(0), 'job_alert')
+
+        def broken(item):
+            raise RuntimeError('parser exploded')
+
+        self.consumer.run_once(['bulk'], handler=broken)
+        item.refresh_from_db()
+        self.assertEqual(item.status, 'retry')
+        self.assertGreater(item.next_attempt_at, timezone.now())
+        self.assertEqual(self.consumer.claim('bulk'), [])  # Not due yet
+
+        for attempt in range(2):
+            EmailQueue.objects.filter(pk=item.pk).update(next_attempt_at=timezone.now())
+            self.consumer.run_once(['bulk'], handler=broken)
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.processing_attempts), ('failed', 3))
+        self.assertEqual(item.error_message, 'parser exploded')
+
+    def test_rows_of_a_dead_worker_are_reclaimed(self):
+        self.consumer.enqueue(self.user, self._alert(0), 'job_alert')
+        claimed = self.consumer.claim('bulk')
+        self.assertEqual(self.consumer.claim('bulk'), [])
+
+        EmailQueue.objects.filter(pk=claimed[0].pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        reclaimed = self.consumer.claim('bulk')
+        self.assertEqual([item.id for item in reclaimed], [claimed[0].id])
+        self.assertNotEqual(reclaimed[0].claim_token, claimed[0].claim_token)
+
+    def test_dead_worker_on_last_attempt_is_not_reclaimed(self):
+        item = self.consumer.enqueue(self.user, self._alert(0), 'job_alert')
+        EmailQueue.objects.filter(pk=item.pk).update(
+            status='processing', processing_attempts=3, updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(self.consumer.lane_stats()['bulk']['depth'], 0)
+        self.assertEqual(self.consumer.claim('bulk'), [])
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.processing_attempts), ('failed', 3))
+
+    def test_slow_worker_cannot_overwrite_new_owner(self):
+        self.consumer.enqueue(self.user, self._alert(0), 'job_alert')
+        stale = self.consumer.claim('bulk')[0]
+        EmailQueue.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        current = self.consumer.claim('bulk')[0]
+
+        # The first worker finally finishes: nothing is written and no log is left behind
+        self.assertFalse(self.consumer.process(stale))
+        self.assertFalse(EmailProcessingLog.objects.filter(user=self.user).exists())
+
+        def broken(item):
+            raise RuntimeError('late failure')
+
+        self.assertFalse(self.consumer.process(stale, handler=broken))
+        row = EmailQueue.objects.get(pk=stale.pk)
+        self.assertEqual((row.status, row.claim_token, row.error_message), ('processing', current.claim_token, ''))
+
+        self.assertTrue(self.consumer.process(current))
+        self.assertEqual(EmailQueue.objects.get(pk=stale.pk).status, 'completed')
+        self.assertEqual(EmailProcessingLog.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(EMAIL_QUEUE_SETTINGS={'IDLE_SLEEP': 0})
+    def test_consumer_command_survives_database_errors(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from django.db import OperationalError
+        from jobs.email_queue import email_queue_consumer
+
+        empty = {lane: {'processed': 0, 'failed': 0} for lane in email_queue_consumer.lanes}
+        with patch.object(email_queue_consumer, 'run_once',
+                          side_effect=[OperationalError('database is locked'), empty]) as run_once:
+            call_command('process_email_queue', '--workers', '1', '--drain', stdout=StringIO())
+
+        self.assertEqual(run_once.call_count, 2)
+
+    def test_default_handler_logs_and_applies_filters(self):
+        settings_obj = EmailSettings.objects.create(user=self.user)
+        EmailSettings.objects.filter(pk=settings_obj.pk).update(blacklisted_senders=['spam@jobs.example'])
+        kept = self.consumer.enqueue(self.user, self._alert(0), 'job_alert')
+        dropped = self.consumer.enqueue(self.user, {**self._alert(1), 'sender': 'spam@jobs.example'}, 'job_alert')
+
+        self.consumer.drain()
+
+        kept.refresh_from_db()
+        dropped.refresh_from_db()
+        self.assertEqual(kept.status, 'completed')
+        self.assertEqual(kept.processing_log.processing_result, 'success')
+        self.assertEqual(dropped.processing_log.processing_result, 'ignored')
+
+
+class CompiledEmailFilterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='filteruser', password='testpass123')
+        self.settings = EmailSettings.objects.create(user=self.user)
+        self.settings.blacklisted_senders = ['Spam@Jobs.example', '*@noise.example', '*.bulkmail.example']
+        self.settings.required_keywords = ['Python', 'data engineer']
+        self.settings.keyword_filters = ['unsubscribe']
+        self.settings.save()
+
+    def test_matches_original_rules(self):
+        passes = {'sender': 'jobs@board.example', 'subject': 'New Python role', 'body': 'Apply today'}
+        self.assertTrue(self.settings.should_process_email(passes))
+        self.assertFalse(self.settings.should_process_email({**passes, 'sender': 'spam@jobs.example'}))
+        self.assertFalse(self.settings.should_process_email({**passes, 'subject': 'New Go role'}))
+        self.assertFalse(self.settings.should_process_email({**passes, 'body': 'Click to UNSUBSCRIBE'}))
+        # Keywords may span the subject/body join, as before
+        self.assertTrue(self.settings.should_process_email({**passes, 'subject': 'Senior data', 'body': 'engineer'}))
+
+    def test_domain_wildcards(self):
+        self.assertTrue(self.settings.is_sender_blacklisted('Alerts <alerts@noise.example>'))
+        self.assertTrue(self.settings.is_sender_blacklisted('a@news.bulkmail.example'))
+        self.assertFalse(self.settings.is_sender_blacklisted('a@notnoise.example'))
+
+    def test_compiled_once_per_version(self):
+        compiled = self.settings.compiled_filter
+        reloaded = EmailSettings.objects.get(pk=self.settings.pk)
+        self.assertIs(reloaded.compiled_filter, compiled)
+
+        reloaded.keyword_filters = []
+        reloaded.save()
+        self.assertIsNot(reloaded.compiled_filter, compiled)
+        self.assertTrue(reloaded.should_process_email({'subject': 'Python', 'body': 'unsubscribe'}))
+
+    def test_filter_many_keeps_order(self):
+        emails = [
+            {'sender': 'a@x.example', 'subject': 'Python 1', 'body': ''},
+            {'sender': 'b@noise.example', 'subject': 'Python 2', 'body': ''},
+            {'sender': 'c@x.example', 'subject': 'Rust', 'body': ''},
+            {'sender': 'd@x.example', 'subject': 'Python 3', 'body': ''},
+        ]
+        self.assertEqual([email['subject'] for email in self.settings.filter_many(emails)], ['Python 1', 'Python 3'])
+
+
+class EmailLogRetentionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='retentionuser', password='testpass123')
+        UserProfile.objects.get_or_create(user=self.user)
+        EmailSettings.objects.create(user=self.user, keep_email_logs_days=30, auto_delete_failed_processing=True)
+        self.retention = EmailLogRetention()
+        self.retention.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.retention.archive_dir, ignore_errors=True)
+
+    def _log(self, days_old, email_type='job_alert', result='success', user=None):
+        log = EmailProcessingLog.objects.create(
+            user=user or self.user,
+            email_subject=f'{email_type} {days_old}d',
+            email_sender='alerts@jobs.example',
+            email_received_date=timezone.now(),
+            email_body_preview='',
+            email_type=email_type,
+            processing_result=result,
+            confidence_score=80.0,
+            extracted_data={'title': 'Engineer'}
+        )
+        EmailProcessingLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return log
+
+    def test_windows_follow_each_users_settings(self):
+        other = User.objects.create_user(username='nosettings', password='testpass123')
+        UserProfile.objects.get_or_create(user=other)
+        kept = [self._log(5), self._log(29), self._log(3, result='failed'), self._log(60, user=other)]
+        self._log(31)
+        self._log(10, result='failed')
+        self._log(100, user=other)
+
+        self.assertEqual(self.retention.purge(dry_run=True)['expired'], 3)
+        self.assertEqual(EmailProcessingLog.objects.count(), 7)
+
+        result = self.retention.purge(batch_size=2)
+
+        self.assertEqual((result['deleted'], result['batches']), (3, 2))
+        self.assertEqual(set(EmailProcessingLog.objects.values_list('id', flat=True)), {log.id for log in kept})
+
+    def test_purged_rows_are_rolled_up_and_archived(self):
+        queued = EmailQueue.objects.create(user=self.user, email_data={}, processing_log=self._log(40))
+        self._log(40)
+        self._log(40, email_type='interview_invite')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.retention.purge(archive=True)
+
+        rollups = {
+            (rollup.email_type, rollup.count, rollup.confidence_total)
+            for rollup in EmailProcessingDailyRollup.objects.filter(user=self.user)
+        }
+        self.assertEqual(rollups, {('job_alert', 2, 160.0), ('interview_invite', 1, 80.0)})
+        with gzip.open(result['archive_path'], 'rt') as archive:
+            rows = [json.loads(line) for line in archive]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['extracted_data'], {'title': 'Engineer'})
+        queued.refresh_from_db()
+        self.assertIsNone(queued.processing_log)
+
+        # A second run adds to the same buckets instead of duplicating them
+        self._log(40)
+        self.retention.purge()
+        self.assertEqual(EmailProcessingDailyRollup.objects.get(user=self.user, email_type='job_alert').count, 3)
+
+    def test_rolled_back_batch_is_not_archived(self):
+        self._log(40)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with patch.object(self.retention, '_delete', side_effect=DatabaseError('locked')):
+                with self.assertRaises(DatabaseError):
+                    self.retention.purge(archive=True)
+            result = self.retention.purge(archive=True)
+
+        self.assertEqual(result['deleted'], 1)
+        self.assertEqual(EmailProcessingDailyRollup.objects.get(user=self.user).count, 1)
+        with gzip.open(result['archive_path'], 'rt') as archive:
+            self.assertEqual(len(archive.readlines()), 1)
+
+    def test_chart_keeps_purged_days(self):
+        from dashboard.email_stats import email_analytics
+
+        self._log(20)
+        EmailSettings.objects.filter(user=self.user).update(keep_email_logs_days=7)
+        before = email_analytics.compute_daily(self.user)
+
+        self.retention.purge()
+
+        self.assertFalse(EmailProcessingLog.objects.filter(user=self.user).exists())
+        self.assertEqual(email_analytics.compute_daily(self.user), before)
+
+
 class ErrorRecoveryTest(TestCase):
     """Test error recovery and resilience"""
 
@@ -2,15 +2,29 @@
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.core.files.uploadedfile import SimpleUploadedFile
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, PropertyMock
+from datetime import datetime, time as dt_time, timedelta
+import io
 import json
+import os
+import tempfile
+import time
+import zipfile
 
 from accounts.models import UserProfile
-from jobs.models import JobApplication, JobSearchConfig
+from jobs.models import EmailProcessingLog, JobApplication, JobSearchConfig
+from jobs.pipeline import pipeline_loader
+from jobs.search import application_search
 from followups.models import FollowUpTemplate, FollowUpHistory
 from documents.models import GeneratedDocument
+from dashboard.email_stats import email_analytics
+from dashboard.fragments import dashboard_fragments
 
 
 class DashboardViewTest(TestCase):
@@ -708,6 +722,388 @@ class SecurityTest(TestCase):
             self.assertIn('&lt;script&gt;', str(application.job_title))
 
 
+class BulkDocumentDownloadTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='zipuser',
+            email='zip@example.com',
+            password='testpass123'
+        )
+        self.application = JobApplication.objects.create(
+            user=self.user,
+            job_title="Python Developer",
+            company_name="Zip Corp"
+        )
+
+        temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+        temp_file.write(b'%PDF-1.4 ' + b'x' * 200000)
+        temp_file.close()
+        self.addCleanup(os.remove, temp_file.name)
+
+        GeneratedDocument.objects.create(
+            application=self.application,
+            document_type="resume",
+            file_path=temp_file.name
+        )
+        GeneratedDocument.objects.create(
+            application=self.application,
+            document_type="cover_letter",
+            file_path="/missing/cover_letter.pdf",
+            content="Dear hiring manager,\nThank you."
+        )
+
+        self.client = Client()
+        self.client.login(username='zipuser', password='testpass123')
+
+    def test_all_documents_streamed_as_zip(self):
+        """Test the bulk download streams a valid ZIP with one entry per document"""
+        url = reverse('dashboard:bulk_download')
+        with self.assertNumQueries(3):  # user, exists() and one select_related query (session is cached)
+            response = self.client.post(url, {'download_type': 'all_documents'})
+            self.assertTrue(response.streaming)
+            content = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            names = archive.namelist()
+            self.assertEqual(names, ['Zip_Corp_Python_Developer_resume.pdf', 'Zip_Corp_Python_Developer_cover_letter.pdf'])
+            self.assertEqual(len(archive.read(names[0])), 200009)
+            self.assertTrue(archive.read(names[1]).startswith(b'%PDF'))
+
+    def test_bulk_download_page_counts_documents(self):
+        response = self.client.get(reverse('dashboard:bulk_download'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([app.document_count for app in response.context['applications']], [2])
+
+
+
+class DashboardFragmentCacheTest(TestCase):
+    def setUp(self):
+        caches['stats'].clear()
+        self.user = User.objects.create_user(
+            username='fragmentuser',
+            email='fragment@example.com',
+            password='testpass123'
+        )
+        for i in range(3):
+            JobApplication.objects.create(
+                user=self.user,
+                job_title=f"Engineer {i}",
+                company_name=f"Fragment Co {i}",
+                application_status='applied'
+            )
+        self.client = Client()
+        self.client.login(username='fragmentuser', password='testpass123')
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_dashboard_context_served_from_cache(self):
+        url = reverse('dashboard:analytics')
+        first, cold_queries = self._query_count(url)
+        second, warm_queries = self._query_count(url)
+
+        self.assertLess(warm_queries, cold_queries)
+        self.assertEqual(second.context['success_metrics'], first.context['success_metrics'])
+
+    def test_saving_an_application_invalidates_cached_pages(self):
+        url = reverse('dashboard:analytics')
+        self.client.get(url)
+        version = dashboard_fragments.get_version(self.user.id)
+
+        JobApplication.objects.create(user=self.user, job_title="Engineer 3", company_name="Fragment Co 3")
+
+        self.assertNotEqual(dashboard_fragments.get_version(self.user.id), version)
+        response = self.client.get(url)
+        self.assertEqual(response.context['success_metrics']['total_applications'], 4)
+
+    def test_bulk_status_update_moves_counters_and_stats(self):
+        from dashboard.counters import pipeline_counters
+        from dashboard.stats import dashboard_stats
+
+        discovered = JobApplication.objects.create(
+            user=self.user, job_title="Engineer 9", company_name="Fragment Co 9", application_status='discovered'
+        )
+        self.assertEqual(dashboard_stats.get_stats(self.user)['pipeline']['discovered'], 1)
+        version = dashboard_fragments.get_version(self.user.id)
+
+        self.client.post(reverse('jobs:bulk_action'), {
+            'action': 'update_status',
+            'new_status': 'applied',
+            'applications': [discovered.id] + list(
+                JobApplication.objects.filter(user=self.user, application_status='applied').values_list('id', flat=True)
+            ),
+        })
+
+        counters = pipeline_counters.get(self.user)
+        self.assertEqual(counters.status_counts, {'applied': 4})
+        self.assertEqual(counters.total_applications, 4)
+        self.assertEqual(dashboard_stats.get_stats(self.user)['pipeline']['discovered'], 0)
+        self.assertEqual(dashboard_stats.get_stats(self.user)['pipeline']['applied'], 4)
+        self.assertNotEqual(dashboard_fragments.get_version(self.user.id), version)
+
+    def test_versions_are_per_user(self):
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        version = dashboard_fragments.get_version(self.user.id)
+
+        JobApplication.objects.create(user=other, job_title="Other", company_name="Other Co")
+
+        self.assertEqual(dashboard_fragments.get_version(self.user.id), version)
+
+
+class PipelineBoardTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='boarduser',
+            email='board@example.com',
+            password='testpass123'
+        )
+        statuses = ['discovered', 'saved', 'applied', 'applied', 'first_interview', 'offer_received',
+                    'hired', 'rejected_automated', 'discovered', 'discovered']
+        for i, status in enumerate(statuses):
+            JobApplication.objects.create(
+                user=self.user,
+                job_title=f"Role {i}",
+                company_name=f"Board Co {i}",
+                application_status=status,
+                match_percentage=50 + i
+            )
+        self.client = Client()
+        self.client.login(username='boarduser', password='testpass123')
+        pipeline_loader.page_size = 3
+        self.addCleanup(setattr, pipeline_loader, 'page_size', 50)
+
+    def test_board_built_from_one_query(self):
+        board = pipeline_loader.load(JobApplication.objects.filter(user=self.user))
+        with self.assertNumQueries(1):
+            board = pipeline_loader.load(JobApplication.objects.filter(user=self.user))
+
+        self.assertEqual(board.count, 10)
+        self.assertEqual(board.columns['found'].count, 4)
+        self.assertEqual(len(board.columns['found']), 3)
+        self.assertTrue(board.columns['found'].has_more)
+        self.assertFalse(board.columns['applied'].has_more)
+        self.assertEqual(board.analytics['success_rate'], 10.0)
+        self.assertEqual(board.analytics['response_rate'], 20.0)
+        self.assertEqual(board.analytics['avg_match_score'], 54.5)
+
+    def test_applications_page_uses_loader(self):
+        response = self.client.get(reverse('jobs:applications'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['analytics']['total_applications'], 10)
+        self.assertEqual(response.context['pipeline']['applied'].count, 2)
+        self.assertContains(response, 'Board Co 9')
+
+    def test_column_cursor_pages_through_remaining_cards(self):
+        board = pipeline_loader.load(JobApplication.objects.filter(user=self.user))
+        url = reverse('jobs:pipeline_column', args=['found'])
+
+        response = self.client.get(url, {'cursor': board.columns['found'].next_cursor})
+        data = response.json()
+
+        shown = [app.id for app in board.columns['found']]
+        remaining = [card['id'] for card in data['cards']]
+        self.assertEqual(len(shown + remaining), 4)
+        self.assertFalse(set(shown) & set(remaining))
+        self.assertIsNone(data['next_cursor'])
+
+    def test_column_cursor_keeps_board_filters(self):
+        JobApplication.objects.filter(
+            user=self.user, job_title__in=['Role 0', 'Role 1', 'Role 8']
+        ).update(urgency_level='high')
+        pipeline_loader.page_size = 2
+
+        response = self.client.get(reverse('jobs:applications'), {'urgency': 'high'})
+        column = response.context['pipeline']['found']
+        self.assertEqual(column.count, 3)
+
+        data = self.client.get(
+            reverse('jobs:pipeline_column', args=['found']),
+            {'urgency': 'high', 'cursor': column.next_cursor}
+        ).json()
+
+        remaining = JobApplication.objects.filter(id__in=[card['id'] for card in data['cards']])
+        self.assertEqual(len(data['cards']), 1)
+        self.assertEqual(set(remaining.values_list('urgency_level', flat=True)), {'high'})
+        self.assertFalse({app.id for app in column} & set(remaining.values_list('id', flat=True)))
+        self.assertIsNone(data['next_cursor'])
+
+    def test_unknown_column_and_bad_cursor(self):
+        self.assertEqual(self.client.get(reverse('jobs:pipeline_column', args=['nope'])).status_code, 404)
+        response = self.client.get(reverse('jobs:pipeline_column', args=['found']), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ApplicationSearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='searchuser',
+            email='search@example.com',
+            password='testpass123'
+        )
+        self.kubernetes = JobApplication.objects.create(
+            user=self.user,
+            job_title="Platform Engineer",
+            company_name="Cloudy",
+            job_description="Run Kubernetes clusters and <script>alert(1)</script> tooling"
+        )
+        self.titled = JobApplication.objects.create(
+            user=self.user,
+            job_title="Kubernetes Administrator",
+            company_name="Ops Inc"
+        )
+        JobApplication.objects.create(user=self.user, job_title="Data Analyst", company_name="Numbers Ltd")
+        other = User.objects.create_user(username='othersearch', password='testpass123')
+        JobApplication.objects.create(user=other, job_title="Kubernetes Lead", company_name="Elsewhere")
+        self.client = Client()
+        self.client.login(username='searchuser', password='testpass123')
+
+    def _search(self, query):
+        return application_search.search(JobApplication.objects.filter(user=self.user), query)
+
+    def test_matches_description_and_ranks_title_first(self):
+        results = list(self._search('kubernetes').order_by('-search_rank'))
+        self.assertEqual(results, [self.titled, self.kubernetes])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.kubernetes.job_description = "Terraform only"
+        self.kubernetes.save()
+        self.assertEqual(list(self._search('kubernetes')), [self.titled])
+        self.assertEqual(list(self._search('terraform')), [self.kubernetes])
+
+        self.titled.delete()
+        self.assertFalse(self._search('kubernetes').exists())
+
+    def test_prefix_and_hostile_input(self):
+        self.assertEqual(self._search('kube').count(), 2)
+        self.assertEqual(self._search('"kubernetes*(').count(), 2)
+        self.assertEqual(self._search('***').count(), 3)
+
+    def test_highlighted_snippet_is_escaped(self):
+        application_search.highlight([self.kubernetes], 'kubernetes')
+        self.assertIn('<mark>Kubernetes</mark>', self.kubernetes.search_snippet)
+        self.assertNotIn('<script>', self.kubernetes.search_snippet)
+
+    def test_ranked_search_scales_with_matches(self):
+        JobApplication.objects.bulk_create([
+            JobApplication(user=self.user, job_title=f"Python Developer {i}", company_name=f"Bulk Co {i}",
+                           job_description="python " * (i % 7 + 1))
+            for i in range(3000)
+        ])
+
+        started = time.perf_counter()
+        top = list(self._search('python').order_by('-search_rank')[:20])
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(top), 20)
+        self.assertEqual(self._search('python').count(), 3000)
+        self.assertLess(elapsed, 1.0)  # A correlated bm25 subquery took ~10s here
+
+    def test_job_list_search_is_ranked(self):
+        response = self.client.get(reverse('jobs:job_list'), {'search': 'kubernetes'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['jobs']), [self.titled, self.kubernetes])
+
+    def test_job_list_search_without_index(self):
+        with patch('jobs.search.ApplicationSearchIndex.vendor', new_callable=PropertyMock, return_value='mysql'):
+            response = self.client.get(reverse('jobs:job_list'), {'search': 'kubernetes'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({job.id for job in response.context['jobs']}, {self.titled.id, self.kubernetes.id})
+
+
+class EmailAnalyticsTest(TestCase):
+    def setUp(self):
+        caches['stats'].clear()
+        self.user = User.objects.create_user(
+            username='emailstats',
+            email='emailstats@example.com',
+            password='testpass123'
+        )
+        UserProfile.objects.get_or_create(user=self.user)
+        for email_type, result, confidence in [
+            ('job_alert', 'success', 90.0),
+            ('job_alert', 'success', 70.0),
+            ('interview_invite', 'success', 80.0),
+            ('other', 'failed', 20.0),
+        ]:
+            self._log(email_type, result, confidence)
+        self.client = Client()
+        self.client.login(username='emailstats', password='testpass123')
+
+    def _log(self, email_type, result, confidence=50.0):
+        return EmailProcessingLog.objects.create(
+            user=self.user,
+            email_subject=f"{email_type} email",
+            email_sender='alerts@example.com',
+            email_received_date=timezone.now(),
+            email_body_preview='',
+            email_type=email_type,
+            processing_result=result,
+            confidence_score=confidence
+        )
+
+    def test_summary_and_chart_are_aggregated_in_the_database(self):
+        with self.assertNumQueries(1):
+            summary = email_analytics.compute_summary(self.user)
+        with self.assertNumQueries(2):  # Raw logs and purged-day rollups
+            daily = email_analytics.compute_daily(self.user)
+
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(summary['jobs_found'], 2)
+        self.assertEqual(summary['interviews_detected'], 1)
+        self.assertEqual(summary['jobs_today'], 2)
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(summary['success_rate'], 75.0)
+        self.assertEqual(summary['avg_confidence'], 65.0)
+        self.assertEqual(len(daily), 30)
+        self.assertEqual(daily[timezone.localdate().strftime('%Y-%m-%d')], {'jobs': 2, 'interviews': 1, 'total': 4})
+
+    def test_chart_window_starts_at_local_midnight(self):
+        start = timezone.localdate() - timedelta(days=29)
+        midnight = timezone.make_aware(datetime.combine(start, dt_time.min))
+        for created_at in (midnight, midnight - timedelta(seconds=1)):
+            EmailProcessingLog.objects.filter(id=self._log('job_alert', 'success').id).update(created_at=created_at)
+
+        daily = email_analytics.compute_daily(self.user)
+        self.assertEqual(daily[start.strftime('%Y-%m-%d')]['jobs'], 1)
+
+    def test_summary_windows_refresh_hourly(self):
+        self.assertEqual(email_analytics.get_summary(self.user)['recent'], 4)
+        EmailProcessingLog.objects.filter(user=self.user).update(created_at=timezone.now() - timedelta(hours=23))
+
+        later = timezone.now() + timedelta(hours=2)
+        with patch('dashboard.email_stats.timezone.now', return_value=later):
+            self.assertEqual(email_analytics.get_summary(self.user)['recent'], 0)
+
+    def test_stats_api_cached_until_a_new_log(self):
+        url = reverse('dashboard:email_stats_api')
+        self.assertEqual(self.client.get(url).json()['total_processed'], 4)
+        with self.assertNumQueries(1):  # The session's user only
+            self.client.get(url)
+
+        self._log('job_alert', 'success')
+        data = self.client.get(url).json()
+        self.assertEqual(data['total_processed'], 5)
+        self.assertEqual(data['jobs_found_today'], 3)
+
+    def test_all_email_views_share_the_summary(self):
+        settings_page = self.client.get(reverse('dashboard:email_settings'))
+        successes = EmailProcessingLog.objects.filter(user=self.user, processing_result='success')
+        log_stats = email_analytics.get_log_stats(self.user, successes, 'all', 'success', 30, '')
+        processing = self.client.get(reverse('jobs:email_processing_stats')).json()
+
+        self.assertEqual(settings_page.context['email_stats']['jobs_found'], 2)
+        self.assertEqual(log_stats['total'], 3)
+        self.assertEqual(log_stats['success_rate'], 100.0)
+        self.assertEqual(processing['total_emails_processed'], 4)
+        self.assertEqual(processing['recent_activity'], 4)
+
+
 class PerformanceTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(